@@ -1,15 +1,9 @@
 import streamlit as st
 import mysql.connector
+from database import get_pool
 import pandas as pd
 from auth import get_auth_system
 
-DB_CONFIG = {
-    'host': 'localhost',
-    'user': 'root',
-    'password': '',
-    'database': 'examens'
-}
-
 st.set_page_config(page_title="Gestion des utilisateurs", page_icon="👥")
 
 auth = get_auth_system()
@@ -32,7 +26,7 @@ tab1, tab2, tab3 = st.tabs(["Utilisateurs", "Ajouter", "Statistiques"])
 with tab1:
     st.subheader("📋 Liste des utilisateurs")
     
-    conn = mysql.connector.connect(**DB_CONFIG)
+    conn = get_pool().get_connection()
     cursor = conn.cursor(dictionary=True)
     
     try:
@@ -115,9 +109,11 @@ with tab2:
             nom = st.text_input("Nom")
             prenom = st.text_input("Prénom")
             
-            cursor = conn.cursor()
-            cursor.execute("SELECT id, nom FROM roles ORDER BY nom")
-            roles = cursor.fetchall()
+            with get_pool().connection() as roles_conn:
+                cursor = roles_conn.cursor()
+                cursor.execute("SELECT id, nom FROM roles ORDER BY nom")
+                roles = cursor.fetchall()
+                cursor.close()
             role_options = {nom: id for id, nom in roles}
             selected_role = st.selectbox("Rôle *", list(role_options.keys()))
         
@@ -141,7 +137,7 @@ with tab2:
 with tab3:
     st.subheader("📊 Statistiques des utilisateurs")
     
-    conn = mysql.connector.connect(**DB_CONFIG)
+    conn = get_pool().get_connection()
     cursor = conn.cursor(dictionary=True)
     
     try:
@@ -151,7 +151,7 @@ def init_database():
     """Initialiser la base de données"""
     try:
         from database import DatabaseManager
-        db = DatabaseManager()
+        db = DatabaseManager(cache=True)
         test = db.execute_query("SELECT 1 as test", fetch=True)
         if test:
             return db
@@ -181,6 +181,22 @@ if db is None:
     class DemoDatabase:
         def execute_query(self, query, params=None, fetch=False):
             return []
+        
+        def bulk_insert_exams(self, rows, chunk_size=None):
+            return 0
+        
+        def has_module_stats(self):
+            return False
+        
+        def get_dashboard_statistics(self):
+            return {
+                'total_etudiants': 0,
+                'total_formations': 0,
+                'total_modules': 0,
+                'total_examens': 0,
+                'total_departements': 0,
+                'conflits_non_resolus': 0
+            }
     db = DemoDatabase()
 
 # ====================
@@ -279,27 +295,9 @@ auth_system = init_auth_system()
 # FONCTIONS UTILITAIRES
 # ====================
 def get_statistiques():
-    """Récupérer les statistiques de la base de données"""
-    stats = {}
+    """Récupérer les statistiques de la base de données (une requête, mise en cache)"""
     try:
-        result = db.execute_query("SELECT COUNT(*) as total FROM etudiants", fetch=True)
-        stats['total_etudiants'] = result[0]['total'] if result else 0
-        
-        result = db.execute_query("SELECT COUNT(*) as total FROM formations", fetch=True)
-        stats['total_formations'] = result[0]['total'] if result else 0
-        
-        result = db.execute_query("SELECT COUNT(*) as total FROM modules", fetch=True)
-        stats['total_modules'] = result[0]['total'] if result else 0
-        
-        result = db.execute_query("SELECT COUNT(*) as total FROM examens", fetch=True)
-        stats['total_examens'] = result[0]['total'] if result else 0
-        
-        result = db.execute_query("SELECT COUNT(*) as total FROM departments", fetch=True)
-        stats['total_departements'] = result[0]['total'] if result else 0
-        
-        result = db.execute_query("SELECT COUNT(*) as total FROM conflits_etudiants WHERE resolved = 0", fetch=True)
-        stats['conflits_non_resolus'] = result[0]['total'] if result else 0
-        
+        stats = db.get_dashboard_statistics()
     except Exception as e:
         stats = {
             'total_etudiants': 13000,
@@ -326,48 +324,43 @@ def get_departments():
             {'id': 37, 'nom': 'Électronique'}
         ]
 
-def generate_edt_automatique(nb_examens=10, mode_generation="Automatique", dept_selected=None):
-    """Générer automatiquement des examens"""
+def generate_edt_automatique(job, nb_examens=10, mode_generation="Automatique", dept_selected=None):
+    """
+    Générer automatiquement des examens (tâche de fond, voir jobs.JobRunner).
+    
+    Chaque étape est publiée par job.report(), qui interrompt le calcul si
+    l'annulation est demandée : rien n'est écrit avant l'enregistrement final.
+    """
+    from jobs import JobCancelled
     try:
+        job.report(force=True, etape="Sélection des modules")
+        filtre, params = "", (nb_examens,)
         if mode_generation == "Par département" and dept_selected:
             dept_info = db.execute_query(
                 "SELECT id FROM departments WHERE nom = %s", 
                 (dept_selected,), 
                 fetch=True
             )
-            
             if dept_info:
-                dept_id = dept_info[0]['id']
-                query = """
-                    SELECT m.id, m.nom, f.dept_id, d.nom as departement
-                    FROM modules m
-                    JOIN formations f ON m.formation_id = f.id
-                    JOIN departments d ON f.dept_id = d.id
-                    WHERE d.id = %s
-                    ORDER BY RAND()
-                    LIMIT %s
-                """
-                params = (dept_id, nb_examens)
-            else:
-                query = """
-                    SELECT m.id, m.nom, f.dept_id, d.nom as departement
-                    FROM modules m
-                    JOIN formations f ON m.formation_id = f.id
-                    JOIN departments d ON f.dept_id = d.id
-                    ORDER BY RAND()
-                    LIMIT %s
-                """
-                params = (nb_examens,)
+                filtre, params = "WHERE d.id = %s", (dept_info[0]['id'], nb_examens)
+        
+        # Effectifs précalculés (module_stats), agrégés en une passe à défaut
+        if db.has_module_stats():
+            effectifs = "LEFT JOIN module_stats ms ON ms.module_id = m.id"
         else:
-            query = """
-                SELECT m.id, m.nom, f.dept_id, d.nom as departement
-                FROM modules m
-                JOIN formations f ON m.formation_id = f.id
-                JOIN departments d ON f.dept_id = d.id
-                ORDER BY RAND()
-                LIMIT %s
-            """
-            params = (nb_examens,)
+            effectifs = """LEFT JOIN (SELECT module_id, COUNT(*) as nb_etudiants FROM inscriptions
+                                     GROUP BY module_id) ms ON ms.module_id = m.id"""
+        query = f"""
+            SELECT m.id, m.nom, f.dept_id, d.nom as departement,
+                   COALESCE(ms.nb_etudiants, 0) as nb_etudiants
+            FROM modules m
+            JOIN formations f ON m.formation_id = f.id
+            JOIN departments d ON f.dept_id = d.id
+            {effectifs}
+            {filtre}
+            ORDER BY RAND()
+            LIMIT %s
+        """
         
         modules = db.execute_query(query, params, fetch=True)
         
@@ -376,48 +369,107 @@ def generate_edt_automatique(nb_examens=10, mode_generation="Automatique", dept_
         
         examens_crees = []
         date_base = datetime.now() + timedelta(days=7)
-        heures = ["09:00", "14:00", "16:00"]
-        salles = ['Amphi A', 'Salle 101', 'Salle 102', 'Salle 201', 'Labo Info 1']
-        
-        profs = db.execute_query("SELECT id, nom FROM professeurs ORDER BY RAND() LIMIT 5", fetch=True)
-        if not profs:
-            profs = [{'id': 1, 'nom': 'Pr. Alami'}, {'id': 2, 'nom': 'Dr. Benani'}]
         
+        # Un module par créneau, dans l'ordre des plages horaires à partir de J+7
+        from slot_grid import SlotGrid
+        grille = SlotGrid.from_database(db, date_base, date_base + timedelta(days=len(modules) + 7))
+        if not len(grille):
+            return False, "Aucune plage horaire disponible"
+        
+        from room_allocation import RoomAllocator
+        salles = RoomAllocator.from_database(db)
+        if not salles.rooms:
+            return False, "Aucune salle disponible"
+        
+        from config import PLANNING_CONFIG
+        from supervision import SupervisorAssigner
+        duree = PLANNING_CONFIG['exam_duration']
+        surveillants = SupervisorAssigner.from_database(db)
+        if not surveillants.professors:
+            return False, "Aucun professeur disponible"
+        surveillants.preload(db.execute_query("SELECT prof_id, date_exam, heure, duree FROM examens", fetch=True))
+        job.report(force=True, etape="Placement des modules")
+        
+        # Examens des étudiants en bitsets : aucun étudiant n'a deux examens le même jour
+        from availability import StudentAvailability
+        disponibilites = StudentAvailability.from_database(db, grille)
+        
+        rows = []
+        erreurs = []
+        sans_creneau = 0
         for i, module in enumerate(modules):
-            date_exam = date_base + timedelta(days=i//3)
-            heure = heures[i % 3]
-            salle = salles[i % len(salles)]
-            prof = profs[i % len(profs)]
-            
-            exam_data = {
-                'Module': module['nom'],
-                'Département': module['departement'],
-                'Date': date_exam.strftime('%d/%m/%Y'),
-                'Heure': heure,
-                'Salle': salle,
-                'Professeur': prof['nom'],
-                'Durée': '90 min',
-                'Statut': 'Planifié'
-            }
-            
-            examens_crees.append(exam_data)
+            job.report(iterations=i)
+            # Premier créneau sans conflit étudiant à partir du i-ème, avec des salles
+            libres = disponibilites.free_slots(module['id'])
+            parts = None
+            for slot in (s % len(grille) for s in range(i, i + len(grille))):
+                if not libres[slot]:
+                    continue
+                day, heure = grille.slots[slot]
+                # Best-fit avec marge, réparti sur plusieurs salles si nécessaire
+                parts = salles.assign((day, heure), day, module['nb_etudiants'] or 0)
+                if parts:
+                    break
+            if not parts:
+                sans_creneau += 1
+                erreurs.append(f"{module['nom']}: aucun créneau compatible")
+                continue
+            disponibilites.place(module['id'], slot)
+            date_exam = datetime.strptime(day, '%Y-%m-%d')
             
-            try:
-                db.execute_query("""
-                    INSERT INTO examens (module_id, salle_id, date_exam, heure, prof_id, duree, statut)
-                    VALUES (%s, (SELECT id FROM salles WHERE nom = %s), %s, %s, %s, 90, 'planifie')
-                """, (
-                    module['id'],
-                    salle,
-                    date_exam,
-                    heure,
-                    prof['id']
-                ))
-            except:
-                pass
-        
-        return True, examens_crees
+            for room, nb_etudiants in parts:
+                examens_crees.append({
+                    'Module': module['nom'],
+                    'Département': module['departement'],
+                    'Date': date_exam.strftime('%d/%m/%Y'),
+                    'Heure': heure,
+                    'Salle': room['nom'],
+                    'Étudiants': nb_etudiants,
+                    'Professeur': None,
+                    'Durée': f"{duree} min",
+                    'Statut': 'Planifié'
+                })
+                
+                rows.append({
+                    'module_id': module['id'],
+                    'dept_id': module['dept_id'],
+                    'salle_id': room['id'],
+                    'date_exam': date_exam,
+                    'heure': heure,
+                    'duree': duree,
+                    'statut': 'planifie'
+                })
+        
+        job.report(force=True, etape="Affectation des surveillants", iterations=len(modules))
+        # Surveillants du département, limites de PLANNING_CONFIG, charge équilibrée.
+        # Un module dont une salle reste sans surveillant n'est pas enregistré du tout.
+        choisis, non_affectes = surveillants.assign(rows)
+        manquants = surveillants.release_modules(rows, choisis, non_affectes)
+        for i, row in enumerate(rows):
+            # Une seule ligne par module : celle que release_modules a retenue
+            if manquants.get(row['module_id']) is row:
+                erreurs.append(f"{examens_crees[i]['Module']}: aucun surveillant dans les limites "
+                               f"le {row['date_exam']:%d/%m/%Y} à {row['heure']}, examen non enregistré")
+        examens_crees = [
+            dict(exam_data, Professeur=surveillants.by_id[choisis[i]]['nom'])
+            for i, exam_data in enumerate(examens_crees) if i in choisis
+        ]
+        rows = [dict(row, prof_id=choisis[i]) for i, row in enumerate(rows) if i in choisis]
+        
+        # Une seule transaction pour tout le lot (salles résolues en amont)
+        job.report(force=True, etape="Enregistrement")
+        if rows and not db.bulk_insert_exams(rows):
+            return False, f"Enregistrement annulé, aucun examen inséré ({db.last_error})"
+        
+        return True, {
+            'examens': examens_crees,
+            'non_planifies': sans_creneau,
+            'sans_surveillant': len(manquants),
+            'erreurs': erreurs
+        }
         
+    except JobCancelled:
+        raise
     except Exception as e:
         return False, f"Erreur lors de la génération: {str(e)}"
 
@@ -429,15 +481,15 @@ def detecter_conflits():
             SELECT 
                 e.nom, e.prenom, 
                 ex.date_exam,
-                COUNT(*) as nb_examens,
+                COUNT(DISTINCT ex.module_id) as nb_examens,
                 GROUP_CONCAT(DISTINCT m.nom SEPARATOR ', ') as modules
             FROM etudiants e
             JOIN inscriptions i ON e.id = i.etudiant_id
             JOIN examens ex ON i.module_id = ex.module_id
             JOIN modules m ON ex.module_id = m.id
             GROUP BY e.id, e.nom, e.prenom, ex.date_exam
-            HAVING COUNT(*) > 1
-            ORDER BY COUNT(*) DESC
+            HAVING COUNT(DISTINCT ex.module_id) > 1
+            ORDER BY nb_examens DESC
             LIMIT 10
         """, fetch=True)
         
@@ -489,6 +541,155 @@ def detecter_conflits():
 # PAGES PAR RÔLE (AMÉLIORÉES)
 # ====================
 
+def planifier_session(job, brouillon=False, **options):
+    """
+    Tâche de fond : planifier la session et résumer le résultat pour l'affichage.
+    
+    Avec brouillon=True, le résultat est enregistré comme version brouillon
+    au lieu d'être inséré dans la table examens.
+    """
+    from scheduler import ExamScheduler
+    
+    scheduler = ExamScheduler(db)
+    examens, erreurs = scheduler.generate_schedule(progress=job.report, save=not brouillon, **options)
+    solution = scheduler.solution
+    version = None
+    if brouillon and examens:
+        version = scheduler.save_draft(examens, label=f"{job.name} {datetime.now().strftime('%d/%m %H:%M')}")
+        if version is None:
+            erreurs = erreurs + ["Brouillon non enregistré : EDT en ligne illisible"]
+    return {
+        'examens': len(examens),
+        'version': version,
+        'erreurs': erreurs,
+        'score': solution.score if solution is not None else None,
+        'duree': solution.elapsed if solution is not None else 0.0,
+        'jain': scheduler.fairness['global']['jain'] if scheduler.fairness else None,
+        'ecart': solution.gap if solution is not None else None,
+        'ecart_glouton': solution.reference_gap if solution is not None else None
+    }
+
+def afficher_versions():
+    """Versions de l'EDT : liste, comparaison, publication et retour arrière"""
+    from versions import VersionStore, diff
+    
+    st.markdown("---")
+    st.markdown("#### 🗂️ Versions de l'EDT")
+    store = VersionStore()
+    versions = store.list_versions()
+    if not versions:
+        st.info("Aucune version : cochez « Enregistrer comme brouillon » pour essayer un EDT sans le publier")
+        return
+    
+    st.dataframe(pd.DataFrame([
+        {
+            'Version': v['version_id'],
+            'Libellé': v['label'],
+            'Statut': v['statut'],
+            'Examens': v['nb_examens'],
+            'Score': v.get('score'),
+            'Créée': v['cree']
+        }
+        for v in versions
+    ]), use_container_width=True, hide_index=True)
+    
+    libelles = {v['version_id']: f"{v['version_id']} — {v['statut']} — {v['label']}" for v in versions}
+    publiee = store.published()
+    col_v1, col_v2 = st.columns(2)
+    with col_v1:
+        choisie = st.selectbox("Version", list(libelles), format_func=libelles.get, key='version_choisie')
+    with col_v2:
+        reference = st.selectbox(
+            "Comparer avec", list(libelles), format_func=libelles.get, key='version_reference',
+            index=list(libelles).index(publiee['version_id']) if publiee else 0
+        )
+    
+    if choisie != reference:
+        ecarts = diff(store.load(reference), store.load(choisie))
+        col_d1, col_d2, col_d3, col_d4 = st.columns(4)
+        with col_d1:
+            st.metric("Modules déplacés", len(ecarts['modules_deplaces']))
+        with col_d2:
+            st.metric("Salles / surveillants changés", len(ecarts['modules_modifies']))
+        with col_d3:
+            st.metric("Modules ajoutés", len(ecarts['modules_ajoutes']))
+        with col_d4:
+            st.metric("Modules retirés", len(ecarts['modules_retires']))
+    
+    col_p1, col_p2, col_p3 = st.columns(3)
+    with col_p1:
+        if st.button("📢 Publier cette version", use_container_width=True, disabled=publiee is not None and choisie == publiee['version_id']):
+            if store.publish(db, choisie):
+                st.success(f"✅ Version {choisie} publiée")
+                st.rerun()
+            else:
+                st.error("❌ Publication annulée, l'EDT en ligne est inchangé")
+    with col_p2:
+        if st.button("↩️ Revenir à l'EDT précédent", use_container_width=True, disabled=publiee is None):
+            if store.rollback(db):
+                st.success("✅ EDT précédent republié")
+                st.rerun()
+            else:
+                st.error("❌ Aucun EDT précédent disponible")
+    with col_p3:
+        if st.button("🗑️ Supprimer cette version", use_container_width=True):
+            if store.delete(choisie):
+                st.rerun()
+            else:
+                st.warning("La version publiée ne peut pas être supprimée")
+
+def suivre_tache(cle):
+    """
+    Afficher l'avancement de la tâche de fond dont l'identifiant est dans st.session_state[cle].
+    
+    La page est rafraîchie chaque seconde (voir rafraichir_taches) tant que
+    la tâche tourne ; le calcul lui-même ne bloque jamais le script.
+    
+    Returns:
+        le résultat de la tâche une fois terminée, sinon None
+    """
+    from jobs import get_runner
+    
+    job_id = st.session_state.get(cle)
+    if not job_id:
+        return None
+    runner = get_runner()
+    etat = runner.status(job_id)
+    if etat is None:
+        # Serveur redémarré : le résultat a pu être enregistré sur disque
+        return runner.result(job_id)
+    
+    progression = etat['progression']
+    if etat['statut'] in ('en attente', 'en cours'):
+        etape = f" — {progression['etape']}" if 'etape' in progression else ""
+        st.info(f"⏳ {etat['nom']} : {etat['statut']} depuis {etat['duree']}s{etape}")
+        col_t1, col_t2, col_t3 = st.columns(3)
+        with col_t1:
+            if 'meilleur_score' in progression:
+                st.metric("Meilleur score", f"{progression['meilleur_score']:,.0f}")
+        with col_t2:
+            if 'iterations' in progression or 'generation' in progression:
+                st.metric("Itérations", f"{progression.get('iterations', progression.get('generation')):,}")
+        with col_t3:
+            if st.button("⏹️ Annuler", key=f"{cle}_annuler"):
+                runner.cancel(job_id)
+        st.session_state['taches_actives'] = True
+        return None
+    
+    if etat['statut'] == 'échoué':
+        st.error(f"❌ {etat['nom']} : {etat['erreur']}")
+    elif etat['statut'] == 'annulé':
+        st.warning(f"⏹️ {etat['nom']} annulée, aucune modification enregistrée")
+    else:
+        return runner.result(job_id)
+    return None
+
+def rafraichir_taches():
+    """Relancer le script dans une seconde si une tâche de fond affichée tourne encore"""
+    if st.session_state.pop('taches_actives', False):
+        time.sleep(1)
+        st.rerun()
+
 def page_tableau_bord():
     """Tableau de bord principal"""
     st.markdown('<h1 class="main-header">Tableau de Bord</h1>', unsafe_allow_html=True)
@@ -734,6 +935,89 @@ def page_vice_doyen_ameliorer():
             st.markdown('</div>', unsafe_allow_html=True)
             st.success("Notification envoyée à tous les départements et professeurs")
 
+def charger_verificateur_incremental():
+    """
+    Photographie de l'EDT et compteurs incrémentaux, gardés en session tant
+    que la table examens n'a pas été modifiée (par cette page ou un autre
+    écrivain : génération, réparation, publication d'une version...).
+    """
+    from database import table_version
+    
+    version = table_version('examens')
+    if st.session_state.get('edt_snapshot_version') != version:
+        from constraints import ConstraintChecker, ScheduleSnapshot
+        
+        snapshot = ScheduleSnapshot.from_database(db)
+        st.session_state['edt_snapshot'] = snapshot
+        st.session_state['verificateur_incremental'] = ConstraintChecker(db, conflicts=snapshot.conflicts).incremental(snapshot)
+        st.session_state['edt_snapshot_version'] = version
+    return st.session_state['edt_snapshot'], st.session_state['verificateur_incremental']
+
+def afficher_deplacement_examen(dept_id):
+    """Prévisualiser l'effet du déplacement d'un examen sur les contraintes"""
+    st.markdown("#### ✏️ Déplacer un examen")
+    
+    snapshot, verificateur = charger_verificateur_incremental()
+    dept_exams = db.execute_query("""
+        SELECT e.id FROM examens e
+        JOIN modules m ON e.module_id = m.id
+        JOIN formations f ON m.formation_id = f.id
+        WHERE f.dept_id = %s
+    """, (dept_id,), fetch=True)
+    dept_ids = {row['id'] for row in dept_exams}
+    exams = snapshot.exams[snapshot.exams['id'].isin(dept_ids)] if len(snapshot.exams) else snapshot.exams
+    if exams.empty:
+        st.info("Aucun examen planifié pour ce département")
+        return
+    
+    exams_by_id = {exam['id']: exam for exam in exams.to_dict('records')}
+    exam_id = st.selectbox(
+        "Examen",
+        list(exams_by_id),
+        format_func=lambda i: f"{exams_by_id[i]['module']} - {exams_by_id[i]['date_exam']} {str(exams_by_id[i]['heure'])[:5]}"
+    )
+    before = exams_by_id[exam_id]
+    salles = snapshot.rooms['nom'].to_dict()
+    
+    col_date, col_heure, col_salle = st.columns(3)
+    with col_date:
+        new_date = st.date_input("Nouvelle date", value=pd.to_datetime(before['date_exam']).date())
+    with col_heure:
+        from config import PLANNING_CONFIG
+        new_heure = st.selectbox("Nouvelle heure", PLANNING_CONFIG['exam_start_hours'])
+    with col_salle:
+        salle_ids = list(salles)
+        new_salle = st.selectbox(
+            "Nouvelle salle",
+            salle_ids,
+            index=salle_ids.index(before['salle_id']) if before['salle_id'] in salle_ids else 0,
+            format_func=lambda i: salles[i]
+        )
+    
+    after = dict(before, date_exam=str(new_date), heure=new_heure, salle_id=new_salle)
+    before = dict(before, date_exam=str(before['date_exam']))
+    
+    debut = time.perf_counter()
+    delta = verificateur.check_exam_delta(before, after, apply=False)
+    duree_ms = (time.perf_counter() - debut) * 1000
+    
+    col_new, col_resolved = st.columns(2)
+    with col_new:
+        st.metric("⚠️ Nouvelles violations", len(delta['new']), help=f"Calculé en {duree_ms:.2f} ms")
+    with col_resolved:
+        st.metric("✅ Violations résolues", len(delta['resolved']))
+    if delta['new']:
+        st.dataframe(pd.DataFrame(delta['new']), use_container_width=True)
+    
+    if st.button("💾 Appliquer le déplacement", disabled=bool(delta['new'])):
+        # L'écriture change la version de la table examens : la photographie est
+        # relue au prochain affichage, avec les types de la base (heure en timedelta)
+        db.execute_query(
+            "UPDATE examens SET date_exam = %s, heure = %s, salle_id = %s WHERE id = %s",
+            (after['date_exam'], after['heure'], after['salle_id'], exam_id)
+        )
+        st.success("✅ Examen déplacé")
+
 def page_chef_departement(dept_id):
     """Page pour le Chef de Département"""
     user = st.session_state.get('user', {})
@@ -845,7 +1129,11 @@ def page_chef_departement(dept_id):
                 st.info("Impression lancée")
         with col_action3:
             if st.button("✏️ Modifier planning", use_container_width=True):
+                st.session_state['chef_edition'] = True
                 st.warning("Mode édition activé")
+        
+        if st.session_state.get('chef_edition'):
+            afficher_deplacement_examen(dept_id)
     
     with tab2:
         st.markdown("### Conflits et alertes - Analyse par formation")
@@ -1087,58 +1375,143 @@ def page_admin_ameliorer():
                 max_exam_jour_prof = st.slider("Max examens/jour professeur", 1, 5, 3)
                 pref_type_salle = st.multiselect("Types de salles préférés", ["Amphi", "Salle TD", "Laboratoire", "Salle spéciale"], default=["Amphi", "Salle TD"])
         
+        st.markdown("---")
+        st.markdown("#### 🧩 Planification complète de la session")
+        
+        from planning import STRATEGIES, available_strategies
+        from config import PLANNING_CONFIG
+        
+        algorithmes = available_strategies()
+        col_algo1, col_algo2, col_algo3, col_algo4 = st.columns(4)
+        with col_algo1:
+            algorithme = st.selectbox(
+                "Algorithme",
+                algorithmes,
+                index=algorithmes.index(PLANNING_CONFIG['default_algorithm']) if PLANNING_CONFIG['default_algorithm'] in algorithmes else 0,
+                format_func=lambda nom: STRATEGIES[nom].label
+            )
+        with col_algo2:
+            session_debut = st.date_input("Début de session", datetime.strptime(PLANNING_CONFIG['start_date'], '%Y-%m-%d'))
+        with col_algo3:
+            session_fin = st.date_input("Fin de session", datetime.strptime(PLANNING_CONFIG['end_date'], '%Y-%m-%d'))
+        with col_algo4:
+            nb_departs = st.number_input("Départs parallèles", 1, os.cpu_count() or 1, 1,
+                                         help="Graines indépendantes, une par cœur ; la meilleure solution est gardée")
+        
+        par_departement = dept_selected is None and st.checkbox(
+            "Décomposer par département",
+            help="Chaque département est planifié en parallèle, puis les étudiants et salles partagés sont réconciliés"
+        )
+        brouillon = st.checkbox(
+            "Enregistrer comme brouillon",
+            help="Le résultat devient une version à comparer et publier, l'EDT en ligne n'est pas modifié"
+        )
+        
+        if st.button("🧩 Planifier toute la session", use_container_width=True):
+            from jobs import get_runner
+            
+            dept_ids = {d['nom']: d['id'] for d in get_departments()}
+            st.session_state['tache_session'] = get_runner().submit(
+                f"Planification ({STRATEGIES[algorithme].label})",
+                planifier_session,
+                start_date=session_debut.strftime('%Y-%m-%d'),
+                end_date=session_fin.strftime('%Y-%m-%d'),
+                dept_id=dept_ids.get(dept_selected),
+                algorithm=algorithme,
+                workers=int(nb_departs),
+                by_department=par_departement,
+                brouillon=brouillon
+            )
+        
+        resultat_session = suivre_tache('tache_session')
+        if resultat_session is not None:
+            if resultat_session['score'] is not None:
+                score = resultat_session['score']
+                col_res1, col_res2, col_res3, col_res4 = st.columns(4)
+                with col_res1:
+                    st.metric("Examens planifiés", resultat_session['examens'])
+                with col_res2:
+                    st.metric("Modules non planifiés", score['non_planifies'])
+                with col_res3:
+                    st.metric("Score (plus bas = meilleur)", f"{score['total']:,.0f}", help=f"Calculé en {resultat_session['duree']:.2f}s")
+                with col_res4:
+                    if resultat_session['jain'] is not None:
+                        st.metric("Équité surveillance (Jain)", resultat_session['jain'])
+            if resultat_session.get('ecart') is not None:
+                message = f"📐 Écart d'optimalité prouvé : {resultat_session['ecart']:.1%}"
+                if resultat_session.get('ecart_glouton') is not None:
+                    message += f" (glouton : {resultat_session['ecart_glouton']:.1%})"
+                st.info(message)
+            if resultat_session.get('version'):
+                st.success(f"🗂️ Brouillon {resultat_session['version']} enregistré, voir « Versions de l'EDT »")
+            for erreur in resultat_session['erreurs'][:20]:
+                st.warning(erreur)
+        
+        afficher_versions()
+        
         st.markdown("---")
         col_btn1, col_btn2, col_btn3 = st.columns([1, 2, 1])
         
         with col_btn2:
             if st.button("🚀 Lancer la génération automatique", use_container_width=True, type="primary"):
-                with st.spinner("Génération en cours..."):
-                    time.sleep(3)
-                    
-                    success, result = generate_edt_automatique(
-                        nb_examens=nb_examens,
-                        mode_generation=mode_generation,
-                        dept_selected=dept_selected
+                from jobs import get_runner
+                
+                st.session_state['tache_generation'] = get_runner().submit(
+                    "Génération automatique",
+                    generate_edt_automatique,
+                    nb_examens=nb_examens,
+                    mode_generation=mode_generation,
+                    dept_selected=dept_selected
+                )
+        
+        resultat_generation = suivre_tache('tache_generation')
+        if resultat_generation is not None:
+            success, result = resultat_generation
+            
+            if success:
+                rapport, result = result, result['examens']
+                st.success(f"✅ {len(result)} examens générés avec succès !")
+                if rapport['non_planifies'] or rapport['sans_surveillant']:
+                    st.warning(f"⚠️ {rapport['non_planifies']} modules sans créneau ni salle, "
+                               f"{rapport['sans_surveillant']} modules sans surveillant disponible (non enregistrés)")
+                    for erreur in rapport['erreurs'][:20]:
+                        st.warning(erreur)
+                
+                st.markdown("#### 📋 Résultats de la génération")
+                df_result = pd.DataFrame(result)
+                st.dataframe(df_result, use_container_width=True, height=300)
+                
+                col_stat1, col_stat2, col_stat3, col_stat4 = st.columns(4)
+                with col_stat1:
+                    st.metric("Examens générés", len(result))
+                with col_stat2:
+                    st.metric("Départements", len(set([r['Département'] for r in result])))
+                with col_stat3:
+                    st.metric("Jours nécessaires", len(set([r['Date'] for r in result])))
+                with col_stat4:
+                    st.metric("Salles utilisées", len(set([r['Salle'] for r in result])))
+                
+                st.markdown("---")
+                st.markdown("#### 📥 Export et validation")
+                col_exp1, col_exp2 = st.columns(2)
+                
+                with col_exp1:
+                    export_format = st.selectbox("Format d'export", ["CSV", "Excel", "JSON", "PDF"])
+                
+                with col_exp2:
+                    csv = df_result.to_csv(index=False)
+                    st.download_button(
+                        label="📥 Télécharger le planning",
+                        data=csv,
+                        file_name=f"planning_examens_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                        mime="text/csv",
+                        use_container_width=True
                     )
-                    
-                    if success:
-                        st.success(f"✅ {len(result)} examens générés avec succès !")
-                        
-                        st.markdown("#### 📋 Résultats de la génération")
-                        df_result = pd.DataFrame(result)
-                        st.dataframe(df_result, use_container_width=True, height=300)
-                        
-                        col_stat1, col_stat2, col_stat3, col_stat4 = st.columns(4)
-                        with col_stat1:
-                            st.metric("Examens générés", len(result))
-                        with col_stat2:
-                            st.metric("Départements", len(set([r['Département'] for r in result])))
-                        with col_stat3:
-                            st.metric("Jours nécessaires", len(set([r['Date'] for r in result])))
-                        with col_stat4:
-                            st.metric("Salles utilisées", len(set([r['Salle'] for r in result])))
-                        
-                        st.markdown("---")
-                        st.markdown("#### 📥 Export et validation")
-                        col_exp1, col_exp2 = st.columns(2)
-                        
-                        with col_exp1:
-                            export_format = st.selectbox("Format d'export", ["CSV", "Excel", "JSON", "PDF"])
-                        
-                        with col_exp2:
-                            csv = df_result.to_csv(index=False)
-                            st.download_button(
-                                label="📥 Télécharger le planning",
-                                data=csv,
-                                file_name=f"planning_examens_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                                mime="text/csv",
-                                use_container_width=True
-                            )
-                        
-                        if st.button("💾 Sauvegarder dans la base de données", use_container_width=True):
-                            st.success("Planning sauvegardé avec succès")
-                    else:
-                        st.error(f"❌ Échec de la génération : {result}")
+                
+                if st.button("💾 Sauvegarder dans la base de données", use_container_width=True):
+                    st.success("Planning sauvegardé avec succès")
+            else:
+                st.error(f"❌ Échec de la génération : {result}")
     
     with tab2:
         st.markdown('<h3 class="section-header">⚡ Optimisation Avancée des Ressources</h3>', unsafe_allow_html=True)
@@ -1148,6 +1521,36 @@ def page_admin_ameliorer():
         st.markdown("Améliorer l'EDT existant en optimisant l'utilisation des ressources et en réduisant les conflits.")
         st.markdown('</div>', unsafe_allow_html=True)
         
+        st.markdown("#### 🔁 Recherche locale sur l'EDT en base")
+        
+        from planning import STRATEGIES, available_strategies
+        
+        recherches = [nom for nom in available_strategies() if nom in ('annealing', 'genetic')]
+        col_rl1, col_rl2 = st.columns(2)
+        with col_rl1:
+            recherche = st.selectbox("Méthode", recherches, format_func=lambda nom: STRATEGIES[nom].label)
+        with col_rl2:
+            budget = st.slider("Budget de temps (s)", 5, 120, 30)
+        
+        if recherches and st.button("🔁 Améliorer l'EDT existant", use_container_width=True):
+            from jobs import get_runner
+            from scheduler import ExamScheduler
+            
+            st.session_state['tache_optimisation'] = get_runner().submit(
+                f"{STRATEGIES[recherche].label} ({budget}s)",
+                lambda job, **options: ExamScheduler(db).optimize_schedule(progress=job.report, **options),
+                time_budget=budget,
+                algorithm=recherche
+            )
+        
+        messages = suivre_tache('tache_optimisation')
+        if messages:
+            st.success(messages[0])
+            for message in messages[1:]:
+                st.write(f"- {message}")
+        
+        st.markdown("---")
+        
         algo_choice = st.selectbox(
             "Algorithme d'optimisation",
             [
@@ -1298,6 +1701,38 @@ def page_admin_ameliorer():
                 else:
                     st.success("✅ Aucun conflit détecté !")
         
+        st.markdown("---")
+        st.markdown("#### 🩹 Réparation après indisponibilité")
+        st.caption("Seuls les examens touchés (et au besoin leurs voisins de conflit) sont replanifiés ; le reste de l'EDT ne bouge pas.")
+        
+        salles_liste = db.execute_query("SELECT id, nom, disponibilite FROM salles ORDER BY nom", fetch=True) or []
+        profs_liste = db.execute_query("SELECT id, nom, prenom FROM professeurs ORDER BY nom", fetch=True) or []
+        col_rep1, col_rep2 = st.columns(2)
+        with col_rep1:
+            salles_hs = st.multiselect(
+                "Salles indisponibles", [s['id'] for s in salles_liste],
+                default=[s['id'] for s in salles_liste if not s.get('disponibilite', 1)],
+                format_func=lambda i: next(s['nom'] for s in salles_liste if s['id'] == i)
+            )
+        with col_rep2:
+            profs_absents = st.multiselect(
+                "Professeurs absents", [p['id'] for p in profs_liste],
+                format_func=lambda i: next(f"{p['nom']} {p['prenom']}" for p in profs_liste if p['id'] == i)
+            )
+        
+        if st.button("🩹 Réparer l'EDT", use_container_width=True, disabled=not (salles_hs or profs_absents)):
+            from scheduler import ExamScheduler
+            
+            if salles_hs:
+                db.execute_query(
+                    f"UPDATE salles SET disponibilite = 0 WHERE id IN ({', '.join(['%s'] * len(salles_hs))})",
+                    tuple(salles_hs)
+                )
+            examens, erreurs = ExamScheduler(db).repair_schedule(salles_hs, profs_absents)
+            st.success(f"✅ {len(examens)} examens réécrits")
+            for erreur in erreurs[:20]:
+                st.warning(erreur)
+        
         st.markdown("---")
         st.markdown("#### 🛠️ Outils de résolution avancés")
         
@@ -1318,6 +1753,25 @@ def page_admin_ameliorer():
             
             if st.button("📈 Générer statistiques conflits", use_container_width=True):
                 st.success("Statistiques générées")
+        
+        st.markdown("---")
+        st.markdown("#### 📏 Conformité aux contraintes")
+        
+        if st.button("📏 Calculer le score de conformité", use_container_width=True):
+            from constraints import ConstraintChecker
+            
+            debut = time.perf_counter()
+            resultats = ConstraintChecker(db, vectorized=True).check_all_constraints()
+            duree_ms = (time.perf_counter() - debut) * 1000
+            
+            st.metric("Score de conformité", f"{resultats['compliance_score']:.0f}%", help=f"Calculé en {duree_ms:.0f} ms")
+            for nom, resultat in resultats.items():
+                if nom == 'compliance_score':
+                    continue
+                if resultat['passed']:
+                    st.success(resultat['message'])
+                else:
+                    st.error(resultat['message'])
     
     with tab4:
         st.markdown('<h3 class="section-header">📊 Analytics & Tableaux de Bord Avancés</h3>', unsafe_allow_html=True)
@@ -1444,6 +1898,8 @@ def page_admin_ameliorer():
             
             if st.button("⚠️ Sauvegarde complète", use_container_width=True, type="secondary"):
                 st.success("Sauvegarde lancée en arrière-plan")
+    
+    rafraichir_taches()
 
 def page_consultation():
     """Page de consultation pour tous"""
@@ -5,6 +5,7 @@ import json
 import os
 from datetime import datetime
 from config import DB_CONFIG, ROLES_CONFIG
+from database import get_pool
 
 class AuthSystem:
     def __init__(self, db_config=None):
@@ -42,8 +43,15 @@ class AuthSystem:
             self.create_demo_users()
     
     def connect_db(self):
-        """Établit une connexion à la base de données."""
+        """
+        Emprunte une connexion au pool partagé.
+        
+        Appeler conn.close() rend la connexion au pool au lieu de la fermer.
+        Une configuration spécifique (db_config) ouvre une connexion dédiée.
+        """
         try:
+            if self.db_config is DB_CONFIG:
+                return get_pool().get_connection()
             conn = mysql.connector.connect(**self.db_config)
             return conn
         except mysql.connector.Error as err:
@@ -510,19 +518,22 @@ class AuthSystem:
             return False
         
         # Supprimer de la base de données
-        try:
-            conn = self.connect_db()
-            if conn:
+        conn = self.connect_db()
+        if conn:
+            try:
                 cursor = conn.cursor()
                 cursor.execute(
                     "UPDATE utilisateurs SET is_active = FALSE WHERE username = %s",
                     (username,)
                 )
                 conn.commit()
-                cursor.close()
+            except mysql.connector.Error as err:
+                print(f"❌ Erreur lors de la suppression de l'utilisateur: {err}")
+            finally:
+                # Toujours rendre la connexion au pool, même après une erreur
+                if 'cursor' in locals():
+                    cursor.close()
                 conn.close()
-        except:
-            pass
         
         # Supprimer du cache
         del self.users[username]
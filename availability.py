@@ -0,0 +1,131 @@
+import numpy as np
+from config import PLANNING_CONFIG
+from conflict_matrix import ConflictMatrix
+from slot_grid import SlotGrid
+
+# Bit b de chaque mot uint64
+BITS = np.uint64(1) << np.arange(64, dtype=np.uint64)
+
+class StudentAvailability:
+    """
+    Disponibilité de chaque étudiant en bitsets numpy (uint64).
+
+    - day_bits  : étudiants × ⌈jours / 64⌉, bit d levé si l'étudiant a un examen le jour d
+    - slot_bits : étudiants × ⌈créneaux / 64⌉, bit s levé s'il a un examen au créneau s
+
+    « Le module M peut-il aller le jour D ? » devient un OU des mots des
+    étudiants de M (une opération vectorisée) au lieu d'une requête SQL
+    par étudiant et par date (DatabaseManager.check_student_conflict).
+    Les jours et créneaux sont les indices d'une SlotGrid.
+    """
+
+    def __init__(self, conflicts, grid, config=None):
+        """
+        Args:
+            conflicts (ConflictMatrix): inscriptions en mémoire
+            grid (SlotGrid | list): créneaux de la session
+        """
+        self.config = config or PLANNING_CONFIG
+        self.conflicts = conflicts
+        self.grid = grid if isinstance(grid, SlotGrid) else SlotGrid(grid)
+        self.per_day = self.config['max_exams_per_day_student'] <= 1
+        nb_students = len(conflicts.student_ids)
+        self.day_bits = np.zeros((nb_students, self.grid.nb_days // 64 + 1), dtype=np.uint64)
+        self.slot_bits = np.zeros((nb_students, len(self.grid) // 64 + 1), dtype=np.uint64)
+        self.placed = {}  # module_id -> [créneaux]
+
+    @classmethod
+    def from_database(cls, db, grid, conflicts=None, config=None):
+        """Construire les bitsets à partir des examens déjà en base (deux lectures au plus)"""
+        availability = cls(conflicts or ConflictMatrix.from_database(db), grid, config)
+        exams = db.execute_query("SELECT DISTINCT module_id, date_exam, heure FROM examens", fetch=True)
+        for exam in exams or []:
+            slot = availability.grid.lookup(exam['date_exam'], exam['heure'])
+            if slot >= 0:
+                availability.place(exam['module_id'], slot)
+        return availability
+
+    def _rows(self, module_id):
+        """Lignes (indices d'étudiants) des inscrits d'un module"""
+        index = self.conflicts.module_index.get(module_id)
+        if index is None:
+            return np.empty(0, dtype=np.int64)
+        matrix = self.conflicts.enrollment_t
+        return matrix.indices[matrix.indptr[index]:matrix.indptr[index + 1]]
+
+    @staticmethod
+    def _unpack(words, size):
+        """Mots uint64 -> tableau booléen de `size` bits"""
+        return ((words[:, None] & BITS) != 0).ravel()[:size]
+
+    # ===== TESTS =====
+
+    def busy_days(self, module_id):
+        """Jours (booléens) où au moins un inscrit du module a déjà un examen"""
+        words = np.bitwise_or.reduce(self.day_bits[self._rows(module_id)], axis=0)
+        return self._unpack(words, self.grid.nb_days)
+
+    def busy_slots(self, module_id):
+        """Créneaux (booléens) où au moins un inscrit du module a déjà un examen"""
+        words = np.bitwise_or.reduce(self.slot_bits[self._rows(module_id)], axis=0)
+        return self._unpack(words, len(self.grid))
+
+    def free_slots(self, module_id):
+        """
+        Créneaux où le module ne crée aucun conflit étudiant : jour libre pour
+        tous ses inscrits (au plus un examen par jour), sinon créneau libre.
+        """
+        if self.per_day:
+            return ~self.busy_days(module_id)[self.grid.day]
+        return ~self.busy_slots(module_id)
+
+    def can_place(self, module_id, slot):
+        """Vrai si aucun inscrit du module n'a d'examen sur le jour (ou le créneau) de `slot`"""
+        if self.per_day:
+            day = int(self.grid.day[slot])
+            words, bit = self.day_bits[:, day >> 6], BITS[day & 63]
+        else:
+            words, bit = self.slot_bits[:, slot >> 6], BITS[slot & 63]
+        return not (words[self._rows(module_id)] & bit).any()
+
+    def is_busy(self, student_id, day):
+        """Vrai si l'étudiant a déjà un examen le jour `day` (indice dans la grille)"""
+        row = self.conflicts.student_index.get(student_id)
+        return row is not None and bool(self.day_bits[row, day >> 6] & BITS[day & 63])
+
+    # ===== MISE À JOUR =====
+
+    def place(self, module_id, slot):
+        """Marquer les inscrits du module occupés au créneau `slot` et sur son jour"""
+        rows = self._rows(module_id)
+        day = int(self.grid.day[slot])
+        self.day_bits[rows, day >> 6] |= BITS[day & 63]
+        self.slot_bits[rows, slot >> 6] |= BITS[slot & 63]
+        self.placed.setdefault(module_id, []).append(slot)
+
+    def remove(self, module_id, slot):
+        """
+        Retirer un examen placé. Les bits de ses inscrits sont recalculés à
+        partir des autres examens du même jour (un étudiant peut en avoir plusieurs).
+        """
+        slots = self.placed.get(module_id)
+        if not slots or slot not in slots:
+            return
+        slots.remove(slot)
+        if not slots:
+            del self.placed[module_id]
+
+        rows = self._rows(module_id)
+        day = int(self.grid.day[slot])
+        self.day_bits[rows, day >> 6] &= ~BITS[day & 63]
+        self.slot_bits[rows, slot >> 6] &= ~BITS[slot & 63]
+
+        same_day = [(m, s) for m, placed in self.placed.items() for s in placed
+                    if self.grid.day[s] == day and m in self.conflicts.module_index]
+        if not same_day or not len(rows):
+            return
+        taken = self.conflicts.enrollment[rows][:, [self.conflicts.module_index[m] for m, _ in same_day]].toarray() > 0
+        self.day_bits[rows[taken.any(axis=1)], day >> 6] |= BITS[day & 63]
+        same_slot = [i for i, (_, s) in enumerate(same_day) if s == slot]
+        if same_slot:
+            self.slot_bits[rows[taken[:, same_slot].any(axis=1)], slot >> 6] |= BITS[slot & 63]
@@ -0,0 +1,356 @@
+import argparse
+import json
+import math
+import os
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from config import BENCHMARK_CONFIG, DATA_DIR, PLANNING_CONFIG
+from conflict_matrix import ConflictMatrix
+from constraints import ConstraintChecker, ScheduleSnapshot
+from database import DatabaseManager
+from planning import ProblemModel, available_strategies, get_strategy
+from slot_grid import SlotGrid
+from sqlite_backend import SQLitePool, load_university
+from supervision import SupervisorAssigner
+
+# Type de salle -> (part des salles, capacité)
+ROOM_MIX = {
+    'Amphithéâtre': (0.1, 200),
+    'Salle de cours': (0.6, 35),
+    'Laboratoire': (0.3, 25),
+}
+
+class SyntheticUniversity:
+    """
+    Université synthétique générée en mémoire, reproductible (graine fixe).
+
+    Les tables suivent le schéma de LABaseDeDonées.sql : departments,
+    formations, modules, salles et professeurs en listes de dicts ;
+    etudiants et inscriptions en colonnes numpy (jusqu'à des millions de lignes).
+    Chaque étudiant suit `modules_per_student` modules de sa formation ; une
+    part `cross_enrollment` des inscriptions va à un module d'une formation
+    du même département.
+    """
+
+    def __init__(self, nb_students=1000, nb_departments=5, formations_per_department=None,
+                 modules_per_formation=8, modules_per_student=6, cross_enrollment=0.05,
+                 room_mix=None, seats_ratio=0.15, nb_professors=None, seed=0):
+        """
+        Args:
+            nb_students (int): nombre d'étudiants
+            formations_per_department (int, optional): défaut : une formation pour 200 étudiants
+            modules_per_student (int): densité d'inscription (modules par étudiant)
+            room_mix (dict, optional): {type: (part des salles, capacité)} (défaut ROOM_MIX)
+            seats_ratio (float): places offertes par créneau, en part des étudiants
+            nb_professors (int, optional): défaut : un pour deux modules
+        """
+        rng = np.random.default_rng(seed)
+        self.params = {
+            'nb_etudiants': nb_students, 'nb_departements': nb_departments,
+            'modules_par_formation': modules_per_formation, 'modules_par_etudiant': modules_per_student,
+            'inscriptions_croisees': cross_enrollment, 'graine': seed,
+        }
+        per_department = formations_per_department or max(1, round(nb_students / (200 * nb_departments)))
+        nb_formations = nb_departments * per_department
+        nb_modules = nb_formations * modules_per_formation
+
+        self.departments = [{'id': d + 1, 'nom': f"Département {d + 1}"} for d in range(nb_departments)]
+        self.formations = [
+            {'id': f + 1, 'nom': f"Formation {f + 1}", 'dept_id': f // per_department + 1,
+             'nb_modules': modules_per_formation}
+            for f in range(nb_formations)
+        ]
+        module_formation = np.arange(nb_modules) // modules_per_formation
+
+        # Étudiants : formation tirée au hasard, modules sans remise dans la formation
+        student_formation = rng.integers(nb_formations, size=nb_students)
+        self.etudiants = {
+            'id': np.arange(1, nb_students + 1),
+            'formation_id': student_formation + 1,
+            'promo': rng.integers(2023, 2026, size=nb_students),
+        }
+        taken = min(modules_per_student, modules_per_formation)
+        choice = np.argsort(rng.random((nb_students, modules_per_formation)), axis=1)[:, :taken]
+        enrolled = student_formation[:, None] * modules_per_formation + choice
+        cross = rng.random(enrolled.shape) < cross_enrollment
+        department = np.broadcast_to(student_formation[:, None] // per_department, enrolled.shape)[cross]
+        formation = department * per_department + rng.integers(per_department, size=len(department))
+        enrolled[cross] = formation * modules_per_formation + rng.integers(modules_per_formation, size=len(formation))
+        # Doublons (inscription croisée sur un module déjà suivi) retirés, tri par (étudiant, module)
+        keys = np.sort(np.repeat(np.arange(nb_students, dtype=np.int64), taken) * nb_modules + enrolled.ravel())
+        keys = keys[np.concatenate([[True], keys[1:] != keys[:-1]])]
+        self.inscriptions = {'etudiant_id': keys // nb_modules + 1, 'module_id': keys % nb_modules + 1}
+
+        counts = np.bincount(keys % nb_modules, minlength=nb_modules)
+        self.modules = [
+            {'id': m + 1, 'nom': f"Module {m + 1}", 'formation_id': int(module_formation[m]) + 1,
+             'dept_id': self.formations[module_formation[m]]['dept_id'], 'nb_etudiants': int(counts[m])}
+            for m in range(nb_modules)
+        ]
+
+        room_mix = room_mix or ROOM_MIX
+        mean_capacity = sum(share * capacity for share, capacity in room_mix.values()) / sum(
+            share for share, _ in room_mix.values())
+        nb_rooms = max(len(room_mix), math.ceil(nb_students * seats_ratio / mean_capacity))
+        self.salles = []
+        for kind, (share, capacity) in room_mix.items():
+            for _ in range(max(1, round(nb_rooms * share))):
+                room_id = len(self.salles) + 1
+                self.salles.append({'id': room_id, 'nom': f"{kind} {room_id}", 'capacite': capacity,
+                                    'type': kind, 'disponibilite': 1})
+
+        nb_professors = nb_professors or max(nb_departments, nb_modules // 2)
+        self.professeurs = [
+            {'id': p + 1, 'nom': f"Professeur {p + 1}", 'prenom': "", 'dept_id': p % nb_departments + 1}
+            for p in range(nb_professors)
+        ]
+
+    def conflicts(self):
+        """Matrice de conflits des inscriptions générées"""
+        return ConflictMatrix(self.inscriptions['etudiant_id'], self.inscriptions['module_id'])
+
+    def model(self, start_date='2025-06-02', nb_days=28, conflicts=None, config=None):
+        """ProblemModel de la session [start_date, start_date + nb_days[ (heures de la configuration)"""
+        config = config or PLANNING_CONFIG
+        start = datetime.strptime(start_date, '%Y-%m-%d')
+        grid = SlotGrid.from_config(start, start + timedelta(days=nb_days - 1), config)
+        return ProblemModel(self.modules, conflicts or self.conflicts(), grid, self.salles,
+                            self.professeurs, config=config)
+
+    def describe(self):
+        """Taille de l'instance"""
+        return {
+            **self.params,
+            'nb_formations': len(self.formations),
+            'nb_modules': len(self.modules),
+            'nb_inscriptions': len(self.inscriptions['module_id']),
+            'nb_salles': len(self.salles),
+            'nb_professeurs': len(self.professeurs),
+        }
+
+# ===== MESURES =====
+
+def measure(func, *args, memory=True, **kwargs):
+    """
+    Exécuter func en mesurant le temps écoulé et le pic de mémoire Python
+    (tracemalloc, tableaux numpy compris).
+
+    Returns:
+        tuple: (résultat, secondes, pic en Mo ou None)
+    """
+    if memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1] / 2 ** 20 if memory else None
+        if memory:
+            tracemalloc.stop()
+    return result, round(elapsed, 4), peak if peak is None else round(peak, 2)
+
+def solution_exams(solution):
+    """Examens d'une solution (une ligne par salle), surveillants affectés par SupervisorAssigner"""
+    model = solution.model
+    exams = []
+    for module_id, (slot, parts) in solution.assignment.items():
+        date_exam, heure = model.slots[slot]
+        for room, _ in parts:
+            exams.append({'id': len(exams) + 1, 'module_id': module_id, 'module': model.modules[module_id]['nom'],
+                          'dept_id': model.modules[module_id]['dept_id'], 'salle_id': room['id'],
+                          'date_exam': date_exam, 'heure': heure, 'duree': model.config['exam_duration']})
+    chosen, _ = SupervisorAssigner(model.professors).assign(exams)
+    for index, exam in enumerate(exams):
+        exam['prof_id'] = chosen.get(index)
+    return exams
+
+def check_solution(university, solution, conflicts):
+    """ConstraintChecker (vérifications vectorisées) sur l'EDT d'une solution"""
+    snapshot = ScheduleSnapshot(
+        pd.DataFrame(solution_exams(solution),
+                     columns=['id', 'module_id', 'module', 'prof_id', 'salle_id', 'date_exam', 'heure', 'duree']),
+        pd.DataFrame(university.salles, columns=['id', 'nom', 'capacite']),
+        pd.DataFrame([{'id': p['id'], 'professeur': p['nom']} for p in university.professeurs],
+                     columns=['id', 'professeur']),
+        conflicts
+    )
+    return ConstraintChecker(None, vectorized=True, conflicts=conflicts).check_all_constraints_snapshot(snapshot)
+
+def run_benchmark(university, strategies=None, time_limit=None, seed=0, nb_days=28, memory=True, sql=False):
+    """
+    Exécuter les stratégies et le ConstraintChecker sur une université synthétique.
+
+    Avec sql=True, le chemin SQL (chargement, ProblemModel.from_database,
+    ConstraintChecker sur requêtes) est aussi mesuré sur une base SQLite
+    embarquée, avec la solution de la première stratégie.
+
+    Returns:
+        dict: instance, construction du modèle et, par stratégie, temps, pic
+              de mémoire, conflits étudiants, jours utilisés et vérification
+    """
+    time_limit = time_limit or BENCHMARK_CONFIG['time_limit']
+    strategies = strategies or [name for name in available_strategies() if name != 'manual']
+
+    conflicts, conflicts_time, conflicts_memory = measure(university.conflicts, memory=memory)
+    model, model_time, model_memory = measure(university.model, nb_days=nb_days, conflicts=conflicts, memory=memory)
+    report = {
+        'instance': {**university.describe(), 'nb_creneaux': len(model.slots), 'nb_jours': model.nb_days},
+        'construction': {
+            'matrice_conflits': {'temps_s': conflicts_time, 'memoire_mo': conflicts_memory},
+            'modele': {'temps_s': model_time, 'memoire_mo': model_memory},
+        },
+        'strategies': {},
+    }
+
+    first = None
+    for name in strategies:
+        strategy = get_strategy(name, time_limit=time_limit, seed=seed)
+        solution, elapsed, peak = measure(strategy.solve, model, memory=memory)
+        first = first or solution
+        constraints, check_time, check_memory = measure(check_solution, university, solution, conflicts,
+                                                        memory=memory)
+        report['strategies'][name] = {
+            'temps_s': elapsed,
+            'memoire_mo': peak,
+            'conflits_etudiants': solution.score['student_conflicts'],
+            'jours': solution.score['room_optimization'],
+            'non_planifies': solution.score['non_planifies'],
+            'score': solution.total,
+            'verification': {
+                'temps_s': check_time,
+                'memoire_mo': check_memory,
+                'violations': {key: len(value['violations']) for key, value in constraints.items()
+                               if isinstance(value, dict)},
+                'conformite': constraints['compliance_score'],
+            },
+        }
+        print(f"  {name}: {elapsed:.2f}s, {solution.score['student_conflicts']} conflits, "
+              f"{solution.score['room_optimization']} jours")
+
+    if sql:
+        report['sql'] = run_sql_benchmark(university, first, seed, nb_days, memory)
+        print("  sql: " + ', '.join(f"{step} {result['temps_s']:.2f}s" for step, result in report['sql'].items()))
+    return report
+
+def run_sql_benchmark(university, solution=None, seed=0, nb_days=28, memory=True):
+    """
+    Mesurer les lectures SQL de l'application sur une base SQLite en mémoire
+    (schéma de LABaseDeDonées.sql, données de l'université synthétique).
+
+    Returns:
+        dict: chargement, module_stats, ProblemModel.from_database, enregistrement
+              de la solution et ConstraintChecker (requêtes SQL), temps et mémoire
+    """
+    pool = SQLitePool(path=':memory:', data=False)
+    db = DatabaseManager(pool=pool)
+    try:
+        _, load_time, load_memory = measure(load_university, pool, university, seed, memory=memory)
+        _, stats_time, stats_memory = measure(db.setup_module_stats, memory=memory)
+        start = datetime.strptime('2025-06-02', '%Y-%m-%d')
+        _, model_time, model_memory = measure(ProblemModel.from_database, db, start,
+                                              start + timedelta(days=nb_days - 1), memory=memory)
+        report = {
+            'chargement': {'temps_s': load_time, 'memoire_mo': load_memory},
+            'module_stats': {'temps_s': stats_time, 'memoire_mo': stats_memory},
+            'modele': {'temps_s': model_time, 'memoire_mo': model_memory},
+        }
+        if solution is not None:
+            _, save_time, save_memory = measure(db.bulk_insert_exams, solution_exams(solution), memory=memory)
+            constraints, check_time, check_memory = measure(ConstraintChecker(db).check_all_constraints,
+                                                            memory=memory)
+            report['enregistrement'] = {'temps_s': save_time, 'memoire_mo': save_memory}
+            report['verification'] = {
+                'temps_s': check_time,
+                'memoire_mo': check_memory,
+                'violations': {key: len(value['violations']) for key, value in constraints.items()
+                               if isinstance(value, dict)},
+            }
+        return report
+    finally:
+        pool.close()
+
+# ===== COMPARAISON =====
+
+def compare(previous, current, tolerance=None):
+    """
+    Régressions d'une exécution par rapport à une précédente (mêmes instances).
+
+    Un temps ou une mémoire qui augmente de plus de `tolerance` (relatif), ou
+    plus de conflits, de jours ou de modules non planifiés, est signalé.
+
+    Returns:
+        list: messages, vide si aucune régression
+    """
+    tolerance = BENCHMARK_CONFIG['tolerance'] if tolerance is None else tolerance
+    before = {run['nom']: run for run in previous.get('executions', [])}
+    regressions = []
+    for run in current.get('executions', []):
+        old = before.get(run['nom'])
+        if old is None:
+            continue
+        for name, result in run['strategies'].items():
+            reference = old['strategies'].get(name)
+            if reference is None:
+                continue
+            for key in ('temps_s', 'memoire_mo'):
+                if reference.get(key) and result.get(key) and result[key] > reference[key] * (1 + tolerance):
+                    regressions.append(f"{run['nom']} / {name} : {key} {reference[key]} -> {result[key]}")
+            for key in ('conflits_etudiants', 'jours', 'non_planifies'):
+                if result[key] > reference[key]:
+                    regressions.append(f"{run['nom']} / {name} : {key} {reference[key]} -> {result[key]}")
+        for step, result in run.get('sql', {}).items():
+            reference = old.get('sql', {}).get(step, {})
+            if reference.get('temps_s') and result['temps_s'] > reference['temps_s'] * (1 + tolerance):
+                regressions.append(f"{run['nom']} / sql {step} : temps_s {reference['temps_s']} -> {result['temps_s']}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banc d'essai des stratégies de planification")
+    parser.add_argument('--students', type=int, nargs='+', default=BENCHMARK_CONFIG['students'],
+                        help="tailles d'université (nombre d'étudiants)")
+    parser.add_argument('--seeds', type=int, nargs='+', default=BENCHMARK_CONFIG['seeds'])
+    parser.add_argument('--strategies', nargs='+', default=None, help="défaut : toutes sauf manual")
+    parser.add_argument('--time-limit', type=float, default=None, help="secondes par stratégie")
+    parser.add_argument('--density', type=int, default=6, help="modules par étudiant")
+    parser.add_argument('--days', type=int, default=28, help="jours calendaires de la session")
+    parser.add_argument('--no-memory', action='store_true', help="sans tracemalloc (temps plus justes)")
+    parser.add_argument('--sql', action='store_true', help="mesurer aussi les requêtes sur une base SQLite embarquée")
+    parser.add_argument('--output', help="fichier JSON (défaut : résultats horodatés)")
+    parser.add_argument('--compare', help="JSON d'une exécution précédente")
+    args = parser.parse_args(argv)
+
+    results = {'date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'), 'executions': []}
+    for nb_students in args.students:
+        for seed in args.seeds:
+            name = f"{nb_students}-etudiants-graine-{seed}"
+            print(f"🏁 {name}")
+            university = SyntheticUniversity(nb_students, modules_per_student=args.density, seed=seed)
+            report = run_benchmark(university, args.strategies, args.time_limit, seed, args.days,
+                                   memory=not args.no_memory, sql=args.sql)
+            results['executions'].append({'nom': name, **report})
+
+    output = args.output or os.path.join(
+        BENCHMARK_CONFIG['results_dir'] or os.path.join(DATA_DIR, 'benchmarks'),
+        f"benchmark-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=1)
+    print(f"✅ Résultats enregistrés dans {output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare(json.load(f), results)
+        for message in regressions:
+            print(f"❌ Régression : {message}")
+        if not regressions:
+            print("✅ Aucune régression")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -41,6 +41,60 @@ DB_CONFIGS = {
     }
 }
 
+# Moteur de DatabaseManager : 'mysql' (serveur) ou 'sqlite' (base embarquée, tests hors ligne)
+DB_BACKEND = os.environ.get('EXAM_DB_BACKEND', 'mysql')
+
+# Base SQLite embarquée (sqlite_backend.py)
+SQLITE_CONFIG = {
+    'path': ':memory:',  # fichier de la base, ou ':memory:'
+    'dump': None,  # dump MySQL chargé dans une base vide (défaut : LABaseDeDonées.sql)
+}
+
+# Pool de connexions partagé (database.ConnectionPool)
+DB_POOL_CONFIG = {
+    'pool_name': 'exam_pool',
+    'pool_size': 8,  # connexions ouvertes à la création du pool
+    'idle_check_seconds': 30,  # ping uniquement si la connexion est inactive depuis 30 s
+    'borrow_timeout': 10,  # secondes d'attente si toutes les connexions sont empruntées
+}
+
+# Cache des lectures (database.QueryCache), un par pool, activé par DatabaseManager(cache=True)
+QUERY_CACHE_CONFIG = {
+    'max_entries': 256,  # éviction LRU au-delà
+    'ttl_seconds': 60,  # durée de vie maximale d'un résultat
+    'max_rows': 10000,  # les résultats plus gros ne sont pas mis en cache
+}
+
+# Tâches de planification en arrière-plan (jobs.py)
+JOB_CONFIG = {
+    'max_workers': 2,  # calculs simultanés
+    'progress_interval': 0.5,  # secondes minimum entre deux rapports de progression
+    'max_history': 50,  # tâches terminées gardées en mémoire (les résultats restent sur disque)
+    'results_dir': None,  # défaut : DATA_DIR/jobs
+}
+
+# Versions de l'EDT (versions.py)
+VERSION_CONFIG = {
+    'directory': None,  # défaut : DATA_DIR/versions
+    'keep_archived': 20,  # versions archivées conservées (les plus récentes)
+}
+
+# Banc d'essai sur universités synthétiques (benchmark.py)
+BENCHMARK_CONFIG = {
+    'students': [1000, 10000],  # tailles d'université par défaut
+    'seeds': [1, 2],  # graines des instances générées
+    'time_limit': 10,  # secondes par stratégie
+    'tolerance': 0.2,  # hausse relative de temps / mémoire signalée comme régression
+    'results_dir': None,  # défaut : DATA_DIR/benchmarks
+}
+
+# Chargement en masse de données synthétiques (load_data.py)
+DATA_LOAD_CONFIG = {
+    'method': 'infile',  # 'infile' : LOAD DATA LOCAL INFILE ; 'insert' : INSERT multi-lignes
+    'chunk_size': 5000,  # lignes par INSERT multi-lignes
+    'csv_dir': None,  # défaut : DATA_DIR/chargement
+}
+
 # ====================
 # CONFIGURATION DES DÉPARTEMENTS (NOUVEAU)
 # ====================
@@ -294,10 +348,16 @@ PLANNING_CONFIG = {
     # Contraintes salles
     'min_room_capacity_margin': 0.1,  # 10% de marge
     'max_room_usage_per_day': 4,  # max 4 examens par salle par jour
+    'max_rooms_per_exam': 3,  # un module trop grand peut être réparti sur 3 salles
     
     # Algorithmes
     'default_algorithm': 'greedy',
-    'available_algorithms': ['greedy', 'backtracking', 'genetic', 'manual'],
+    'available_algorithms': ['greedy', 'backtracking', 'annealing', 'genetic', 'exact', 'manual'],
+    'parallel_workers': None,  # départs parallèles, défaut : nombre de cœurs
+    'time_per_module': 0.005,  # limite par défaut des métaheuristiques : secondes par module à placer...
+    'min_time_limit': 2,  # ... bornée entre 2 s
+    'max_time_limit': 30,  # ... et 30 s
+    'exact_max_modules': 400,  # au-delà, le programme linéaire est trop gros
     
     # Priorités
     'priorities': {
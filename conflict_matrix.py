@@ -0,0 +1,144 @@
+import numpy as np
+from scipy import sparse
+
+class ConflictMatrix:
+    """
+    Matrices d'inscriptions et de conflits en mémoire.
+
+    - enrollment : matrice creuse CSR étudiants × modules (1 si inscrit)
+    - conflicts  : matrice CSR modules × modules = Mᵀ·M, nombre d'étudiants
+                   partagés (la diagonale contient l'effectif du module)
+    """
+
+    def __init__(self, etudiant_ids, module_ids):
+        """
+        Args:
+            etudiant_ids (array): colonne etudiant_id des inscriptions
+            module_ids (array): colonne module_id des inscriptions (même longueur)
+        """
+        etudiant_ids = np.asarray(etudiant_ids, dtype=np.int64)
+        module_ids = np.asarray(module_ids, dtype=np.int64)
+
+        self.student_ids, rows = np.unique(etudiant_ids, return_inverse=True)
+        self.module_ids, cols = np.unique(module_ids, return_inverse=True)
+        self.student_index = {int(s): i for i, s in enumerate(self.student_ids)}
+        self.module_index = {int(m): i for i, m in enumerate(self.module_ids)}
+
+        shape = (len(self.student_ids), len(self.module_ids))
+        enrollment = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, cols)), shape=shape
+        )
+        enrollment.data[:] = 1  # doublons éventuels (étudiant, module)
+        self.enrollment = enrollment
+        self.enrollment_t = enrollment.T.tocsr()
+        self.conflicts = (self.enrollment_t @ enrollment).tocsr()
+        self.counts = np.asarray(self.conflicts.diagonal()).ravel()
+
+    @classmethod
+    def from_database(cls, db):
+        """Construire la matrice en une seule lecture de la table inscriptions"""
+        rows = db.execute_query("SELECT etudiant_id, module_id FROM inscriptions", fetch=True)
+        return cls(
+            [row['etudiant_id'] for row in rows],
+            [row['module_id'] for row in rows]
+        )
+
+    # ===== REQUÊTES =====
+
+    def enrollment_count(self, module_id):
+        """Nombre d'étudiants inscrits à un module"""
+        index = self.module_index.get(module_id)
+        return int(self.counts[index]) if index is not None else 0
+
+    def shared_students(self, module1, module2):
+        """Nombre d'étudiants inscrits aux deux modules"""
+        i = self.module_index.get(module1)
+        j = self.module_index.get(module2)
+        if i is None or j is None:
+            return 0
+        return int(self.conflicts[i, j])
+
+    def has_conflict(self, module1, module2):
+        """Vrai si au moins un étudiant est inscrit aux deux modules"""
+        return module1 != module2 and self.shared_students(module1, module2) > 0
+
+    def neighbors(self, module_id):
+        """Modules en conflit avec module_id : {module_id: nb_etudiants_partages}"""
+        index = self.module_index.get(module_id)
+        if index is None:
+            return {}
+        start, end = self.conflicts.indptr[index], self.conflicts.indptr[index + 1]
+        cols = self.conflicts.indices[start:end]
+        values = self.conflicts.data[start:end]
+        return {
+            int(self.module_ids[c]): int(v)
+            for c, v in zip(cols, values) if c != index
+        }
+
+    def students_of(self, module_id):
+        """Identifiants des étudiants inscrits à un module"""
+        index = self.module_index.get(module_id)
+        if index is None:
+            return np.empty(0, dtype=np.int64)
+        start, end = self.enrollment_t.indptr[index], self.enrollment_t.indptr[index + 1]
+        return self.student_ids[self.enrollment_t.indices[start:end]]
+
+    def modules_of(self, student_id):
+        """Identifiants des modules suivis par un étudiant"""
+        index = self.student_index.get(student_id)
+        if index is None:
+            return np.empty(0, dtype=np.int64)
+        start, end = self.enrollment.indptr[index], self.enrollment.indptr[index + 1]
+        return self.module_ids[self.enrollment.indices[start:end]]
+
+    def to_graph(self, module_ids=None):
+        """
+        Graphe de conflits restreint à un ensemble de modules.
+
+        Returns:
+            dict: {module_id: {module_voisin: nb_etudiants_partages}}
+        """
+        if module_ids is None:
+            module_ids = self.module_ids.tolist()
+        graph = {int(m): {} for m in module_ids}
+        known = [m for m in graph if m in self.module_index]
+        if not known:
+            return graph
+
+        indices = np.array([self.module_index[m] for m in known])
+        sub = self.conflicts[indices][:, indices].tocsr()
+        sub.setdiag(0)
+        sub.eliminate_zeros()
+        for row, module_id in enumerate(known):
+            start, end = sub.indptr[row], sub.indptr[row + 1]
+            graph[module_id] = dict(zip(
+                (known[c] for c in sub.indices[start:end]),
+                sub.data[start:end].tolist()
+            ))
+        return graph
+
+    def student_group_counts(self, module_groups):
+        """
+        Compter, pour chaque étudiant, ses examens par groupe (jour, créneau...).
+
+        Args:
+            module_groups: {module_id: indice_de_groupe} ou liste de paires
+                           (module_id, indice_de_groupe) ; un module présent
+                           plusieurs fois dans un groupe compte plusieurs examens
+
+        Returns:
+            scipy.sparse.csr_matrix: étudiants × groupes, nombre d'examens
+        """
+        if isinstance(module_groups, dict):
+            module_groups = module_groups.items()
+        pairs = list(module_groups)
+        nb_groups = max((g for _, g in pairs), default=-1) + 1
+        known = [(self.module_index[m], g) for m, g in pairs if m in self.module_index]
+        if not known:
+            return sparse.csr_matrix((len(self.student_ids), nb_groups), dtype=np.int32)
+        rows, cols = zip(*known)
+        grouping = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, cols)),
+            shape=(len(self.module_ids), nb_groups)
+        )
+        return (self.enrollment @ grouping).tocsr()
@@ -1,9 +1,147 @@
+from collections import defaultdict
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+from config import PLANNING_CONFIG
+from conflict_matrix import ConflictMatrix
+
+# Minutes par jour pour les instants absolus (jour ordinal × 1440 + minute)
+MINUTES_PER_DAY = 1440
+
+def add_time_columns(exams):
+    """
+    Ajouter à un DataFrame d'examens les colonnes entières utilisées par les balayages :
+    start / end (minutes dans la journée), day (ordinal), abs_start / abs_end (minutes absolues).
+    """
+    exams = exams.copy()
+    heures = exams['heure'].astype(str)
+    heures = heures.where(heures.str.count(':') != 1, heures + ':00')  # 'HH:MM' -> 'HH:MM:00'
+    exams['start'] = pd.to_timedelta(heures).dt.total_seconds().astype(np.int64) // 60
+    exams['end'] = exams['start'] + exams['duree'].astype(np.int64)
+    exams['day'] = pd.to_datetime(exams['date_exam']).map(pd.Timestamp.toordinal).astype(np.int64)
+    exams['abs_start'] = exams['day'] * MINUTES_PER_DAY + exams['start']
+    exams['abs_end'] = exams['day'] * MINUTES_PER_DAY + exams['end']
+    return exams
+
+def heure_key(value):
+    """Heure d'examen (TIME -> timedelta, 'HH:MM' ou 'HH:MM:SS') en minutes depuis minuit"""
+    if isinstance(value, timedelta):
+        return int(value.total_seconds()) // 60
+    parts = str(value).split(':')
+    return int(parts[0]) * 60 + int(parts[1])
+
+def find_overlaps(keys, starts, ends):
+    """
+    Trouver les paires d'intervalles qui se chevauchent sur une même ressource.
+
+    Tri par (ressource, début) puis recherche dichotomique de la fin de chaque
+    intervalle : O(n log n + k) pour k paires, sans comparer toutes les paires.
+    Deux examens qui se suivent (fin == début) ne sont pas en conflit.
+
+    Args:
+        keys (array): identifiant de ressource (salle, professeur...) par intervalle
+        starts (array): début de chaque intervalle (entier, minutes absolues)
+        ends (array): fin de chaque intervalle
+
+    Returns:
+        tuple: (first, second) tableaux d'indices dans l'ordre d'entrée
+    """
+    keys = np.asarray(keys)
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.asarray(ends, dtype=np.int64)
+    if len(starts) < 2:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+
+    # Chaque ressource occupe sa propre plage de valeurs : rang × span + début
+    _, rank = np.unique(keys, return_inverse=True)
+    origin = starts.min()
+    span = max(int(ends.max()), int(starts.max())) - origin + 1
+    order = np.lexsort((starts, rank))
+    sorted_starts = rank[order] * span + (starts[order] - origin)
+    sorted_ends = rank[order] * span + (ends[order] - origin)
+
+    last = np.searchsorted(sorted_starts, sorted_ends, side='left')
+    positions = np.arange(len(order))
+    nb_pairs = np.maximum(last - positions - 1, 0)
+    first = np.repeat(positions, nb_pairs)
+    offsets = np.arange(nb_pairs.sum()) - np.repeat(np.cumsum(nb_pairs) - nb_pairs, nb_pairs)
+    second = first + 1 + offsets
+    return order[first], order[second]
+
+class ScheduleSnapshot:
+    """
+    Photographie en mémoire de l'EDT : examens, salles, professeurs et
+    effectifs des modules, chargés une seule fois pour les vérifications vectorisées.
+    """
+    
+    def __init__(self, exams, rooms, professors, conflicts):
+        """
+        Args:
+            exams (DataFrame): id, module_id, module, prof_id, salle_id, date_exam, heure, duree
+            rooms (DataFrame): id, nom, capacite
+            professors (DataFrame): id, professeur
+            conflicts (ConflictMatrix): inscriptions en mémoire
+        """
+        self.conflicts = conflicts
+        self.rooms = rooms.set_index('id')
+        self.professors = professors.set_index('id')
+        
+        exams = exams.copy()
+        if len(exams):
+            exams = add_time_columns(exams)
+            exams['nb_etudiants'] = exams['module_id'].map(conflicts.enrollment_count).astype(np.int64)
+            exams['capacite'] = exams['salle_id'].map(self.rooms['capacite']).fillna(0).astype(np.int64)
+            exams['salle'] = exams['salle_id'].map(self.rooms['nom'])
+            exams['professeur'] = exams['prof_id'].map(self.professors['professeur'])
+        self.exams = exams
+    
+    @classmethod
+    def from_database(cls, db, conflicts=None):
+        """Charger l'EDT courant en quatre lectures (examens, salles, professeurs, inscriptions)"""
+        exams = db.execute_query("""
+            SELECT e.id, e.module_id, m.nom as module, e.prof_id, e.salle_id,
+                   e.date_exam, e.heure, e.duree
+            FROM examens e
+            JOIN modules m ON e.module_id = m.id
+        """, fetch=True)
+        rooms = db.execute_query("SELECT id, nom, capacite FROM salles", fetch=True)
+        professors = db.execute_query(
+            "SELECT id, CONCAT(nom, ' ', prenom) as professeur FROM professeurs",
+            fetch=True
+        )
+        return cls(
+            pd.DataFrame(exams, columns=['id', 'module_id', 'module', 'prof_id', 'salle_id', 'date_exam', 'heure', 'duree']),
+            pd.DataFrame(rooms, columns=['id', 'nom', 'capacite']),
+            pd.DataFrame(professors, columns=['id', 'professeur']),
+            conflicts or ConflictMatrix.from_database(db)
+        )
+
 class ConstraintChecker:
-    def __init__(self, db_manager):
+    def __init__(self, db_manager, vectorized=False, conflicts=None):
+        """
+        Args:
+            db_manager: DatabaseManager
+            vectorized (bool): évaluer les contraintes sur une photographie en
+                               mémoire plutôt qu'avec une requête SQL par contrainte
+            conflicts (ConflictMatrix, optional): matrice d'inscriptions déjà chargée
+        """
         self.db = db_manager
+        self.vectorized = vectorized
+        self.conflicts = conflicts
+    
+    def incremental(self, snapshot=None):
+        """Vérificateur incrémental initialisé sur l'EDT courant (voir IncrementalChecker)"""
+        snapshot = snapshot or ScheduleSnapshot.from_database(self.db, self.conflicts)
+        return IncrementalChecker.from_snapshot(snapshot)
     
     def check_all_constraints(self):
         """Vérifier toutes les contraintes"""
+        if self.vectorized:
+            snapshot = ScheduleSnapshot.from_database(self.db, self.conflicts)
+            self.conflicts = snapshot.conflicts
+            return self.check_all_constraints_snapshot(snapshot)
+        
         constraints = {
             'student_daily_limit': self.check_student_daily_limit(),
             'professor_daily_limit': self.check_professor_daily_limit(),
@@ -11,8 +149,10 @@ class ConstraintChecker:
             'room_availability': self.check_room_availability(),
             'time_slot_conflicts': self.check_time_slot_conflicts()
         }
-        
-        # Calculer le score de conformité
+        return self._with_compliance(constraints)
+    
+    def _with_compliance(self, constraints):
+        """Ajouter le score de conformité au dictionnaire des résultats"""
         total_checks = len(constraints)
         passed_checks = sum(1 for check in constraints.values() if check['passed'])
         constraints['compliance_score'] = (passed_checks / total_checks) * 100
@@ -20,16 +160,20 @@ class ConstraintChecker:
         return constraints
     
     def check_student_daily_limit(self):
-        """Vérifier qu'aucun étudiant n'a plus d'un examen par jour"""
+        """
+        Vérifier qu'aucun étudiant n'a plus d'un examen par jour
+        (un module réparti sur plusieurs salles compte pour un examen)
+        """
         query = """
-        SELECT e.id, CONCAT(e.nom, ' ', e.prenom) as etudiant, ex.date_exam, COUNT(*) as nb_examens
+        SELECT e.id, CONCAT(e.nom, ' ', e.prenom) as etudiant, ex.date_exam, COUNT(DISTINCT ex.module_id) as nb_examens
         FROM etudiants e
         JOIN inscriptions i ON e.id = i.etudiant_id
         JOIN examens ex ON i.module_id = ex.module_id
         GROUP BY e.id, ex.date_exam
-        HAVING nb_examens > 1
+        HAVING nb_examens > %s
         """
-        violations = self.db.execute_query(query, fetch=True)
+        # Même limite que la vérification vectorisée
+        violations = self.db.execute_query(query, (PLANNING_CONFIG['max_exams_per_day_student'],), fetch=True)
         
         # CORRECTION : Gestion du cas None
         if violations is None:
@@ -44,15 +188,16 @@ class ConstraintChecker:
         }
     
     def check_professor_daily_limit(self):
-        """Vérifier qu'aucun professeur n'a plus de 3 examens par jour"""
+        """Vérifier qu'aucun professeur n'a plus de max_exams_per_day_prof examens par jour"""
+        limit = PLANNING_CONFIG['max_exams_per_day_prof']
         query = """
         SELECT p.id, CONCAT(p.nom, ' ', p.prenom) as professeur, ex.date_exam, COUNT(*) as nb_examens
         FROM professeurs p
         JOIN examens ex ON p.id = ex.prof_id
         GROUP BY p.id, ex.date_exam
-        HAVING nb_examens > 3
+        HAVING nb_examens > %s
         """
-        violations = self.db.execute_query(query, fetch=True)
+        violations = self.db.execute_query(query, (limit,), fetch=True)
         
         # CORRECTION : Gestion du cas None
         if violations is None:
@@ -63,26 +208,51 @@ class ConstraintChecker:
         return {
             'passed': violations_count == 0,
             'violations': violations,
-            'message': f"{violations_count} professeurs dépassent 3 examens par jour" if violations_count > 0 else "OK: Tous les professeurs respectent la limite"
+            'message': f"{violations_count} professeurs dépassent {limit} examens par jour" if violations_count > 0 else "OK: Tous les professeurs respectent la limite"
         }
     
     def check_room_capacity(self):
-        """Vérifier que les salles ont la capacité suffisante"""
-        query = """
-        SELECT 
-            e.id as examen_id,
-            m.nom as module,
-            s.nom as salle,
-            s.capacite,
-            COUNT(DISTINCT i.etudiant_id) as nb_etudiants,
-            s.capacite - COUNT(DISTINCT i.etudiant_id) as surplus
-        FROM examens e
-        JOIN modules m ON e.module_id = m.id
-        JOIN salles s ON e.salle_id = s.id
-        LEFT JOIN inscriptions i ON m.id = i.module_id
-        GROUP BY e.id
-        HAVING nb_etudiants > s.capacite
         """
+        Vérifier que les salles ont la capacité suffisante
+        (places cumulées quand un module est réparti sur plusieurs salles)
+        """
+        if self.db.has_module_stats():
+            # Effectifs précalculés : pas d'agrégation sur inscriptions
+            query = """
+            SELECT 
+                MIN(e.id) as examen_id,
+                m.nom as module,
+                GROUP_CONCAT(s.nom SEPARATOR ', ') as salle,
+                SUM(s.capacite) as capacite,
+                ms.nb_etudiants,
+                SUM(s.capacite) - ms.nb_etudiants as surplus
+            FROM examens e
+            JOIN modules m ON e.module_id = m.id
+            JOIN salles s ON e.salle_id = s.id
+            JOIN module_stats ms ON ms.module_id = m.id
+            GROUP BY e.module_id, e.date_exam, e.heure, m.nom, ms.nb_etudiants
+            HAVING ms.nb_etudiants > SUM(s.capacite)
+            """
+        else:
+            query = """
+            SELECT 
+                MIN(e.id) as examen_id,
+                m.nom as module,
+                GROUP_CONCAT(s.nom SEPARATOR ', ') as salle,
+                SUM(s.capacite) as capacite,
+                c.nb_etudiants,
+                SUM(s.capacite) - c.nb_etudiants as surplus
+            FROM examens e
+            JOIN modules m ON e.module_id = m.id
+            JOIN salles s ON e.salle_id = s.id
+            JOIN (
+                SELECT module_id, COUNT(DISTINCT etudiant_id) as nb_etudiants
+                FROM inscriptions
+                GROUP BY module_id
+            ) c ON c.module_id = m.id
+            GROUP BY e.module_id, e.date_exam, e.heure, m.nom, c.nb_etudiants
+            HAVING c.nb_etudiants > SUM(s.capacite)
+            """
         violations = self.db.execute_query(query, fetch=True)
         
         # CORRECTION : Gestion du cas None
@@ -121,39 +291,327 @@ class ConstraintChecker:
         }
     
     def check_time_slot_conflicts(self):
-        """Vérifier les chevauchements de créneaux"""
+        """Vérifier les chevauchements de créneaux sur une même salle ou un même professeur"""
         query = """
-        SELECT 
-            e1.id as examen1_id,
-            e2.id as examen2_id,
-            m1.nom as module1,
-            m2.nom as module2,
-            s1.nom as salle1,
-            s2.nom as salle2,
-            e1.date_exam,
-            e1.heure as heure1,
-            e2.heure as heure2,
-            e1.duree
-        FROM examens e1
-        JOIN examens e2 ON e1.date_exam = e2.date_exam 
-            AND e1.id < e2.id
-        JOIN modules m1 ON e1.module_id = m1.id
-        JOIN modules m2 ON e2.module_id = m2.id
-        JOIN salles s1 ON e1.salle_id = s1.id
-        JOIN salles s2 ON e2.salle_id = s2.id
-        WHERE TIME(e1.heure) BETWEEN TIME(e2.heure) AND ADDTIME(TIME(e2.heure), SEC_TO_TIME(e2.duree * 60))
-        OR TIME(e2.heure) BETWEEN TIME(e1.heure) AND ADDTIME(TIME(e1.heure), SEC_TO_TIME(e1.duree * 60))
+        SELECT e.id, e.module_id, m.nom as module, e.salle_id, s.nom as salle,
+               e.prof_id, CONCAT(p.nom, ' ', p.prenom) as professeur,
+               e.date_exam, e.heure, e.duree
+        FROM examens e
+        JOIN modules m ON e.module_id = m.id
+        LEFT JOIN salles s ON e.salle_id = s.id
+        LEFT JOIN professeurs p ON e.prof_id = p.id
         """
-        violations = self.db.execute_query(query, fetch=True)
+        # LEFT JOIN : un professeur absent ou inconnu ne retire pas l'examen du
+        # contrôle (mêmes examens que ScheduleSnapshot.from_database)
+        exams = self.db.execute_query(query, fetch=True)
         
         # CORRECTION : Gestion du cas None
-        if violations is None:
-            violations = []
+        if not exams:
+            exams = []
+        
+        return self._time_slot_conflicts(pd.DataFrame(exams))
+    
+    # ===== VÉRIFICATIONS VECTORISÉES (PHOTOGRAPHIE EN MÉMOIRE) =====
+    
+    def check_all_constraints_snapshot(self, snapshot):
+        """Évaluer les cinq contraintes sur une ScheduleSnapshot, même format que check_all_constraints"""
+        constraints = {
+            'student_daily_limit': self.check_student_daily_limit_snapshot(snapshot),
+            'professor_daily_limit': self.check_professor_daily_limit_snapshot(snapshot),
+            'room_capacity': self.check_room_capacity_snapshot(snapshot),
+            'room_availability': self.check_room_availability_snapshot(snapshot),
+            'time_slot_conflicts': self.check_time_slot_conflicts_snapshot(snapshot)
+        }
+        return self._with_compliance(constraints)
+    
+    def check_student_daily_limit_snapshot(self, snapshot):
+        """
+        Étudiants × jours = inscriptions · (modules × jours), un seul produit creux.
+        Les lignes d'un module réparti sur plusieurs salles ne comptent qu'une fois.
+        """
+        exams = snapshot.exams
+        limit = PLANNING_CONFIG['max_exams_per_day_student']
+        violations = []
+        
+        if len(exams):
+            days, day_index = np.unique(exams['day'].to_numpy(), return_inverse=True)
+            module_days = set(zip(exams['module_id'].tolist(), day_index.tolist()))
+            counts = snapshot.conflicts.student_group_counts(module_days).tocoo()
+            over = counts.data > limit
+            students = snapshot.conflicts.student_ids[counts.row[over]]
+            first_exam = exams.drop_duplicates('day').set_index('day')['date_exam']
+            dates = [first_exam[day] for day in days]
+            names = self._student_names(students.tolist())
+            violations = [
+                {
+                    'id': student,
+                    'etudiant': names.get(student, ''),
+                    'date_exam': dates[day],
+                    'nb_examens': nb
+                }
+                for student, day, nb in zip(students.tolist(), counts.col[over].tolist(), counts.data[over].tolist())
+            ]
         
         violations_count = len(violations)
+        return {
+            'passed': violations_count == 0,
+            'violations': violations,
+            'message': f"{violations_count} étudiants ont plus d'un examen par jour" if violations_count > 0 else "OK: Aucun étudiant n'a plus d'un examen par jour"
+        }
+    
+    def check_professor_daily_limit_snapshot(self, snapshot):
+        """Nombre d'examens par (professeur, jour)"""
+        limit = PLANNING_CONFIG['max_exams_per_day_prof']
+        exams = snapshot.exams
+        violations = []
+        
+        if len(exams):
+            load = exams.groupby(['prof_id', 'date_exam']).size().reset_index(name='nb_examens')
+            load = load[load['nb_examens'] > limit]
+            load['professeur'] = load['prof_id'].map(snapshot.professors['professeur'])
+            violations = load.rename(columns={'prof_id': 'id'})[['id', 'professeur', 'date_exam', 'nb_examens']].to_dict('records')
         
+        violations_count = len(violations)
         return {
             'passed': violations_count == 0,
             'violations': violations,
-            'message': f"{violations_count} chevauchements de créneaux détectés" if violations_count > 0 else "OK: Aucun chevauchement de créneaux"
-        }
\ No newline at end of file
+            'message': f"{violations_count} professeurs dépassent {limit} examens par jour" if violations_count > 0 else "OK: Tous les professeurs respectent la limite"
+        }
+    
+    def check_room_capacity_snapshot(self, snapshot):
+        """Effectif du module comparé aux places cumulées de ses salles sur le créneau"""
+        exams = snapshot.exams
+        violations = []
+        
+        if len(exams):
+            grouped = exams.groupby(['module_id', 'date_exam', 'start'], sort=False).agg(
+                examen_id=('id', 'min'),
+                module=('module', 'first'),
+                salle=('salle', lambda names: ', '.join(map(str, names))),
+                capacite=('capacite', 'sum'),
+                nb_etudiants=('nb_etudiants', 'first')
+            )
+            over = grouped[grouped['nb_etudiants'] > grouped['capacite']].copy()
+            over['surplus'] = over['capacite'] - over['nb_etudiants']
+            violations = over[
+                ['examen_id', 'module', 'salle', 'capacite', 'nb_etudiants', 'surplus']
+            ].to_dict('records')
+        
+        violations_count = len(violations)
+        return {
+            'passed': violations_count == 0,
+            'violations': violations,
+            'message': f"{violations_count} salles sont surchargées" if violations_count > 0 else "OK: Toutes les salles respectent leur capacité"
+        }
+    
+    def check_room_availability_snapshot(self, snapshot):
+        """Nombre d'utilisations par (salle, date, heure)"""
+        exams = snapshot.exams
+        violations = []
+        
+        if len(exams):
+            usage = exams.groupby(['salle_id', 'date_exam', 'heure']).size().reset_index(name='nb_utilisations')
+            usage = usage[usage['nb_utilisations'] > 1]
+            usage['nom'] = usage['salle_id'].map(snapshot.rooms['nom'])
+            violations = usage[['nom', 'date_exam', 'heure', 'nb_utilisations']].to_dict('records')
+        
+        violations_count = len(violations)
+        return {
+            'passed': violations_count == 0,
+            'violations': violations,
+            'message': f"{violations_count} conflits de salle détectés" if violations_count > 0 else "OK: Aucun conflit de salle"
+        }
+    
+    def check_time_slot_conflicts_snapshot(self, snapshot):
+        """Chevauchements par salle et par professeur sur la photographie en mémoire"""
+        return self._time_slot_conflicts(snapshot.exams)
+    
+    def _time_slot_conflicts(self, exams):
+        """Balayage des intervalles par (date, salle) puis par (date, professeur)"""
+        violations = []
+        
+        if len(exams) > 1:
+            if 'abs_start' not in exams:
+                exams = add_time_columns(exams)
+            starts = exams['abs_start'].to_numpy()
+            ends = exams['abs_end'].to_numpy()
+            columns = {
+                name: exams[name].tolist()
+                for name in ['id', 'module', 'salle', 'professeur', 'date_exam', 'heure', 'duree']
+            }
+            ids = columns['id']
+            
+            for ressource, key in [('salle', 'salle_id'), ('professeur', 'prof_id')]:
+                first, second = find_overlaps(exams[key].to_numpy(), starts, ends)
+                for i, j in zip(first.tolist(), second.tolist()):
+                    if ids[i] > ids[j]:
+                        i, j = j, i
+                    violations.append({
+                        'ressource': ressource,
+                        'examen1_id': ids[i],
+                        'examen2_id': ids[j],
+                        'module1': columns['module'][i],
+                        'module2': columns['module'][j],
+                        'salle1': columns['salle'][i],
+                        'salle2': columns['salle'][j],
+                        'professeur1': columns['professeur'][i],
+                        'professeur2': columns['professeur'][j],
+                        'date_exam': columns['date_exam'][i],
+                        'heure1': columns['heure'][i],
+                        'heure2': columns['heure'][j],
+                        'duree': columns['duree'][i]
+                    })
+        
+        violations_count = len(violations)
+        return {
+            'passed': violations_count == 0,
+            'violations': violations,
+            'message': f"{violations_count} chevauchements de créneaux détectés (même salle ou même professeur)" if violations_count > 0 else "OK: Aucun chevauchement de créneaux"
+        }
+    
+    def _student_names(self, student_ids):
+        """Noms des étudiants en violation, en une seule requête (aucun sans base, ex. benchmark.py)"""
+        if not student_ids or self.db is None:
+            return {}
+        unique_ids = sorted(set(student_ids))
+        placeholders = ', '.join(['%s'] * len(unique_ids))
+        rows = self.db.execute_query(
+            f"SELECT id, CONCAT(nom, ' ', prenom) as etudiant FROM etudiants WHERE id IN ({placeholders})",
+            tuple(unique_ids), fetch=True
+        )
+        return {row['id']: row['etudiant'] for row in rows}
+
+class IncrementalChecker:
+    """
+    Vérification incrémentale quand un seul examen est ajouté, déplacé ou supprimé.
+
+    Garde en mémoire des compteurs (étudiant × jour, professeur × jour,
+    salle × créneau, places par module × créneau) et ne met à jour que les
+    cases touchées par l'examen : le coût dépend de l'effectif du module,
+    pas de la taille de l'EDT.
+    """
+    
+    def __init__(self, exams, conflicts, room_capacities=None):
+        """
+        Args:
+            exams (list): dicts avec id, module_id, prof_id, salle_id, date_exam, heure
+            conflicts (ConflictMatrix): inscriptions en mémoire
+            room_capacities (dict, optional): {salle_id: capacite}
+        """
+        self.conflicts = conflicts
+        self.room_capacities = room_capacities or {}
+        self.max_student = PLANNING_CONFIG['max_exams_per_day_student']
+        self.max_prof = PLANNING_CONFIG['max_exams_per_day_prof']
+        self.student_day = defaultdict(int)  # modules distincts par (étudiant, jour)
+        self.module_day = defaultdict(int)  # lignes (salles) d'un module sur un jour
+        self.prof_day = defaultdict(int)
+        self.room_slot = defaultdict(int)
+        self.module_rooms = defaultdict(int)  # salles d'un module sur un créneau
+        self.module_seats = defaultdict(int)  # places cumulées de ces salles
+        for exam in exams:
+            self._apply(exam, +1)
+    
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """Initialiser les compteurs depuis une ScheduleSnapshot"""
+        exams = snapshot.exams[['id', 'module_id', 'prof_id', 'salle_id', 'date_exam', 'heure']].to_dict('records')
+        return cls(exams, snapshot.conflicts, snapshot.rooms['capacite'].to_dict())
+    
+    def _cells(self, exam):
+        """Cases de compteurs occupées par un examen"""
+        date_exam = str(exam['date_exam'])
+        heure = heure_key(exam['heure'])
+        students = self.conflicts.students_of(exam['module_id']).tolist()
+        return (
+            [('student_daily_limit', (student, date_exam)) for student in students],
+            ('professor_daily_limit', (exam['prof_id'], date_exam)),
+            ('room_availability', (exam['salle_id'], date_exam, heure)),
+            ('room_capacity', (exam['module_id'], date_exam, heure))
+        )
+    
+    def _apply(self, exam, sign):
+        student_cells, (_, prof_cell), (_, room_cell), (_, module_cell) = self._cells(exam)
+        # Les étudiants ne comptent le module que pour sa première salle du jour
+        module_day = (exam['module_id'], str(exam['date_exam']))
+        self.module_day[module_day] += sign
+        if self.module_day[module_day] == (1 if sign > 0 else 0):
+            for _, cell in student_cells:
+                self.student_day[cell] += sign
+        self.prof_day[prof_cell] += sign
+        self.room_slot[room_cell] += sign
+        self.module_rooms[module_cell] += sign
+        self.module_seats[module_cell] += sign * self.room_capacities.get(exam['salle_id'], 0)
+    
+    def _violations(self, exam):
+        """Ensemble des violations (type, case) auxquelles participe l'examen"""
+        if exam is None:
+            return set()
+        student_cells, prof_cell, room_cell, module_cell = self._cells(exam)
+        found = {c for c in student_cells if self.student_day[c[1]] > self.max_student}
+        for cell in (prof_cell, room_cell, module_cell):
+            if self._is_violated(cell):
+                found.add(cell)
+        return found
+    
+    def check_exam_delta(self, exam_before, exam_after, apply=True):
+        """
+        Évaluer l'effet d'un ajout (before=None), d'une suppression (after=None)
+        ou d'un déplacement d'examen sur les contraintes.
+        
+        Args:
+            exam_before (dict): examen avant modification, ou None
+            exam_after (dict): examen après modification, ou None
+            apply (bool): conserver la modification dans les compteurs
+                          (False = simple prévisualisation)
+        
+        Returns:
+            dict: {'passed', 'new': [...], 'resolved': [...]} où chaque violation
+                  est {'type', 'cle', 'valeur'}
+        """
+        # Cases déjà en violation à l'ancien et au nouvel emplacement
+        before = self._violations(exam_before) | self._violations(exam_after)
+        
+        if exam_before is not None:
+            self._apply(exam_before, -1)
+        if exam_after is not None:
+            self._apply(exam_after, +1)
+        
+        # Mêmes cases après modification (l'ancien emplacement peut rester ou devenir en violation)
+        after = self._violations(exam_before) | self._violations(exam_after)
+        
+        result = {
+            'passed': not after,
+            'new': [self._describe(v) for v in sorted(after - before, key=str)],
+            'resolved': [self._describe(v) for v in sorted(before - after, key=str)]
+        }
+        
+        if not apply:
+            if exam_after is not None:
+                self._apply(exam_after, -1)
+            if exam_before is not None:
+                self._apply(exam_before, +1)
+        return result
+    
+    def _is_violated(self, violation):
+        kind, cell = violation
+        if kind == 'student_daily_limit':
+            return self.student_day[cell] > self.max_student
+        if kind == 'professor_daily_limit':
+            return self.prof_day[cell] > self.max_prof
+        if kind == 'room_availability':
+            return self.room_slot[cell] > 1
+        if kind == 'room_capacity':
+            return (bool(self.room_capacities) and self.module_rooms[cell] > 0
+                    and self.module_seats[cell] < self.conflicts.enrollment_count(cell[0]))
+        return False
+    
+    def _describe(self, violation):
+        kind, cell = violation
+        counters = {
+            'student_daily_limit': self.student_day,
+            'professor_daily_limit': self.prof_day,
+            'room_availability': self.room_slot,
+            'room_capacity': self.module_seats
+        }
+        value = counters[kind][cell] if kind in counters else None
+        return {'type': kind, 'cle': cell, 'valeur': value}
@@ -1,42 +1,394 @@
 import mysql.connector
 from mysql.connector import Error
-from config import DB_CONFIG
+from collections import OrderedDict
+from contextlib import contextmanager
+from config import DB_BACKEND, DB_CONFIG, DB_POOL_CONFIG, QUERY_CACHE_CONFIG, PLANNING_CONFIG
+import queue
+import re
+import threading
 import time
 
+class PooledConnection:
+    """Connexion empruntée au pool : close() la rend au lieu de la fermer"""
+
+    def __init__(self, pool, cnx):
+        self._pool = pool
+        self._cnx = cnx
+        self.failed = False  # une Error a été levée pendant l'emprunt
+
+    def __getattr__(self, name):
+        return getattr(self._cnx, name)
+
+    def close(self):
+        """Rendre la connexion au pool (une seule fois)"""
+        if self._cnx is not None:
+            cnx, self._cnx = self._cnx, None
+            self._pool.release(cnx, self.failed)
+
+    def __del__(self):
+        # Filet de sécurité : une connexion jamais rendue réduirait le pool pour de bon
+        if self.__dict__.get('_cnx') is not None:
+            print(f"⚠️ Connexion empruntée jamais rendue au pool {self._pool.pool_name}, restituée")
+            self.failed = True
+            self.close()
+
+class ConnectionPool:
+    """
+    Pool de connexions MySQL partagé entre toutes les sessions.
+
+    Contrairement à MySQLConnectionPool.get_connection(), qui envoie un ping
+    à chaque emprunt et échoue immédiatement quand le pool est épuisé :
+    - le ping n'est fait que si la connexion est restée inactive plus de
+      `idle_check_seconds` secondes, ou si une Error a été levée pendant
+      son dernier emprunt (reconnexion si elle ne répond plus) ;
+    - l'emprunt attend qu'une connexion soit rendue (jusqu'à `borrow_timeout`).
+
+    Seule l'API publique de mysql.connector est utilisée (connect, is_connected,
+    reconnect) : aucune dépendance aux attributs internes de MySQLConnectionPool.
+    """
+
+    def __init__(self, pool_size=None, idle_check_seconds=None, borrow_timeout=None, **db_config):
+        self.idle_check_seconds = DB_POOL_CONFIG['idle_check_seconds'] if idle_check_seconds is None else idle_check_seconds
+        self.borrow_timeout = DB_POOL_CONFIG['borrow_timeout'] if borrow_timeout is None else borrow_timeout
+        self.pool_name = DB_POOL_CONFIG['pool_name']
+        self.pool_size = pool_size or DB_POOL_CONFIG['pool_size']
+        self.db_config = db_config or DB_CONFIG
+        self._idle = queue.Queue(self.pool_size)
+        try:
+            for _ in range(self.pool_size):
+                self.release(mysql.connector.connect(**self.db_config))
+        except Error:
+            # Ne pas laisser ouvertes les connexions déjà établies
+            self.close()
+            raise
+
+    def release(self, cnx, failed=False):
+        """
+        Rendre une connexion en notant l'heure de dernier usage ; après une
+        Error, elle sera vérifiée (et reconnectée) au prochain emprunt.
+        """
+        cnx.pool_last_used = None if failed else time.monotonic()
+        self._idle.put_nowait(cnx)
+
+    def get_connection(self):
+        """Emprunter une connexion ; la fermer (close) la rend au pool"""
+        try:
+            cnx = self._idle.get(timeout=self.borrow_timeout)
+        except queue.Empty:
+            raise mysql.connector.errors.PoolError("Pool de connexions épuisé")
+
+        last_used = cnx.pool_last_used
+        if last_used is None or time.monotonic() - last_used > self.idle_check_seconds:
+            try:
+                if not cnx.is_connected():
+                    cnx.reconnect()
+            except Error:
+                # Toujours suspecte : revérifiée au prochain emprunt
+                self.release(cnx, failed=True)
+                raise
+
+        return PooledConnection(self, cnx)
+
+    @contextmanager
+    def connection(self):
+        """Emprunt / restitution automatique : `with pool.connection() as conn:`"""
+        conn = self.get_connection()
+        try:
+            yield conn
+        except Error:
+            conn.failed = True
+            raise
+        finally:
+            conn.close()
+
+    def is_connected(self):
+        """Vérifier qu'une connexion du pool répond"""
+        try:
+            with self.connection() as conn:
+                return conn.is_connected()
+        except Error:
+            return False
+
+    def close(self):
+        """Fermer les connexions rendues au pool"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+# Tables citées par une requête : FROM / JOIN (lectures), INTO / UPDATE / TABLE (écritures)
+_TABLE_PATTERN = re.compile(r'\b(?:FROM|JOIN|INTO|UPDATE|TABLE)\s+`?(?:\w+`?\.`?)?(\w+)', re.IGNORECASE)
+
+# Fonctions dont le résultat change à chaque appel : requêtes jamais mises en cache
+_VOLATILE_PATTERN = re.compile(r'\b(?:RAND|NOW|CURDATE|CURTIME|UUID|SYSDATE)\s*\(', re.IGNORECASE)
+
+def query_tables(query):
+    """Ensemble des tables (en minuscules) citées par une requête SQL"""
+    return {name.lower() for name in _TABLE_PATTERN.findall(query)}
+
+# Versions des tables : incrémentées à chaque écriture faite par un DatabaseManager
+# du processus, quelle que soit l'instance ('*' : écriture sur des tables inconnues)
+_table_versions = {}
+_versions_lock = threading.Lock()
+
+def bump_tables(tables=None):
+    """Noter une écriture sur des tables (sur toutes si tables est None)"""
+    with _versions_lock:
+        for table in ('*',) if tables is None else {table.lower() for table in tables}:
+            _table_versions[table] = _table_versions.get(table, 0) + 1
+
+def table_version(table):
+    """Version courante d'une table : change à chaque écriture qui peut la modifier"""
+    with _versions_lock:
+        return _table_versions.get(table.lower(), 0) + _table_versions.get('*', 0)
+
+class QueryCache:
+    """
+    Cache LRU + TTL des résultats de lecture, partagé par les sessions.
+
+    Chaque entrée est étiquetée avec les tables qu'elle lit : une écriture
+    n'invalide que les entrées qui dépendent des tables modifiées.
+    """
+
+    def __init__(self, max_entries=None, ttl_seconds=None, max_rows=None):
+        self.max_entries = max_entries or QUERY_CACHE_CONFIG['max_entries']
+        self.ttl_seconds = QUERY_CACHE_CONFIG['ttl_seconds'] if ttl_seconds is None else ttl_seconds
+        self.max_rows = max_rows or QUERY_CACHE_CONFIG['max_rows']
+        self.entries = OrderedDict()  # clé -> (expiration, tables, lignes)
+        self.by_table = {}  # table -> clés qui la lisent
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(query, params):
+        """Clé normalisée : espaces compactés + paramètres"""
+        return ' '.join(query.split()), tuple(params or ())
+
+    def get(self, key):
+        """Résultat en cache (copie) ou None"""
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return [dict(row) for row in entry[2]]
+
+    def put(self, key, rows):
+        """Mémoriser un résultat ; les tables lues sont déduites de la requête"""
+        if len(rows) > self.max_rows or _VOLATILE_PATTERN.search(key[0]):
+            return
+        tables = query_tables(key[0])
+        with self._lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (time.monotonic() + self.ttl_seconds, tables, [dict(row) for row in rows])
+            for table in tables:
+                self.by_table.setdefault(table, set()).add(key)
+            while len(self.entries) > self.max_entries:
+                self._remove(next(iter(self.entries)))
+
+    def invalidate(self, tables=None):
+        """Supprimer les entrées qui lisent l'une des tables (toutes si tables est None)"""
+        with self._lock:
+            if tables is None:
+                self.entries.clear()
+                self.by_table.clear()
+                return
+            tables = {table.lower() for table in tables}
+            for table in list(tables):
+                tables.update(DERIVED_TABLES.get(table, ()))
+            for table in tables:
+                for key in list(self.by_table.get(table, ())):
+                    self._remove(key)
+
+    def _remove(self, key):
+        _, tables, _ = self.entries.pop(key)
+        for table in tables:
+            keys = self.by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.by_table[table]
+
+# Tables maintenues par triggers : une écriture sur la clé invalide aussi les valeurs
+DERIVED_TABLES = {
+    'inscriptions': ('module_stats',),
+    'etudiants': ('module_stats',),
+    'modules': ('module_stats',),
+}
+
+# Table de synthèse des effectifs par module et triggers qui la tiennent à jour.
+# Les suppressions en cascade ne déclenchent pas les triggers MySQL : la
+# suppression d'un étudiant décrémente donc ses modules avant la cascade.
+MODULE_STATS_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS module_stats (
+        module_id INT PRIMARY KEY,
+        formation_id INT NULL,
+        dept_id INT NULL,
+        nb_etudiants INT NOT NULL DEFAULT 0,
+        KEY idx_module_stats_formation (formation_id),
+        KEY idx_module_stats_dept (dept_id),
+        FOREIGN KEY (module_id) REFERENCES modules(id) ON DELETE CASCADE
+    )
+    """,
+    "DROP TRIGGER IF EXISTS trg_inscriptions_stats_insert",
+    """
+    CREATE TRIGGER trg_inscriptions_stats_insert AFTER INSERT ON inscriptions
+    FOR EACH ROW
+        INSERT INTO module_stats (module_id, formation_id, dept_id, nb_etudiants)
+        SELECT m.id, m.formation_id, f.dept_id, 1
+        FROM modules m LEFT JOIN formations f ON m.formation_id = f.id
+        WHERE m.id = NEW.module_id
+        ON DUPLICATE KEY UPDATE nb_etudiants = nb_etudiants + 1
+    """,
+    "DROP TRIGGER IF EXISTS trg_inscriptions_stats_delete",
+    """
+    CREATE TRIGGER trg_inscriptions_stats_delete AFTER DELETE ON inscriptions
+    FOR EACH ROW
+        UPDATE module_stats SET nb_etudiants = nb_etudiants - 1
+        WHERE module_id = OLD.module_id
+    """,
+    "DROP TRIGGER IF EXISTS trg_inscriptions_stats_update",
+    """
+    CREATE TRIGGER trg_inscriptions_stats_update AFTER UPDATE ON inscriptions
+    FOR EACH ROW
+    BEGIN
+        IF NEW.module_id <> OLD.module_id THEN
+            UPDATE module_stats SET nb_etudiants = nb_etudiants - 1 WHERE module_id = OLD.module_id;
+            INSERT INTO module_stats (module_id, formation_id, dept_id, nb_etudiants)
+            SELECT m.id, m.formation_id, f.dept_id, 1
+            FROM modules m LEFT JOIN formations f ON m.formation_id = f.id
+            WHERE m.id = NEW.module_id
+            ON DUPLICATE KEY UPDATE nb_etudiants = nb_etudiants + 1;
+        END IF;
+    END
+    """,
+    "DROP TRIGGER IF EXISTS trg_etudiants_stats_delete",
+    """
+    CREATE TRIGGER trg_etudiants_stats_delete BEFORE DELETE ON etudiants
+    FOR EACH ROW
+        UPDATE module_stats ms
+        JOIN inscriptions i ON i.module_id = ms.module_id
+        SET ms.nb_etudiants = ms.nb_etudiants - 1
+        WHERE i.etudiant_id = OLD.id
+    """,
+    "DROP TRIGGER IF EXISTS trg_modules_stats_update",
+    """
+    CREATE TRIGGER trg_modules_stats_update AFTER UPDATE ON modules
+    FOR EACH ROW
+        UPDATE module_stats
+        SET formation_id = NEW.formation_id,
+            dept_id = (SELECT dept_id FROM formations WHERE id = NEW.formation_id)
+        WHERE module_id = NEW.id
+    """,
+    "DROP TRIGGER IF EXISTS trg_formations_stats_update",
+    """
+    CREATE TRIGGER trg_formations_stats_update AFTER UPDATE ON formations
+    FOR EACH ROW
+        UPDATE module_stats SET dept_id = NEW.dept_id
+        WHERE formation_id = NEW.id
+    """,
+]
+
+# Nombre de lignes par INSERT multi-lignes pour les insertions en lot
+BULK_CHUNK_SIZE = 1000
+
+_pool = None
+_pool_lock = threading.Lock()
+_query_caches = {}  # pool -> QueryCache partagé par ses DatabaseManager(cache=True)
+
+def get_pool():
+    """Retourner le pool partagé (créé au premier appel, SQLite si DB_BACKEND = 'sqlite')"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            if DB_BACKEND == 'sqlite':
+                from sqlite_backend import SQLitePool
+                _pool = SQLitePool()
+            else:
+                _pool = ConnectionPool()
+        return _pool
+
+def get_query_cache(pool):
+    """Cache des lectures d'un pool, partagé par toutes les instances qui l'utilisent"""
+    with _pool_lock:
+        if pool not in _query_caches:
+            _query_caches[pool] = QueryCache()
+        return _query_caches[pool]
+
 class DatabaseManager:
-    def __init__(self):
+    def __init__(self, pool=None, cache=None):
+        """
+        Args:
+            pool (ConnectionPool | SQLitePool, optional): pool à utiliser (défaut : pool partagé)
+            cache (bool | QueryCache, optional): mettre en cache les lectures
+                  (True : cache du pool, partagé avec les autres instances)
+        
+        Toute écriture invalide le cache partagé du pool, même depuis une
+        instance sans cache (ExamScheduler, scripts...).
+        """
+        self.pool = pool
         self.connection = None
+        self.cache = cache or None
+        self.module_stats_ready = None
+        self.last_error = None  # message de la dernière insertion en lot annulée
         self.connect()
+        if cache is True:
+            self.cache = get_query_cache(self.pool) if self.pool is not None else None
     
     def connect(self):
-        """Établir la connexion à la base de données"""
+        """Récupérer le pool de connexions partagé"""
         try:
-            self.connection = mysql.connector.connect(**DB_CONFIG)
-            if self.connection.is_connected():
-                return True
+            self.pool = self.pool or get_pool()
+            self.connection = self.pool
+            return True
         except Error as e:
             print(f"❌ ERREUR MySQL: {e}")
             self.connection = None
         return False
     
     def execute_query(self, query, params=None, fetch=False):
-        """Exécuter une requête SQL - SIMPLE ET FIABLE"""
+        """
+        Exécuter une requête SQL sur une connexion empruntée au pool.
+        
+        Avec un cache, les lectures identiques sont servies depuis la mémoire
+        et chaque écriture invalide les lectures des tables qu'elle modifie.
+        """
+        key = None
+        if self.cache is not None and fetch:
+            key = self.cache.key(query, params)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        
         try:
-            # Si pas de connexion, tenter de se reconnecter
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return [] if fetch else 0
+            if not self.connection and not self.connect():
+                return [] if fetch else 0
             
-            cursor = self.connection.cursor(dictionary=True)
-            cursor.execute(query, params or ())
+            with self.pool.connection() as conn:
+                cursor = conn.cursor(dictionary=True)
+                try:
+                    cursor.execute(query, params or ())
+                    
+                    if fetch:
+                        result = cursor.fetchall()
+                    else:
+                        conn.commit()
+                        result = cursor.rowcount
+                finally:
+                    cursor.close()
             
-            if fetch:
-                result = cursor.fetchall()
-            else:
-                self.connection.commit()
-                result = cursor.rowcount
-            
-            cursor.close()
+            if key is not None:
+                self.cache.put(key, result)
+            elif not fetch:
+                self.invalidate_cache(query_tables(query) or None)
             return result
             
         except Error as e:
@@ -44,6 +396,112 @@ class DatabaseManager:
             # Retourner toujours une valeur sûre
             return [] if fetch else 0
     
+    @contextmanager
+    def transaction(self, tables=None):
+        """
+        Ouvrir une transaction sur une connexion du pool.
+        
+        Usage : `with db.transaction() as cursor:` ; commit à la sortie du bloc,
+        rollback si une exception est levée.
+        
+        Args:
+            tables (iterable, optional): tables modifiées, dont les lectures en
+                   cache sont invalidées au commit (tout le cache si None)
+        """
+        if not self.connection and not self.connect():
+            raise Error("Pas de connexion à la base")
+        
+        with self.pool.connection() as conn:
+            conn.start_transaction()
+            cursor = conn.cursor(dictionary=True)
+            try:
+                yield cursor
+                conn.commit()
+                self.invalidate_cache(tables)
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+    
+    def invalidate_cache(self, tables=None):
+        """
+        Noter une écriture sur des tables (toutes si None) : version des tables,
+        cache partagé du pool et cache propre à l'instance.
+        """
+        bump_tables(tables)
+        for cache in {self.cache, _query_caches.get(self.pool)} - {None}:
+            cache.invalidate(tables)
+    
+    # ===== EFFECTIFS PRÉCALCULÉS (module_stats) =====
+    
+    def setup_module_stats(self, rebuild=True):
+        """
+        Créer la table module_stats et ses triggers, puis la remplir.
+        
+        Returns:
+            bool: True si la table est utilisable
+        """
+        try:
+            if not self.connection and not self.connect():
+                return False
+            with self.pool.connection() as conn:
+                cursor = conn.cursor()
+                try:
+                    # Le pool SQLite fournit sa propre version des triggers
+                    for statement in getattr(self.pool, 'module_stats_ddl', MODULE_STATS_DDL):
+                        cursor.execute(statement)
+                    conn.commit()
+                finally:
+                    cursor.close()
+        except Error as e:
+            print(f"❌ ERREUR SQL (module_stats): {e}")
+            self.module_stats_ready = False
+            return False
+        
+        self.module_stats_ready = True
+        if rebuild:
+            self.rebuild_module_stats()
+        return True
+    
+    def rebuild_module_stats(self):
+        """
+        Recalculer entièrement module_stats depuis les inscriptions
+        (une seule transaction : les lecteurs ne voient jamais une table vide).
+        
+        Returns:
+            int: nombre de modules recalculés (0 en cas d'échec)
+        """
+        try:
+            with self.transaction(tables=('module_stats',)) as cursor:
+                cursor.execute("DELETE FROM module_stats")
+                cursor.execute("""
+                    INSERT INTO module_stats (module_id, formation_id, dept_id, nb_etudiants)
+                    SELECT m.id, m.formation_id, f.dept_id, COUNT(i.etudiant_id)
+                    FROM modules m
+                    LEFT JOIN formations f ON m.formation_id = f.id
+                    LEFT JOIN inscriptions i ON m.id = i.module_id
+                    GROUP BY m.id, m.formation_id, f.dept_id
+                """)
+                return cursor.rowcount
+        except Error as e:
+            print(f"❌ ERREUR SQL (reconstruction module_stats): {e}")
+            return 0
+    
+    def has_module_stats(self):
+        """
+        Vrai si module_stats existe. Simple détection : la table et ses triggers
+        ne sont créés que par setup_module_stats (rebuild_module_stats.py), jamais
+        pendant une lecture ; sans elle, les appelants comptent les inscriptions.
+        """
+        if not self.module_stats_ready:
+            result = self.execute_query("""
+                SELECT COUNT(*) as nb FROM information_schema.TABLES
+                WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'module_stats'
+            """, fetch=True)
+            self.module_stats_ready = bool(result and result[0]['nb'])
+        return self.module_stats_ready
+    
     # ===== MÉTHODES POUR LES DÉPARTEMENTS =====
     
     def get_all_departments(self):
@@ -94,6 +552,17 @@ class DatabaseManager:
     
     def get_modules_by_department(self, dept_id):
         """Récupérer les modules d'un département"""
+        if self.has_module_stats():
+            query = """
+            SELECT m.id, m.nom, f.nom as formation, COALESCE(ms.nb_etudiants, 0) as nb_etudiants
+            FROM modules m
+            JOIN formations f ON m.formation_id = f.id
+            LEFT JOIN module_stats ms ON ms.module_id = m.id
+            WHERE f.dept_id = %s
+            ORDER BY nb_etudiants DESC
+            """
+            return self.execute_query(query, (dept_id,), fetch=True)
+        
         query = """
         SELECT m.id, m.nom, f.nom as formation, COUNT(i.etudiant_id) as nb_etudiants
         FROM modules m
@@ -141,7 +610,7 @@ class DatabaseManager:
         SELECT 
             CONCAT(e.nom, ' ', e.prenom) as etudiant,
             ex.date_exam,
-            COUNT(*) as nb_examens
+            COUNT(DISTINCT ex.module_id) as nb_examens
         FROM etudiants e
         JOIN inscriptions i ON e.id = i.etudiant_id
         JOIN examens ex ON i.module_id = ex.module_id
@@ -149,8 +618,8 @@ class DatabaseManager:
         JOIN formations f ON m.formation_id = f.id
         WHERE f.dept_id = %s
         GROUP BY e.id, e.nom, e.prenom, ex.date_exam
-        HAVING COUNT(*) > 1
-        ORDER BY COUNT(*) DESC
+        HAVING COUNT(DISTINCT ex.module_id) > 1
+        ORDER BY nb_examens DESC
         """
         return self.execute_query(query, (dept_id,), fetch=True)
     
@@ -180,6 +649,23 @@ class DatabaseManager:
     
     def get_all_modules(self):
         """Récupérer tous les modules - MÉTHODE ESSENTIELLE"""
+        if self.has_module_stats():
+            query = """
+            SELECT 
+                m.id, 
+                m.nom, 
+                f.nom as formation,
+                d.nom as departement,
+                d.id as dept_id,
+                COALESCE(ms.nb_etudiants, 0) as nb_etudiants
+            FROM modules m
+            JOIN formations f ON m.formation_id = f.id
+            JOIN departments d ON f.dept_id = d.id
+            LEFT JOIN module_stats ms ON ms.module_id = m.id
+            ORDER BY nb_etudiants DESC
+            """
+            return self.execute_query(query, fetch=True)
+        
         query = """
         SELECT 
             m.id, 
@@ -235,7 +721,12 @@ class DatabaseManager:
         return result[0]['nb_examens'] if result and len(result) > 0 else 0
     
     def check_student_conflict(self, student_id, date_exam):
-        """Vérifier si un étudiant a déjà un examen à cette date"""
+        """
+        Vérifier si un étudiant a déjà un examen à cette date.
+        
+        Une requête par appel : pour tester de nombreux étudiants ou modules,
+        utiliser availability.StudentAvailability (bitsets en mémoire).
+        """
         query = """
         SELECT COUNT(*) as nb_examens
         FROM examens e
@@ -253,6 +744,75 @@ class DatabaseManager:
         """
         return self.execute_query(query, (module_id, prof_id, salle_id, date_exam, heure, duree))
     
+    def bulk_insert_exams(self, rows, chunk_size=BULK_CHUNK_SIZE, replace_modules=None, replace_all=False):
+        """
+        Insérer un lot d'examens en une seule transaction.
+        
+        Les salles désignées par leur nom sont résolues en une requête, puis
+        les lignes sont envoyées par paquets (executemany = INSERT multi-lignes).
+        En cas d'erreur, rien n'est inséré (rollback).
+        
+        Args:
+            rows (list): dicts avec module_id, prof_id, salle_id (ou salle = nom),
+                         date_exam, heure, et optionnellement duree, statut
+            chunk_size (int): nombre de lignes par INSERT
+            replace_modules (iterable, optional): modules dont les examens existants
+                         sont supprimés dans la même transaction (replanification)
+            replace_all (bool): remplacer toute la table examens dans la même
+                         transaction (publication d'une version)
+        
+        Returns:
+            int: nombre d'examens insérés (0 en cas d'échec, motif dans last_error)
+        """
+        rows = list(rows)
+        replace_modules = sorted(set(replace_modules or ()))
+        if not rows and not replace_modules and not replace_all:
+            return 0
+        
+        names = {row['salle'] for row in rows if row.get('salle_id') is None and row.get('salle')}
+        room_ids = {}
+        if names:
+            placeholders = ', '.join(['%s'] * len(names))
+            result = self.execute_query(
+                f"SELECT id, nom FROM salles WHERE nom IN ({placeholders})",
+                tuple(names), fetch=True
+            )
+            room_ids = {room['nom']: room['id'] for room in result}
+        
+        values = []
+        for row in rows:
+            salle_id = row.get('salle_id') or room_ids.get(row.get('salle'))
+            if salle_id is None:
+                self.last_error = f"salle inconnue '{row.get('salle')}'"
+                print(f"❌ ERREUR SQL: {self.last_error}, aucun examen inséré")
+                return 0
+            values.append((
+                row['module_id'], row['prof_id'], salle_id, row['date_exam'], row['heure'],
+                row.get('duree') or PLANNING_CONFIG['exam_duration'], row.get('statut', 'planifié')
+            ))
+        
+        query = """
+        INSERT INTO examens (module_id, prof_id, salle_id, date_exam, heure, duree, statut)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """
+        try:
+            with self.transaction(tables=('examens',)) as cursor:
+                if replace_all:
+                    cursor.execute("DELETE FROM examens")
+                for start in range(0, len(replace_modules), chunk_size):
+                    chunk = replace_modules[start:start + chunk_size]
+                    cursor.execute(
+                        f"DELETE FROM examens WHERE module_id IN ({', '.join(['%s'] * len(chunk))})",
+                        tuple(chunk)
+                    )
+                for start in range(0, len(values), chunk_size):
+                    cursor.executemany(query, values[start:start + chunk_size])
+            return len(values)
+        except Error as e:
+            self.last_error = str(e)
+            print(f"❌ ERREUR SQL (lot annulé): {e}")
+            return 0
+    
     # ===== MÉTHODES POUR L'INTERFACE =====
     
     def get_all_exams(self, dept_id=None, start_date=None, end_date=None):
@@ -315,14 +875,14 @@ class DatabaseManager:
     
     def detect_conflicts(self, dept_id=None):
         """Détecter les conflits d'emploi du temps"""
-        # Conflits étudiants
+        # Conflits étudiants (modules distincts : un module réparti sur plusieurs salles compte une fois)
         if dept_id:
             query_students = """
             SELECT 
                 e.id as etudiant_id,
                 CONCAT(e.nom, ' ', e.prenom) as etudiant,
                 ex.date_exam,
-                COUNT(DISTINCT ex.id) as nb_examens
+                COUNT(DISTINCT ex.module_id) as nb_examens
             FROM etudiants e
             JOIN inscriptions i ON e.id = i.etudiant_id
             JOIN examens ex ON i.module_id = ex.module_id
@@ -339,7 +899,7 @@ class DatabaseManager:
                 e.id as etudiant_id,
                 CONCAT(e.nom, ' ', e.prenom) as etudiant,
                 ex.date_exam,
-                COUNT(DISTINCT ex.id) as nb_examens
+                COUNT(DISTINCT ex.module_id) as nb_examens
             FROM etudiants e
             JOIN inscriptions i ON e.id = i.etudiant_id
             JOIN examens ex ON i.module_id = ex.module_id
@@ -435,25 +995,53 @@ class DatabaseManager:
                 default_stats['total_formations'] = 0
             return [default_stats]
     
+    def get_dashboard_statistics(self):
+        """
+        Compteurs de l'en-tête du tableau de bord en une seule requête
+        (servie depuis le cache des lectures quand il est activé).
+        """
+        query = """
+        SELECT 
+            (SELECT COUNT(*) FROM etudiants) as total_etudiants,
+            (SELECT COUNT(*) FROM formations) as total_formations,
+            (SELECT COUNT(*) FROM modules) as total_modules,
+            (SELECT COUNT(*) FROM examens) as total_examens,
+            (SELECT COUNT(*) FROM departments) as total_departements,
+            (SELECT COUNT(*) FROM conflits_etudiants WHERE resolved = 0) as conflits_non_resolus
+        """
+        result = self.execute_query(query, fetch=True)
+        if result:
+            return {key: int(value or 0) for key, value in result[0].items()}
+        return {
+            'total_etudiants': 0,
+            'total_formations': 0,
+            'total_modules': 0,
+            'total_examens': 0,
+            'total_departements': 0,
+            'conflits_non_resolus': 0
+        }
+    
     def get_available_professors(self, date_exam, dept_id=None):
-        """Récupérer les professeurs disponibles pour une date"""
+        """
+        Récupérer les professeurs disponibles pour une date
+        (charge du jour agrégée une seule fois, sans sous-requête par professeur)
+        """
+        query = """
+        SELECT p.id, p.nom, p.prenom, COALESCE(c.current_load, 0) as current_load
+        FROM professeurs p
+        LEFT JOIN (
+            SELECT prof_id, COUNT(*) as current_load
+            FROM examens
+            WHERE date_exam = %s
+            GROUP BY prof_id
+        ) c ON c.prof_id = p.id
+        WHERE COALESCE(c.current_load, 0) < %s
+        """
+        params = [date_exam, PLANNING_CONFIG['max_exams_per_day_prof']]
         if dept_id:
-            query = """
-            SELECT p.id, p.nom, p.prenom,
-                   (SELECT COUNT(*) FROM examens WHERE prof_id = p.id AND date_exam = %s) as current_load
-            FROM professeurs p
-            WHERE p.dept_id = %s
-            HAVING current_load < 3
-            """
-            return self.execute_query(query, (date_exam, dept_id), fetch=True)
-        else:
-            query = """
-            SELECT p.id, p.nom, p.prenom,
-                   (SELECT COUNT(*) FROM examens WHERE prof_id = p.id AND date_exam = %s) as current_load
-            FROM professeurs p
-            HAVING current_load < 3
-            """
-            return self.execute_query(query, (date_exam,), fetch=True)
+            query += " AND p.dept_id = %s"
+            params.append(dept_id)
+        return self.execute_query(query, tuple(params), fetch=True)
     
     # ===== MÉTHODES DE TEST ET VÉRIFICATION =====
     
@@ -465,33 +1053,44 @@ class DatabaseManager:
         except:
             return False
     
-    def get_table_info(self):
-        """Obtenir des infos sur toutes les tables"""
+    def get_table_info(self, approximate=False):
+        """
+        Obtenir des infos sur toutes les tables, en une seule requête.
+        
+        Args:
+            approximate (bool): lire l'estimation TABLE_ROWS d'information_schema
+                                au lieu de compter les lignes (instantané sur InnoDB)
+        """
         tables = ['etudiants', 'professeurs', 'salles', 'modules', 'examens', 'inscriptions', 'departments', 'formations']
-        info = {}
         
-        for table in tables:
-            result = self.execute_query(f"SELECT COUNT(*) as count FROM {table}", fetch=True)
-            info[table] = result[0]['count'] if result and len(result) > 0 else 0
+        if approximate:
+            placeholders = ', '.join(['%s'] * len(tables))
+            result = self.execute_query(f"""
+                SELECT TABLE_NAME as name, TABLE_ROWS as count
+                FROM information_schema.TABLES
+                WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN ({placeholders})
+            """, tuple(tables), fetch=True)
+            counts = {row['name']: int(row['count'] or 0) for row in result}
+            return {table: counts.get(table, 0) for table in tables}
         
-        return info
+        columns = ',\n'.join(f"(SELECT COUNT(*) FROM {table}) as {table}" for table in tables)
+        result = self.execute_query(f"SELECT {columns}", fetch=True)
+        row = result[0] if result else {}
+        return {table: int(row.get(table) or 0) for table in tables}
     
     def check_tables_exist(self):
-        """Vérifier si toutes les tables nécessaires existent"""
+        """Vérifier si toutes les tables nécessaires existent (une requête sur information_schema)"""
         required_tables = ['departments', 'etudiants', 'professeurs', 'salles', 'modules', 'examens', 'inscriptions']
-        existing_tables = []
-        missing_tables = []
-        
-        for table in required_tables:
-            try:
-                result = self.execute_query(f"SELECT 1 FROM {table} LIMIT 1", fetch=True)
-                if result is not None:
-                    existing_tables.append(table)
-                else:
-                    missing_tables.append(table)
-            except:
-                missing_tables.append(table)
+        placeholders = ', '.join(['%s'] * len(required_tables))
+        result = self.execute_query(f"""
+            SELECT TABLE_NAME as name
+            FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN ({placeholders})
+        """, tuple(required_tables), fetch=True)
         
+        found = {row['name'] for row in result}
+        existing_tables = [table for table in required_tables if table in found]
+        missing_tables = [table for table in required_tables if table not in found]
         return existing_tables, missing_tables
 
 # ===== TEST SI EXÉCUTÉ DIRECTEMENT =====
@@ -0,0 +1,336 @@
+from collections import defaultdict
+import numpy as np
+from scipy import sparse
+from scipy.optimize import Bounds, LinearConstraint, milp
+
+try:
+    # Interface directe de HiGHS : permet de fournir une solution de départ
+    import highspy
+except ImportError:
+    highspy = None
+
+def clique_cover(first, second):
+    """
+    Couvrir les arêtes (first[k], second[k]) par des cliques, construites
+    gloutonnement à partir des sommets de plus fort degré.
+
+    Returns:
+        list: tableaux d'indices, un par clique (au moins deux sommets)
+    """
+    neighbors = defaultdict(set)
+    for i, j in zip(first.tolist(), second.tolist()):
+        neighbors[i].add(j)
+        neighbors[j].add(i)
+    uncovered = {vertex: set(adjacent) for vertex, adjacent in neighbors.items()}
+
+    cliques = []
+    for vertex in sorted(neighbors, key=lambda v: len(neighbors[v]), reverse=True):
+        while uncovered[vertex]:
+            clique = [vertex]
+            candidates = set(neighbors[vertex])
+            # D'abord les voisins dont l'arête reste à couvrir, puis les autres
+            while candidates:
+                best = max(candidates, key=lambda v: (sum(v in uncovered[c] for c in clique), len(neighbors[v])))
+                if not any(best in uncovered[c] for c in clique) and len(clique) > 1:
+                    break
+                clique.append(best)
+                candidates &= neighbors[best]
+            for k, u in enumerate(clique):
+                for v in clique[k + 1:]:
+                    uncovered[u].discard(v)
+                    uncovered[v].discard(u)
+            cliques.append(np.array(clique, dtype=np.int64))
+    return cliques
+
+class ExactModel:
+    """
+    Programme linéaire en nombres entiers du problème, résolu hors ligne par
+    HiGHS : via highspy s'il est installé (la solution heuristique sert alors
+    de solution de départ), sinon via scipy.optimize.milp.
+
+    Le programme raisonne par unité de conflit (le jour si un étudiant n'a
+    qu'un examen par jour, sinon le créneau) :
+    - x[i, u] : module libre i placé sur l'unité u (binaire)
+    - z[i]    : module i non planifié (binaire, coût unscheduled_penalty)
+    - y[d]    : jour d utilisé (binaire, coût priorities['room_optimization'])
+    - w[k]    : dépassement de surveillance d'un couple (département, jour)
+    - c[e, p] : avec consecutive=True, les deux modules de l'arête e sont sur
+                la paire d'unités consécutives p (coût
+                priorities['consecutive_exams'] × étudiants)
+
+    Contraintes dures : aucun étudiant partagé sur une même unité, places et
+    salles (agrégats de planning.score) cumulées sur les créneaux de l'unité,
+    examens fixés respectés. Les modules d'un jour sont ensuite répartis sur
+    ses créneaux (to_slots). Le programme est une relaxation du problème par
+    créneau : sa borne inférieure reste valable. Pour une solution qui le
+    respecte, l'objectif est la somme des termes self.terms de
+    planning.score et des modules non planifiés, à une constante près
+    (examens fixés seuls).
+    """
+
+    def __init__(self, model, consecutive=False):
+        """
+        Args:
+            model (planning.ProblemModel): problème, avec ses examens fixés
+            consecutive (bool): inclure les examens consécutifs dans l'objectif
+                (programme nettement plus difficile à prouver optimal)
+        """
+        self.model = model
+        priorities = model.config['priorities']
+        self.w_days = priorities.get('room_optimization', 0)
+        self.w_workload = priorities.get('professor_workload', 0)
+        self.w_consecutive = priorities.get('consecutive_exams', 0) if consecutive else 0
+        self.terms = ('room_optimization', 'professor_workload') + (('consecutive_exams',) if consecutive else ())
+
+        n, nb_slots, nb_days = model.nb_free, len(model.slots), model.nb_days
+        slot_unit = model.slot_unit
+        nb_units = int(slot_unit.max()) + 1 if nb_slots else 0
+        unit_day = np.zeros(nb_units, dtype=np.int64)
+        unit_day[slot_unit] = model.slot_day
+        self.n, self.nb_units = n, nb_units
+
+        # Places et salles encore libres par créneau une fois les examens fixés placés
+        fixed = np.arange(n, len(model.module_ids))
+        fixed_slots = np.array([model.pinned[model.module_ids[i]][0] for i in fixed], dtype=np.int64)
+        self.free_seats = np.maximum(
+            model.slot_capacity - np.bincount(fixed_slots, weights=model.seats_needed[fixed], minlength=nb_slots), 0)
+        self.free_rooms = np.maximum(
+            model.slot_rooms - np.bincount(fixed_slots, weights=model.rooms_needed[fixed], minlength=nb_slots), 0)
+
+        # Unités consécutives au sens de planning.score : jours d'indices voisins,
+        # ou créneaux voisins d'un même jour
+        consecutive_units = np.abs(np.arange(nb_units)[:, None] - np.arange(nb_units)[None, :]) == 1
+        if not model.per_day:
+            consecutive_units &= unit_day[:, None] == unit_day[None, :]
+        pairs = [u for u in range(nb_units - 1) if consecutive_units[u, u + 1]] if self.w_consecutive else []
+
+        # Voisins fixés : unités interdites et coût direct des examens consécutifs
+        first, second, shared = model.edges
+        upper = np.ones((n, nb_units))
+        x_cost = np.zeros((n, nb_units))
+        for a, b in ((first, second), (second, first)):
+            pinned_edge = (a < n) & (b >= n)
+            neighbor_units = slot_unit[fixed_slots[b[pinned_edge] - n]]
+            upper[a[pinned_edge], neighbor_units] = 0
+            np.add.at(x_cost, a[pinned_edge],
+                      self.w_consecutive * shared[pinned_edge][:, None] * consecutive_units[neighbor_units])
+
+        self.dept_days = sorted({(int(model.depts[i]), d) for i in range(n) for d in range(nb_days)
+                                 if int(model.depts[i]) in model.dept_capacity})
+        nb_w = len(self.dept_days)
+        free_edge = (first < n) & (second < n)
+        a, b, weight = first[free_edge], second[free_edge], shared[free_edge]
+        nb_edges = len(a)
+        self.offsets = (0, n * nb_units, n * nb_units + n, n * nb_units + n + nb_days,
+                        n * nb_units + n + nb_days + nb_w)
+        nb_vars = self.offsets[4] + nb_edges * len(pairs)
+        x0, z0, y0, w0, c0 = self.offsets
+
+        rows, cols, values, lower, upper_rows = [], [], [], [], []
+
+        def add(block_rows, block_cols, block_values, lo, hi):
+            start = sum(len(block) for block in lower)
+            rows.append(np.asarray(block_rows, dtype=np.int64) + start)
+            cols.append(np.asarray(block_cols, dtype=np.int64))
+            values.append(np.asarray(block_values, dtype=float))
+            lower.append(np.asarray(lo, dtype=float))
+            upper_rows.append(np.asarray(hi, dtype=float))
+
+        x_index = x0 + np.arange(n * nb_units).reshape(n, nb_units)
+
+        # Chaque module : une unité ou non planifié
+        add(np.concatenate([np.repeat(np.arange(n), nb_units), np.arange(n)]),
+            np.concatenate([x_index.ravel(), z0 + np.arange(n)]),
+            np.ones(n * nb_units + n), np.ones(n), np.ones(n))
+
+        # Conflits entre modules libres : au plus un module par clique et par unité
+        # (une contrainte de clique remplace toutes les arêtes qu'elle couvre)
+        cliques = clique_cover(a, b)
+        if cliques and nb_units:
+            members = np.concatenate(cliques)
+            clique_of = np.repeat(np.arange(len(cliques)), [len(clique) for clique in cliques])
+            clique_rows = clique_of[:, None] * nb_units + np.arange(nb_units)[None, :]
+            add(clique_rows.ravel(), x_index[members].ravel(), np.ones(clique_rows.size),
+                np.full(len(cliques) * nb_units, -np.inf), np.ones(len(cliques) * nb_units))
+
+        # Une clique occupe autant d'unités que de modules planifiés : borne sur les
+        # jours utilisés (sum y + sum z / k >= |K| / k, k unités au plus sur un jour ;
+        # la moyenne couperait des solutions quand les jours n'ont pas tous autant de créneaux)
+        units_per_day = int(np.bincount(unit_day).max()) if nb_units else 1
+        for clique in sorted(cliques, key=len, reverse=True)[:5]:
+            add(np.zeros(nb_days + len(clique)),
+                np.concatenate([y0 + np.arange(nb_days), z0 + clique]),
+                np.concatenate([np.ones(nb_days), np.full(len(clique), 1 / units_per_day)]),
+                [len(clique) / units_per_day], [np.inf])
+
+        # Lien module / jour : sum_{u du jour d} x[i, u] <= y[d]
+        link_rows = np.arange(n)[:, None] * nb_days + unit_day[None, :]
+        add(np.concatenate([link_rows.ravel(), np.arange(n * nb_days)]),
+            np.concatenate([x_index.ravel(), np.tile(y0 + np.arange(nb_days), n)]),
+            np.concatenate([np.ones(n * nb_units), -np.ones(n * nb_days)]),
+            np.full(n * nb_days, -np.inf), np.zeros(n * nb_days))
+
+        # Places et salles par unité (somme de ses créneaux)
+        for need, free in ((model.seats_needed, self.free_seats), (model.rooms_needed, self.free_rooms)):
+            add(np.tile(np.arange(nb_units), n), x_index.ravel(), np.repeat(need[:n], nb_units),
+                np.full(nb_units, -np.inf), np.bincount(slot_unit, weights=free, minlength=nb_units))
+
+        # Surveillance par département et par jour : dépassement w[k]
+        if nb_w:
+            key = {dept_day: k for k, dept_day in enumerate(self.dept_days)}
+            module_rows, module_cols = [], []
+            for i in range(n):
+                dept = int(model.depts[i])
+                if dept in model.dept_capacity:
+                    module_rows.append([key[(dept, int(d))] for d in unit_day])
+                    module_cols.append(x_index[i])
+            capacity = np.array([model.dept_capacity[dept] for dept, _ in self.dept_days], dtype=float)
+            add(np.concatenate(module_rows + [np.arange(nb_w)]),
+                np.concatenate(module_cols + [w0 + np.arange(nb_w)]),
+                np.concatenate([np.ones(sum(len(c) for c in module_cols)), -np.ones(nb_w)]),
+                np.full(nb_w, -np.inf), capacity)
+
+        # Examens consécutifs : c[e, p] >= x[a, u] + x[b, u + 1] - 1, et symétrique
+        for p, unit in enumerate(pairs):
+            c_index = c0 + p * nb_edges + np.arange(nb_edges)
+            for left, right in ((unit, unit + 1), (unit + 1, unit)):
+                add(np.repeat(np.arange(nb_edges), 3),
+                    np.column_stack([x_index[a, left], x_index[b, right], c_index]).ravel(),
+                    np.tile([1.0, 1.0, -1.0], nb_edges),
+                    np.full(nb_edges, -np.inf), np.ones(nb_edges))
+
+        lower_rows = np.concatenate(lower)
+        self.constraints = LinearConstraint(
+            sparse.csr_matrix((np.concatenate(values), (np.concatenate(rows), np.concatenate(cols))),
+                              shape=(len(lower_rows), nb_vars)),
+            lower_rows, np.concatenate(upper_rows)
+        )
+
+        self.cost = np.zeros(nb_vars)
+        self.cost[x0:z0] = x_cost.ravel()
+        self.cost[z0:y0] = model.unscheduled_penalty
+        self.cost[y0:w0] = self.w_days
+        self.cost[w0:c0] = self.w_workload
+        self.cost[c0:] = self.w_consecutive * np.tile(weight, len(pairs))
+
+        lower_bounds = np.zeros(nb_vars)
+        lower_bounds[y0 + np.unique(model.slot_day[fixed_slots])] = 1
+        upper_bounds = np.ones(nb_vars)
+        upper_bounds[x0:z0] = upper.ravel()
+        upper_bounds[w0:c0] = np.inf
+        self.bounds = Bounds(lower_bounds, upper_bounds)
+        self.integrality = np.ones(nb_vars)
+        self.integrality[w0:] = 0
+
+    def to_slots(self, units):
+        """
+        Répartir les modules de chaque unité sur ses créneaux : les plus gros
+        d'abord, dans le premier créneau où places et salles suffisent, sinon
+        dans le créneau le moins chargé (ExactStrategy.complete replace
+        ensuite par DSATUR les modules restés sans salle).
+
+        Returns:
+            array: créneau de chaque module du modèle (-1 = non planifié)
+        """
+        model = self.model
+        slots = model.slot_array({})
+        seats = self.free_seats.astype(float)
+        rooms = self.free_rooms.astype(float)
+        unit_slots = [np.flatnonzero(model.slot_unit == u) for u in range(self.nb_units)]
+        for i in sorted(np.flatnonzero(units >= 0), key=lambda i: -model.seats_needed[i]):
+            candidates = unit_slots[units[i]]
+            fits = candidates[(seats[candidates] >= model.seats_needed[i]) & (rooms[candidates] >= model.rooms_needed[i])]
+            slot = fits[0] if len(fits) else candidates[np.argmax(seats[candidates])]
+            slots[i] = slot
+            seats[slot] -= model.seats_needed[i]
+            rooms[slot] -= model.rooms_needed[i]
+        return slots
+
+    def value(self, score):
+        """Objectif du programme pour une solution, d'après ses composantes planning.score"""
+        priorities = self.model.config['priorities']
+        return (sum(priorities.get(name, 0) * score[name] for name in self.terms)
+                + self.model.unscheduled_penalty * score['non_planifies'])
+
+    def start_vector(self, slots):
+        """Variables x et z d'une solution heuristique (solution de départ partielle)"""
+        x0, z0, y0 = self.offsets[:3]
+        slots = np.asarray(slots[:self.n], dtype=np.int64)
+        values = np.zeros(y0)
+        placed = np.flatnonzero(slots >= 0)
+        values[x0 + placed * self.nb_units + self.model.slot_unit[slots[placed]]] = 1
+        values[z0 + np.flatnonzero(slots < 0)] = 1
+        return values
+
+    def solve(self, time_limit=60, start=None, gap=1e-4):
+        """
+        Résoudre dans la limite de temps.
+
+        Args:
+            start (array, optional): créneaux d'une solution heuristique, fournie
+                au solveur comme première solution (highspy seulement)
+
+        Returns:
+            dict: 'slots' (créneau de chaque module du modèle, None si aucune
+                  solution trouvée), 'objectif', 'borne' (borne inférieure
+                  prouvée), 'optimal', 'message'
+        """
+        if highspy is not None:
+            x, fun, bound, optimal, message = self._solve_highspy(time_limit, start, gap)
+        else:
+            x, fun, bound, optimal, message = self._solve_scipy(time_limit, gap)
+        report = {
+            'slots': None,
+            'objectif': None,
+            'borne': float(bound) if bound is not None and np.isfinite(bound) else None,
+            'optimal': optimal,
+            'message': message,
+        }
+        if x is None:
+            return report
+
+        x = np.asarray(x[:self.offsets[1]]).reshape(self.n, self.nb_units)
+        report['slots'] = self.to_slots(np.where(x.max(axis=1) > 0.5, x.argmax(axis=1), -1))
+        report['objectif'] = float(fun)
+        return report
+
+    def _solve_scipy(self, time_limit, gap):
+        result = milp(self.cost, integrality=self.integrality, bounds=self.bounds,
+                      constraints=self.constraints,
+                      options={'time_limit': float(time_limit), 'mip_rel_gap': gap, 'disp': False})
+        return result.x, result.fun, getattr(result, 'mip_dual_bound', None), result.status == 0, result.message
+
+    def _solve_highspy(self, time_limit, start, gap):
+        solver = highspy.Highs()
+        solver.setOptionValue('output_flag', False)
+        solver.setOptionValue('time_limit', float(time_limit))
+        solver.setOptionValue('mip_rel_gap', gap)
+
+        nb_vars = len(self.cost)
+        columns = np.arange(nb_vars, dtype=np.int32)
+        solver.addVars(nb_vars, self.bounds.lb, self.bounds.ub)
+        solver.changeColsCost(nb_vars, columns, self.cost)
+        solver.changeColsIntegrality(nb_vars, columns, np.where(
+            self.integrality > 0, highspy.HighsVarType.kInteger, highspy.HighsVarType.kContinuous))
+        matrix = self.constraints.A.tocsr()
+        solver.addRows(matrix.shape[0], self.constraints.lb, self.constraints.ub, matrix.nnz,
+                       matrix.indptr[:-1].astype(np.int32), matrix.indices.astype(np.int32), matrix.data)
+        if start is not None:
+            # Solution partielle (x, z) : HiGHS complète y, w et c
+            values = self.start_vector(start)
+            solver.setSolution(len(values), np.arange(len(values), dtype=np.int32), values)
+
+        solver.run()
+        status = solver.getModelStatus()
+        info = solver.getInfo()
+        if info.primal_solution_status != 2:  # kSolutionStatusFeasible
+            return None, None, info.mip_dual_bound, False, solver.modelStatusToString(status)
+        return (np.array(solver.getSolution().col_value), info.objective_function_value, info.mip_dual_bound,
+                status == highspy.HighsModelStatus.kOptimal, solver.modelStatusToString(status))
+
+    @staticmethod
+    def gap(value, bound):
+        """Écart relatif (valeur - borne) / valeur, None sans borne"""
+        if bound is None or value is None:
+            return None
+        return max(float(value) - bound, 0.0) / max(abs(float(value)), 1e-9)
@@ -0,0 +1,191 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from config import JOB_CONFIG, DATA_DIR
+
+class JobCancelled(Exception):
+    """Levée dans le calcul quand l'annulation de la tâche est demandée"""
+
+class Job:
+    """
+    Tâche de fond : état, progression et résultat.
+
+    Le calcul reçoit la tâche en premier argument et appelle report() pour
+    publier sa progression ; report() lève JobCancelled si l'annulation a été
+    demandée, ce qui interrompt le calcul avant toute écriture en base.
+    """
+
+    def __init__(self, name, interval=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.status = 'en attente'
+        self.progress = {}
+        self.result = None
+        self.error = None
+        self.submitted = datetime.now()
+        self.started = None
+        self.finished = None
+        self.interval = JOB_CONFIG['progress_interval'] if interval is None else interval
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self._last_report = 0.0
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def report(self, force=False, **progress):
+        """
+        Publier la progression (meilleur score, itérations, message...).
+
+        Les appels plus rapprochés que `interval` sont ignorés sauf force=True.
+        """
+        if self._cancel.is_set():
+            raise JobCancelled(self.id)
+        now = time.monotonic()
+        if force or now - self._last_report >= self.interval:
+            self._last_report = now
+            with self._lock:
+                self.progress.update(progress)
+
+    def snapshot(self):
+        """État de la tâche sous forme de dict (copie, sans le résultat)"""
+        with self._lock:
+            elapsed = ((self.finished or datetime.now()) - self.started).total_seconds() if self.started else 0.0
+            return {
+                'id': self.id,
+                'nom': self.name,
+                'statut': self.status,
+                'progression': dict(self.progress),
+                'erreur': self.error,
+                'soumis': self.submitted.strftime('%Y-%m-%d %H:%M:%S'),
+                'duree': round(elapsed, 1),
+            }
+
+class JobRunner:
+    """
+    File de tâches de planification exécutées par un pool de threads.
+
+    L'interface Streamlit soumet une tâche, conserve son identifiant dans
+    st.session_state et interroge status() à chaque rafraîchissement : la
+    page n'est jamais bloquée par le calcul et survit aux reruns.
+    Le résultat de chaque tâche terminée est écrit dans `results_dir` par
+    écriture dans un fichier temporaire puis renommage (atomique). Seules les
+    `max_history` tâches finies les plus récentes restent en mémoire.
+    """
+
+    def __init__(self, max_workers=None, results_dir=None, max_history=None):
+        self.max_workers = max_workers or JOB_CONFIG['max_workers']
+        self.results_dir = results_dir or JOB_CONFIG['results_dir'] or os.path.join(DATA_DIR, 'jobs')
+        self.max_history = JOB_CONFIG['max_history'] if max_history is None else max_history
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='job')
+        self.jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, name, func, *args, **kwargs):
+        """
+        Soumettre un calcul func(job, *args, **kwargs).
+
+        Returns:
+            str: identifiant de la tâche
+        """
+        job = Job(name)
+        with self._lock:
+            self._prune()
+            self.jobs[job.id] = job
+        self.executor.submit(self._run, job, func, args, kwargs)
+        return job.id
+
+    def _prune(self):
+        """Oublier les tâches finies les plus anciennes au-delà de max_history"""
+        finished = sorted((job for job in self.jobs.values() if job.finished), key=lambda job: job.finished)
+        for job in finished[:max(len(finished) - self.max_history, 0)]:
+            del self.jobs[job.id]
+
+    def _run(self, job, func, args, kwargs):
+        if job.cancelled:
+            job.status = 'annulé'
+            return
+        job.started = datetime.now()
+        job.status = 'en cours'
+        try:
+            result = func(job, *args, **kwargs)
+            job.result = result
+            self._persist(job)
+            job.status = 'terminé'
+        except JobCancelled:
+            job.status = 'annulé'
+        except Exception as e:
+            print(f"❌ Tâche {job.name} ({job.id}) échouée : {e}")
+            job.error = str(e)
+            job.status = 'échoué'
+        finally:
+            job.finished = datetime.now()
+
+    def _persist(self, job):
+        """Écrire le résultat en JSON : fichier temporaire puis os.replace"""
+        os.makedirs(self.results_dir, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.results_dir, prefix=f".{job.id}-", suffix='.json')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({**job.snapshot(), 'resultat': job.result}, f, ensure_ascii=False, default=str)
+            os.replace(tmp, self.result_path(job.id))
+        except Exception:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def result_path(self, job_id):
+        return os.path.join(self.results_dir, f"{job_id}.json")
+
+    # ===== SUIVI =====
+
+    def status(self, job_id):
+        """État courant d'une tâche (None si inconnue)"""
+        job = self.jobs.get(job_id)
+        return job.snapshot() if job else None
+
+    def result(self, job_id):
+        """Résultat d'une tâche terminée, en mémoire ou relu depuis son fichier"""
+        job = self.jobs.get(job_id)
+        if job is not None and job.status == 'terminé':
+            return job.result
+        path = self.result_path(job_id)
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)['resultat']
+        return None
+
+    def cancel(self, job_id):
+        """
+        Demander l'annulation : immédiate si la tâche attend encore, sinon au
+        prochain report() du calcul.
+
+        Returns:
+            bool: True si la tâche existait et n'était pas terminée
+        """
+        job = self.jobs.get(job_id)
+        if job is None or job.status in ('terminé', 'échoué', 'annulé'):
+            return False
+        job._cancel.set()
+        return True
+
+    def list_jobs(self):
+        """États de toutes les tâches, les plus récentes d'abord"""
+        return sorted((job.snapshot() for job in self.jobs.values()), key=lambda j: j['soumis'], reverse=True)
+
+_runner = None
+_runner_lock = threading.Lock()
+
+def get_runner():
+    """Retourner le gestionnaire de tâches partagé (créé au premier appel)"""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = JobRunner()
+        return _runner
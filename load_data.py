@@ -0,0 +1,262 @@
+import argparse
+import csv
+import os
+import time
+from contextlib import contextmanager
+from itertools import islice
+import mysql.connector
+from mysql.connector import Error
+import numpy as np
+from benchmark import SyntheticUniversity
+from config import DATA_DIR, DATA_LOAD_CONFIG, DB_CONFIG
+from database import DatabaseManager, MODULE_STATS_DDL
+
+# Tables chargées, dans l'ordre des clés étrangères : {table: colonnes}
+TABLES = {
+    'departments': ('id', 'nom'),
+    'formations': ('id', 'nom', 'dept_id', 'nb_modules'),
+    'modules': ('id', 'nom', 'formation_id', 'credit'),
+    'etudiants': ('id', 'nom', 'prenom', 'formation_id', 'promo', 'email'),
+    'salles': ('id', 'nom', 'capacite', 'type', 'disponibilite'),
+    'professeurs': ('id', 'nom', 'prenom', 'dept_id', 'email', 'max_examens_jour'),
+    'inscriptions': ('etudiant_id', 'module_id', 'annee_inscription'),
+}
+
+# Vidées avec --truncate (examens pointe vers les modules et les salles)
+TRUNCATED = ('examens', 'inscriptions', 'etudiants', 'professeurs', 'salles', 'modules', 'formations', 'departments')
+
+# Triggers de module_stats, supprimés pendant le chargement puis recréés
+STATS_TRIGGERS = [statement.split()[-1] for statement in MODULE_STATS_DDL if statement.startswith('DROP TRIGGER')]
+
+NOMS = ['Martin', 'Bernard', 'Dubois', 'Thomas', 'Robert', 'Richard', 'Petit', 'Durand',
+        'Leroy', 'Moreau', 'Simon', 'Laurent', 'Lefebvre', 'Michel', 'Garcia', 'Benali']
+PRENOMS = ['Alex', 'Maxime', 'Clara', 'Sarah', 'Tom', 'Hugo', 'Emma', 'Louis',
+           'Lina', 'Yanis', 'Inès', 'Adam', 'Léa', 'Nour', 'Jade', 'Rayan']
+
+def _zip_blocks(*columns, block=100000):
+    """Lignes de colonnes numpy, converties par blocs (pas de liste Python de la taille de la table)"""
+    for start in range(0, len(columns[0]), block):
+        yield from zip(*(column[start:start + block].tolist() for column in columns))
+
+def table_rows(university, offsets=None, seed=0):
+    """
+    Lignes de chaque table, générées à la demande (jamais toutes en mémoire
+    sous forme d'objets Python) et décalées des identifiants déjà en base.
+
+    Args:
+        university (SyntheticUniversity): données générées
+        offsets (dict, optional): {table: plus grand id existant}
+
+    Returns:
+        dict: {table: fonction sans argument retournant un itérateur de tuples}
+    """
+    offsets = offsets or {}
+    rng = np.random.default_rng(seed)
+    dept, formation, module = (offsets.get(t, 0) for t in ('departments', 'formations', 'modules'))
+    etudiant, salle, prof = (offsets.get(t, 0) for t in ('etudiants', 'salles', 'professeurs'))
+
+    students = university.etudiants
+    student_names = rng.integers(len(NOMS), size=len(students['id']))
+    student_first = rng.integers(len(PRENOMS), size=len(students['id']))
+    enrollments = university.inscriptions
+    years = rng.integers(2023, 2026, size=len(enrollments['module_id']))
+
+    def etudiants():
+        for i, nom, prenom, formation_id, promo in _zip_blocks(
+                students['id'] + etudiant, student_names, student_first,
+                students['formation_id'] + formation, students['promo']):
+            nom, prenom = NOMS[nom], PRENOMS[prenom]
+            yield i, nom, prenom, formation_id, promo, f"{prenom.lower()}.{nom.lower()}{i}@etu.univ.fr"
+
+    return {
+        'departments': lambda: ((d['id'] + dept, d['nom']) for d in university.departments),
+        'formations': lambda: ((f['id'] + formation, f['nom'], f['dept_id'] + dept, f['nb_modules'])
+                               for f in university.formations),
+        'modules': lambda: ((m['id'] + module, m['nom'], m['formation_id'] + formation, 3)
+                            for m in university.modules),
+        'etudiants': etudiants,
+        'salles': lambda: ((s['id'] + salle, s['nom'], s['capacite'], s['type'], s['disponibilite'])
+                           for s in university.salles),
+        'professeurs': lambda: ((p['id'] + prof, p['nom'], PRENOMS[p['id'] % len(PRENOMS)], p['dept_id'] + dept,
+                                 f"prof{p['id'] + prof}@univ.fr", 3) for p in university.professeurs),
+        'inscriptions': lambda: _zip_blocks(enrollments['etudiant_id'] + etudiant,
+                                            enrollments['module_id'] + module, years),
+    }
+
+def write_csv(directory, rows):
+    """
+    Écrire une table par fichier CSV (en-tête, séparateur virgule, fin de ligne \\n).
+
+    Returns:
+        dict: {table: (chemin, nombre de lignes)}
+    """
+    os.makedirs(directory, exist_ok=True)
+    files = {}
+    for table, generate in rows.items():
+        path = os.path.join(directory, f"{table}.csv")
+        count = 0
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerow(TABLES[table])
+            for row in generate():
+                writer.writerow(row)
+                count += 1
+        files[table] = (path, count)
+    return files
+
+class BulkLoader:
+    """
+    Chargement en masse sur une connexion dédiée (hors pool, local_infile autorisé).
+
+    Pendant le chargement, les vérifications de clés étrangères et d'unicité
+    sont coupées, les index secondaires désactivés (DISABLE KEYS, effectif sur
+    MyISAM, sans effet sur InnoDB où les lignes arrivent triées par clé
+    primaire) et les triggers de module_stats supprimés ; tout est rétabli à
+    la fin et module_stats est recalculée en une requête.
+    """
+
+    def __init__(self, chunk_size=None, **db_config):
+        self.chunk_size = chunk_size or DATA_LOAD_CONFIG['chunk_size']
+        self.connection = mysql.connector.connect(
+            **{**(db_config or DB_CONFIG), 'autocommit': False}, allow_local_infile=True
+        )
+
+    def close(self):
+        self.connection.close()
+
+    def offsets(self):
+        """Plus grand identifiant de chaque table (0 si vide)"""
+        cursor = self.connection.cursor()
+        try:
+            result = {}
+            for table, columns in TABLES.items():
+                if columns[0] == 'id':
+                    cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}")
+                    result[table] = int(cursor.fetchone()[0])
+            return result
+        finally:
+            cursor.close()
+
+    def truncate(self):
+        """Vider les tables chargées (et examens)"""
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute("SET foreign_key_checks = 0")
+            for table in TRUNCATED:
+                cursor.execute(f"TRUNCATE TABLE {table}")
+            cursor.execute("SET foreign_key_checks = 1")
+        finally:
+            cursor.close()
+
+    @contextmanager
+    def fast_load(self, tables):
+        """Couper contrôles, index et triggers le temps du bloc, puis valider et les rétablir"""
+        cursor = self.connection.cursor()
+        cursor.execute("SELECT COUNT(*) FROM information_schema.TABLES "
+                       "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'module_stats'")
+        stats = cursor.fetchone()[0] > 0
+        for trigger in STATS_TRIGGERS:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        cursor.execute("SET foreign_key_checks = 0")
+        cursor.execute("SET unique_checks = 0")
+        for table in tables:
+            cursor.execute(f"ALTER TABLE {table} DISABLE KEYS")
+        try:
+            yield cursor
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+        finally:
+            for table in tables:
+                cursor.execute(f"ALTER TABLE {table} ENABLE KEYS")
+            cursor.execute("SET unique_checks = 1")
+            cursor.execute("SET foreign_key_checks = 1")
+            cursor.close()
+            if stats:
+                # Triggers recréés, effectifs recalculés en une requête
+                DatabaseManager().setup_module_stats(rebuild=True)
+
+    def load_infile(self, cursor, table, path):
+        """LOAD DATA LOCAL INFILE d'un CSV écrit par write_csv"""
+        cursor.execute(
+            f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} CHARACTER SET utf8mb4 "
+            "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' LINES TERMINATED BY '\\n' "
+            f"IGNORE 1 LINES ({', '.join(TABLES[table])})",
+            (os.path.abspath(path),)
+        )
+        return cursor.rowcount
+
+    def load_rows(self, cursor, table, rows):
+        """INSERT multi-lignes par paquets de chunk_size (executemany)"""
+        columns = TABLES[table]
+        query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+        rows = iter(rows)
+        total = 0
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                return total
+            cursor.executemany(query, chunk)
+            total += len(chunk)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Chargement en masse d'une université synthétique")
+    parser.add_argument('--students', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--density', type=int, default=6, help="modules par étudiant")
+    parser.add_argument('--method', choices=['infile', 'insert'], default=DATA_LOAD_CONFIG['method'],
+                        help="LOAD DATA LOCAL INFILE depuis les CSV, ou INSERT multi-lignes")
+    parser.add_argument('--chunk-size', type=int, default=None, help="lignes par INSERT")
+    parser.add_argument('--csv-dir', default=None, help="défaut : DATA_DIR/chargement")
+    parser.add_argument('--csv-only', action='store_true', help="écrire les CSV sans charger")
+    parser.add_argument('--truncate', action='store_true', help="vider les tables avant le chargement")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    university = SyntheticUniversity(args.students, modules_per_student=args.density, seed=args.seed)
+    print(f"🎲 {university.describe()['nb_inscriptions']} inscriptions générées en {time.perf_counter() - started:.1f}s")
+    directory = args.csv_dir or DATA_LOAD_CONFIG['csv_dir'] or os.path.join(DATA_DIR, 'chargement')
+
+    if args.csv_only:
+        files = write_csv(directory, table_rows(university, seed=args.seed))
+        print(f"✅ {sum(count for _, count in files.values())} lignes écrites dans {directory}")
+        return 0
+
+    try:
+        loader = BulkLoader(args.chunk_size)
+    except Error as e:
+        print(f"❌ ERREUR MySQL: {e}")
+        return 1
+
+    try:
+        if args.truncate:
+            print("⚠️ Tables vidées : " + ', '.join(TRUNCATED))
+            loader.truncate()
+        rows = table_rows(university, loader.offsets(), args.seed)
+        files = write_csv(directory, rows) if args.method == 'infile' else None
+
+        with loader.fast_load(TABLES) as cursor:
+            for table in TABLES:
+                step = time.perf_counter()
+                if files is not None:
+                    try:
+                        count = loader.load_infile(cursor, table, files[table][0])
+                    except Error as e:
+                        # local_infile refusé par le serveur : INSERT multi-lignes pour la suite
+                        print(f"⚠️ LOAD DATA impossible ({e}), INSERT multi-lignes")
+                        files = None
+                if files is None:
+                    count = loader.load_rows(cursor, table, rows[table]())
+                print(f"  {table}: {count} lignes en {time.perf_counter() - step:.2f}s")
+    except Error as e:
+        print(f"❌ ERREUR SQL (chargement annulé): {e}")
+        return 1
+    finally:
+        loader.close()
+
+    print(f"✅ Chargement terminé en {time.perf_counter() - started:.1f}s")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
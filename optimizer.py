@@ -0,0 +1,282 @@
+import math
+import time
+import numpy as np
+from scipy import sparse
+
+class DeltaState:
+    """
+    Solution courante d'une recherche locale et compteurs permettant
+    d'évaluer le déplacement d'un module en O(1).
+
+    conflict_weight[i, u] = étudiants que le module i partage avec les modules
+    placés sur l'unité u (jour, ou créneau si plusieurs examens par jour).
+    Évaluer un déplacement lit deux cases ; l'appliquer met à jour les
+    voisins du module (O(degré)). Les autres termes de planning.score
+    (places par créneau, charge par département et jour, jours utilisés,
+    modules non planifiés) sont de simples compteurs.
+    """
+
+    def __init__(self, model, slots, capacity_weight=None):
+        """
+        Args:
+            model (planning.ProblemModel): problème
+            slots (array): créneau de chaque module du modèle (-1 = non planifié)
+            capacity_weight (float, optional): poids du dépassement de capacité
+                (défaut : priorities['room_capacity'], soit exactement planning.score)
+        """
+        self.model = model
+        priorities = model.config['priorities']
+        self.w_conflicts = priorities.get('student_conflicts', 0)
+        self.w_capacity = priorities.get('room_capacity', 0) if capacity_weight is None else capacity_weight
+        self.w_workload = priorities.get('professor_workload', 0)
+        self.w_consecutive = priorities.get('consecutive_exams', 0)
+        self.w_days = priorities.get('room_optimization', 0)
+
+        self.slots = np.array(slots, dtype=np.int64)
+        self.nb_units = int(model.slot_unit.max()) + 1 if len(model.slots) else 0
+        self.adjacency = model.adjacency.tocsr()
+
+        # Unités adjacentes pour les examens consécutifs (même logique que planning.score)
+        self.neighbor_units = []
+        for unit in range(self.nb_units):
+            if model.per_day:
+                near = [u for u in (unit - 1, unit + 1) if 0 <= u < self.nb_units]
+            else:
+                near = [u for u in (unit - 1, unit + 1)
+                        if 0 <= u < self.nb_units and model.slot_day[u] == model.slot_day[unit]]
+            self.neighbor_units.append(near)
+
+        scheduled = self.slots >= 0
+        units = np.where(scheduled, model.slot_unit[np.where(scheduled, self.slots, 0)], -1)
+        self.units = units
+        one_hot = sparse.csr_matrix(
+            (np.ones(scheduled.sum()), (np.flatnonzero(scheduled), units[scheduled])),
+            shape=(len(self.slots), max(self.nb_units, 1))
+        )
+        self.conflict_weight = np.asarray((self.adjacency @ one_hot).todense(), dtype=np.int64)
+
+        nb_slots = len(model.slots)
+        safe = np.where(scheduled, self.slots, 0)
+        self.demand = np.bincount(safe[scheduled], weights=model.seats_needed[scheduled], minlength=nb_slots)
+        self.count = np.bincount(safe[scheduled], weights=model.rooms_needed[scheduled], minlength=nb_slots)
+        self.day_count = np.bincount(model.slot_day[safe[scheduled]], minlength=model.nb_days)
+
+        # Charge par (département, jour), modules libres seulement
+        dept_values = sorted(set(model.depts[:model.nb_free].tolist()))
+        self.dept_index = np.array([dept_values.index(d) for d in model.depts[:model.nb_free]], dtype=np.int64)
+        self.dept_capacity = np.array([model.dept_capacity.get(d, np.inf) for d in dept_values], dtype=float)
+        self.dept_day = np.zeros((max(len(dept_values), 1), max(model.nb_days, 1)), dtype=np.int64)
+        for i in range(model.nb_free):
+            if self.slots[i] >= 0:
+                self.dept_day[self.dept_index[i], model.slot_day[self.slots[i]]] += 1
+
+        self.total = self._full_total()
+
+    # ===== ÉVALUATION =====
+
+    def _overflow(self, demand, count):
+        model = self.model
+        return max(demand - model.slot_capacity, 0) + max(count - model.slot_rooms, 0) * model.mean_capacity
+
+    def _near(self, i, unit):
+        return sum(self.conflict_weight[i, u] for u in self.neighbor_units[unit])
+
+    def _full_total(self):
+        """Score complet recalculé depuis les compteurs (contrôle)"""
+        model = self.model
+        scheduled = self.slots >= 0
+        idx = np.flatnonzero(scheduled)
+        conflicts = self.conflict_weight[idx, self.units[idx]].sum() // 2
+        near = sum(self._near(i, self.units[i]) for i in idx) // 2
+        overflow = sum(self._overflow(d, c) for d, c in zip(self.demand, self.count))
+        excess = np.maximum(self.dept_day - self.dept_capacity[:, None], 0).sum() if self.dept_day.size else 0
+        unscheduled = int((~scheduled[:model.nb_free]).sum())
+        return (self.w_conflicts * conflicts + self.w_capacity * overflow
+                + self.w_workload * excess + self.w_consecutive * near
+                + self.w_days * int((self.day_count > 0).sum())
+                + model.unscheduled_penalty * unscheduled)
+
+    def delta(self, i, slot):
+        """Variation du score si le module i passe sur `slot` (O(1))"""
+        model = self.model
+        old = self.slots[i]
+        if old == slot:
+            return 0.0
+        change = 0.0
+
+        old_unit = self.units[i]
+        new_unit = model.slot_unit[slot] if slot >= 0 else -1
+        if new_unit >= 0:
+            change += self.w_conflicts * self.conflict_weight[i, new_unit]
+            change += self.w_consecutive * self._near(i, new_unit)
+        if old_unit >= 0:
+            change -= self.w_conflicts * self.conflict_weight[i, old_unit]
+            change -= self.w_consecutive * self._near(i, old_unit)
+
+        seats, rooms = model.seats_needed[i], model.rooms_needed[i]
+        if old >= 0:
+            change += self.w_capacity * (self._overflow(self.demand[old] - seats, self.count[old] - rooms)
+                                         - self._overflow(self.demand[old], self.count[old]))
+        if slot >= 0:
+            change += self.w_capacity * (self._overflow(self.demand[slot] + seats, self.count[slot] + rooms)
+                                         - self._overflow(self.demand[slot], self.count[slot]))
+
+        old_day = model.slot_day[old] if old >= 0 else -1
+        new_day = model.slot_day[slot] if slot >= 0 else -1
+        if old_day != new_day:
+            if old_day >= 0 and self.day_count[old_day] == 1:
+                change -= self.w_days
+            if new_day >= 0 and self.day_count[new_day] == 0:
+                change += self.w_days
+            if i < model.nb_free:
+                k = self.dept_index[i]
+                capacity = self.dept_capacity[k]
+                if old_day >= 0 and self.dept_day[k, old_day] > capacity:
+                    change -= self.w_workload
+                if new_day >= 0 and self.dept_day[k, new_day] >= capacity:
+                    change += self.w_workload
+
+        if old < 0:
+            change -= model.unscheduled_penalty
+        if slot < 0:
+            change += model.unscheduled_penalty
+        return change
+
+    # ===== MISE À JOUR =====
+
+    def move(self, i, slot, change=None):
+        """Appliquer le déplacement (O(degré du module))"""
+        model = self.model
+        change = self.delta(i, slot) if change is None else change
+        old = self.slots[i]
+        old_unit = self.units[i]
+        new_unit = model.slot_unit[slot] if slot >= 0 else -1
+
+        start, end = self.adjacency.indptr[i], self.adjacency.indptr[i + 1]
+        neighbors = self.adjacency.indices[start:end]
+        weights = self.adjacency.data[start:end]
+        if old_unit >= 0:
+            self.conflict_weight[neighbors, old_unit] -= weights
+        if new_unit >= 0:
+            self.conflict_weight[neighbors, new_unit] += weights
+
+        seats, rooms = model.seats_needed[i], model.rooms_needed[i]
+        if old >= 0:
+            self.demand[old] -= seats
+            self.count[old] -= rooms
+            self.day_count[model.slot_day[old]] -= 1
+            if i < model.nb_free:
+                self.dept_day[self.dept_index[i], model.slot_day[old]] -= 1
+        if slot >= 0:
+            self.demand[slot] += seats
+            self.count[slot] += rooms
+            self.day_count[model.slot_day[slot]] += 1
+            if i < model.nb_free:
+                self.dept_day[self.dept_index[i], model.slot_day[slot]] += 1
+
+        self.slots[i] = slot
+        self.units[i] = new_unit
+        self.total += change
+        return change
+
+def anneal(model, slots, time_budget=30, seed=None, max_iterations=None, start_temperature=None, movable=None,
+           progress=None):
+    """
+    Recuit simulé sur les créneaux des modules libres.
+
+    Mouvements : déplacer un module vers un créneau tiré au hasard, ou
+    échanger les créneaux de deux modules. Température géométrique
+    décroissante sur le budget de temps ; la meilleure solution est conservée.
+
+    La capacité agrégée d'un créneau n'est qu'une borne de ce que
+    RoomAllocator pourra affecter : chaque place manquante coûte ici autant
+    qu'un module non planifié, sinon la recherche entasserait les modules
+    dans des créneaux que l'affectation des salles viderait ensuite.
+
+    Args:
+        model (planning.ProblemModel): problème
+        slots (array): solution de départ (-1 = non planifié)
+        time_budget (float): secondes de recherche
+        seed (int, optional): graine du générateur aléatoire
+        max_iterations (int, optional): borne sur le nombre de mouvements
+        movable (array, optional): indices des seuls modules à déplacer
+                                   (défaut : tous les modules libres)
+        progress (callable, optional): appelé avec meilleur_score et iterations
+                                       toutes les 256 itérations
+
+    Returns:
+        tuple: (meilleurs créneaux, meilleur score, nombre de mouvements)
+    """
+    rng = np.random.default_rng(seed)
+    state = DeltaState(model, slots, capacity_weight=model.unscheduled_penalty)
+    best_slots = state.slots.copy()
+    best_total = state.total
+    movable = np.arange(model.nb_free) if movable is None else np.asarray(movable, dtype=np.int64)
+    nb_movable = len(movable)
+    nb_slots = len(model.slots)
+    if nb_movable == 0 or nb_slots == 0:
+        return best_slots, best_total, 0
+
+    # Température initiale : écart moyen des mouvements dégradants
+    if start_temperature is None:
+        samples = [state.delta(i, s) for i, s in zip(movable[rng.integers(nb_movable, size=200)],
+                                                    rng.integers(nb_slots, size=200))]
+        worse = [d for d in samples if 0 < d < model.unscheduled_penalty]
+        start_temperature = float(np.mean(worse)) if worse else 1.0
+    end_temperature = start_temperature * 1e-3
+
+    started = time.perf_counter()
+    iterations = 0
+    temperature = start_temperature
+    while True:
+        if iterations % 256 == 0:
+            elapsed = time.perf_counter() - started
+            if elapsed >= time_budget or (max_iterations is not None and iterations >= max_iterations):
+                break
+            temperature = start_temperature * (end_temperature / start_temperature) ** (elapsed / time_budget)
+            if progress is not None:
+                progress(meilleur_score=float(best_total), iterations=iterations)
+        iterations += 1
+
+        i = int(movable[rng.integers(nb_movable)])
+        if rng.random() < 0.8 or state.slots[i] < 0:
+            slot = int(rng.integers(nb_slots))
+            change = state.delta(i, slot)
+            if change <= 0 or rng.random() < math.exp(-change / temperature):
+                state.move(i, slot, change)
+            else:
+                continue
+        else:
+            j = int(movable[rng.integers(nb_movable)])
+            slot_i, slot_j = state.slots[i], state.slots[j]
+            if slot_j < 0 or model.slot_unit[slot_i] == model.slot_unit[slot_j]:
+                continue
+            change = state.move(i, slot_j)
+            change += state.move(j, slot_i)
+            if not (change <= 0 or rng.random() < math.exp(-change / temperature)):
+                state.move(j, slot_j)
+                state.move(i, slot_i)
+                continue
+
+        if state.total < best_total - 1e-9:
+            best_total = state.total
+            best_slots = state.slots.copy()
+
+    return best_slots, best_total, iterations
+
+def crossover(model, parent_a, parent_b, rng):
+    """
+    Croisement par jours : chaque jour de la session est hérité de l'un des
+    parents (les modules que ce parent y place) ; les modules restants
+    gardent le créneau de l'autre parent s'il tombe sur un jour de ce dernier.
+    """
+    from_a = rng.random(model.nb_days) < 0.5
+    child = np.full(len(parent_a), -1, dtype=np.int64)
+    day_a = np.where(parent_a >= 0, model.slot_day[np.where(parent_a >= 0, parent_a, 0)], -1)
+    day_b = np.where(parent_b >= 0, model.slot_day[np.where(parent_b >= 0, parent_b, 0)], -1)
+    take_a = (day_a >= 0) & from_a[np.maximum(day_a, 0)]
+    take_b = ~take_a & (day_b >= 0) & ~from_a[np.maximum(day_b, 0)]
+    child[take_a] = parent_a[take_a]
+    child[take_b] = parent_b[take_b]
+    child[model.nb_free:] = parent_a[model.nb_free:]
+    return child
@@ -0,0 +1,989 @@
+import heapq
+import multiprocessing
+import os
+import time
+from collections import defaultdict
+import numpy as np
+from scipy import sparse
+from config import PLANNING_CONFIG
+from conflict_matrix import ConflictMatrix
+from exact import ExactModel
+from optimizer import anneal, crossover, DeltaState
+from room_allocation import RoomAllocator
+from slot_grid import SlotGrid, format_heure
+
+# Pénalité d'un module non planifié, en « étudiants en conflit »
+UNSCHEDULED_PENALTY = 10000
+
+def build_slots(start_date=None, end_date=None, config=None):
+    """Créneaux (date, heure) de la configuration, dimanches exclus (voir SlotGrid.from_config)"""
+    return SlotGrid.from_config(start_date, end_date, config).slots
+
+# ===== COLORATION DSATUR =====
+
+def color_graph(modules, graph, slots, rooms, pinned=None, config=None):
+    """
+    Affecter un créneau et des salles à chaque module par coloration DSATUR.
+
+    Deux modules en conflit ne partagent jamais le même jour (ou le même
+    créneau si un étudiant peut passer plusieurs examens par jour).
+    À saturation égale, le module le plus contraint (degré, effectif) passe en premier.
+    Le premier créneau compatible où RoomAllocator trouve des salles est retenu.
+
+    Args:
+        modules (dict): {module_id: infos du module avec 'nb_etudiants'}
+        graph (dict): graphe de conflits {module_id: {module_voisin: nb_etudiants_partages}}
+        slots (list | SlotGrid): créneaux (date, heure)
+        rooms (list | RoomAllocator): salles disponibles avec 'id' et 'capacite'
+        pinned (dict, optional): {module_id: (indice_creneau, [salle_id, ...])} déjà planifiés
+
+    Returns:
+        tuple: ({module_id: (indice_creneau, [(salle, nb_etudiants)])}, {modules non planifiés})
+    """
+    config = config or PLANNING_CONFIG
+    grid = slots if isinstance(slots, SlotGrid) else SlotGrid(slots)
+    slots = grid.slots
+    units = (grid.day if config['max_exams_per_day_student'] <= 1 else np.arange(len(grid))).tolist()
+    unit_of = units.__getitem__
+    allocator = rooms if isinstance(rooms, RoomAllocator) else RoomAllocator(rooms)
+
+    assignment = {}
+    forbidden = defaultdict(set)
+
+    def place(module_id, slot, parts):
+        for room, _ in parts:
+            allocator.reserve(slot, slots[slot][0], room['id'])
+        assignment[module_id] = (slot, parts)
+        unit = unit_of(slot)
+        for neighbor in graph.get(module_id, ()):
+            if neighbor not in assignment and unit not in forbidden[neighbor]:
+                forbidden[neighbor].add(unit)
+                if neighbor in modules:
+                    heapq.heappush(heap, entry(neighbor))
+
+    def entry(module_id):
+        return (-len(forbidden[module_id]), -len(graph.get(module_id, ())),
+                -modules[module_id]['nb_etudiants'], module_id)
+
+    heap = []
+    for module_id, (slot, room_ids) in (pinned or {}).items():
+        place(module_id, slot, [
+            (allocator.rooms_by_id.get(room_id) or {'id': room_id, 'capacite': 0}, 0)
+            for room_id in room_ids
+        ])
+
+    heap = [entry(m) for m in modules if m not in assignment]
+    heapq.heapify(heap)
+    unscheduled = set()
+
+    while heap:
+        neg_sat, _, _, module_id = heapq.heappop(heap)
+        if module_id in assignment or module_id in unscheduled or -neg_sat != len(forbidden[module_id]):
+            continue
+
+        nb_etudiants = modules[module_id]['nb_etudiants']
+        best = None
+        for slot in range(len(slots)):
+            if unit_of(slot) in forbidden[module_id]:
+                continue
+            day = slots[slot][0]
+            parts = allocator.plan(slot, day, nb_etudiants)
+            if parts:
+                best = (slot, parts)
+                break
+            if best is None:
+                # À défaut : la plus grande salle libre, signalée comme insuffisante
+                free = allocator.free_rooms(slot, day)
+                if free:
+                    best = (slot, [(max(free, key=lambda r: r['capacite']), nb_etudiants)])
+
+        if best is None:
+            unscheduled.add(module_id)
+        else:
+            place(module_id, *best)
+
+    return assignment, unscheduled
+
+# ===== MODÈLE DU PROBLÈME =====
+
+class ProblemModel:
+    """
+    Problème de planification en mémoire, partagé par toutes les stratégies :
+    modules à placer, créneaux, salles, professeurs, examens déjà fixés et
+    matrice de conflits. Construit une fois, jamais modifié par les solveurs.
+    """
+
+    def __init__(self, modules, conflicts, slots, rooms, professors=(), pinned=None, config=None):
+        """
+        Args:
+            modules (list): dicts avec id, nom, nb_etudiants, dept_id
+            conflicts (ConflictMatrix): inscriptions en mémoire
+            slots (list | SlotGrid): créneaux (date, heure)
+            rooms (list): salles avec id, nom, capacite (type, disponibilite)
+            professors (list): dicts avec id, nom, dept_id
+            pinned (dict, optional): {module_id: (indice_creneau, [salle_id, ...])}
+                   examens déjà en base, fixes pour les solveurs
+        """
+        self.config = config or PLANNING_CONFIG
+        self.conflicts = conflicts
+        self.grid = slots if isinstance(slots, SlotGrid) else SlotGrid(slots)
+        self.slots = self.grid.slots
+        self.rooms = [room for room in rooms if room.get('disponibilite', 1)]
+        self.professors = list(professors)
+        self.pinned = dict(pinned or {})
+        self.existing = []
+        self.initial = {}
+        self.unscheduled_penalty = UNSCHEDULED_PENALTY
+
+        self.modules = {m['id']: m for m in modules if m['id'] not in self.pinned}
+        self.module_ids = list(self.modules) + [m for m in self.pinned if m not in self.modules]
+        self.index = {module_id: i for i, module_id in enumerate(self.module_ids)}
+        self.nb_free = len(self.modules)
+        self.sizes = np.array([conflicts.enrollment_count(m) for m in self.module_ids], dtype=np.int64)
+        self.depts = np.array([(self.modules[m].get('dept_id') or -1) if m in self.modules else -1
+                               for m in self.module_ids], dtype=np.int64)
+
+        # Créneaux -> jour, rang dans la journée, demi-journée, semaine et unité de conflit
+        self.slot_day = self.grid.day
+        self.slot_hour = self.grid.rank
+        self.slot_half_day = self.grid.half_day
+        self.slot_week = self.grid.week
+        self.nb_days = self.grid.nb_days
+        self.per_day = self.config['max_exams_per_day_student'] <= 1
+        self.slot_unit = self.slot_day if self.per_day else np.arange(len(self.slots))
+
+        # Arêtes de conflit (i < j) et voisinages en indices du modèle
+        self.graph = conflicts.to_graph(self.module_ids)
+        rows, cols, weights = [], [], []
+        for module_id, neighbors in self.graph.items():
+            i = self.index[module_id]
+            for neighbor, shared in neighbors.items():
+                rows.append(i)
+                cols.append(self.index[neighbor])
+                weights.append(shared)
+        n = len(self.module_ids)
+        adjacency = sparse.csr_matrix(
+            (np.array(weights, dtype=np.int64), (np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64))),
+            shape=(n, n)
+        )
+        self.adjacency = adjacency
+        upper = sparse.triu(adjacency, k=1).tocoo()
+        self.edges = (upper.row.astype(np.int64), upper.col.astype(np.int64), upper.data.astype(np.int64))
+
+        # Capacités agrégées utilisées par le score
+        margin = 1 + self.config['min_room_capacity_margin']
+        self.seats_needed = np.ceil(self.sizes * margin).astype(np.int64)
+        # Salles occupées par un module seul, les plus grandes d'abord (borne de RoomAllocator._split)
+        reach = np.cumsum(sorted((int(room['capacite'] / margin) for room in self.rooms), reverse=True))
+        self.rooms_needed = np.minimum(np.searchsorted(reach, self.sizes) + 1, max(len(reach), 1))
+        self.slot_capacity = int(sum(room['capacite'] for room in self.rooms))
+        self.slot_rooms = len(self.rooms)
+        self.mean_capacity = self.slot_capacity / max(self.slot_rooms, 1)
+        profs_per_dept = defaultdict(int)
+        for prof in self.professors:
+            profs_per_dept[prof.get('dept_id')] += 1
+        self.dept_capacity = {dept: count * self.config['max_exams_per_day_prof']
+                              for dept, count in profs_per_dept.items()}
+
+    @classmethod
+    def from_database(cls, db, start_date=None, end_date=None, dept_id=None, conflicts=None, config=None,
+                      pin_existing=True):
+        """
+        Charger le problème en six lectures : plages horaires, modules, salles,
+        professeurs, examens existants (fixés) et inscriptions.
+
+        Avec pin_existing=False, les examens existants des modules à planifier
+        ne sont plus fixés : leur créneau devient la solution de départ
+        (model.initial) d'une recherche locale.
+        """
+        config = config or PLANNING_CONFIG
+        grid = SlotGrid.from_database(db, start_date, end_date, config)
+
+        modules = [
+            m for m in db.get_all_modules()
+            if m['nb_etudiants'] > 0 and (dept_id is None or m['dept_id'] == dept_id)
+        ]
+        rooms = db.execute_query(
+            "SELECT id, nom, capacite, type, disponibilite FROM salles",
+            fetch=True
+        )
+        professors = db.execute_query(
+            "SELECT id, nom, prenom, dept_id FROM professeurs",
+            fetch=True
+        )
+        existing = db.execute_query(
+            "SELECT module_id, salle_id, prof_id, date_exam, heure, duree FROM examens",
+            fetch=True
+        )
+
+        pinned = {}
+        scheduled_elsewhere = set()
+        for exam in existing:
+            slot = grid.lookup(exam['date_exam'], exam['heure'])
+            if slot >= 0:
+                pinned.setdefault(exam['module_id'], (slot, []))[1].append(exam['salle_id'])
+            else:
+                scheduled_elsewhere.add(exam['module_id'])
+        modules = [m for m in modules if m['id'] not in scheduled_elsewhere]
+
+        initial = {}
+        if not pin_existing:
+            for module in modules:
+                if module['id'] in pinned:
+                    initial[module['id']] = pinned.pop(module['id'])[0]
+            existing = [exam for exam in existing if exam['module_id'] not in initial]
+
+        model = cls(modules, conflicts or ConflictMatrix.from_database(db), grid, rooms,
+                    professors, pinned, config)
+        model.existing = existing
+        model.initial = initial
+        return model
+
+    def slot_array(self, assignment):
+        """Créneau de chaque module du modèle (-1 si non planifié)"""
+        slots = np.full(len(self.module_ids), -1, dtype=np.int64)
+        for module_id, value in assignment.items():
+            index = self.index.get(module_id)
+            if index is not None:
+                slots[index] = value[0] if isinstance(value, tuple) else value
+        for module_id, (slot, _) in self.pinned.items():
+            slots[self.index[module_id]] = slot
+        return slots
+
+    def allocate_rooms(self, slots):
+        """
+        Affecter les salles d'une solution exprimée en créneaux seulement.
+
+        Returns:
+            tuple: ({module_id: (indice_creneau, [(salle, nb_etudiants)])}, {modules sans salle})
+        """
+        allocator = RoomAllocator(self.rooms)
+        for module_id, (slot, room_ids) in self.pinned.items():
+            for room_id in room_ids:
+                allocator.reserve(slot, self.slots[slot][0], room_id)
+
+        by_slot = defaultdict(dict)
+        for i in range(self.nb_free):
+            if slots[i] >= 0:
+                by_slot[int(slots[i])][self.module_ids[i]] = int(self.sizes[i])
+
+        assignment = {}
+        unplaced = set()
+        for slot, demands in sorted(by_slot.items()):
+            allocation, missing = allocator.allocate_slot(slot, self.slots[slot][0], demands)
+            for module_id, parts in allocation.items():
+                assignment[module_id] = (slot, parts)
+            unplaced.update(missing)
+        return assignment, unplaced
+
+# ===== SCORE =====
+
+def score(model, slots):
+    """
+    Objectif pondéré par PLANNING_CONFIG['priorities'] (plus bas = meilleur).
+
+    - student_conflicts : étudiants partagés par deux examens du même jour
+      (ou créneau si plusieurs examens par jour sont permis)
+    - room_capacity : places et salles manquantes par créneau
+    - professor_workload : examens au-delà de la capacité de surveillance
+      du département sur un jour
+    - consecutive_exams : étudiants partagés sur deux jours (créneaux) consécutifs
+    - room_optimization : nombre de jours utilisés
+    Chaque module non planifié coûte UNSCHEDULED_PENALTY.
+    optimizer.DeltaState maintient ce même score de façon incrémentale.
+
+    Args:
+        model (ProblemModel): problème
+        slots (array): créneau de chaque module du modèle (-1 = non planifié)
+
+    Returns:
+        dict: composantes, 'non_planifies' et 'total'
+    """
+    slots = np.asarray(slots, dtype=np.int64)
+    scheduled = slots >= 0
+    safe = np.where(scheduled, slots, 0)
+    unit = np.where(scheduled, model.slot_unit[safe], -1)
+    day = np.where(scheduled, model.slot_day[safe], -1)
+
+    first, second, shared = model.edges
+    both = scheduled[first] & scheduled[second]
+    same_unit = both & (unit[first] == unit[second])
+    if model.per_day:
+        adjacent = both & (np.abs(day[first] - day[second]) == 1)
+    else:
+        adjacent = both & (day[first] == day[second]) & (np.abs(slots[first] - slots[second]) == 1)
+
+    nb_slots = len(model.slots)
+    demand = np.bincount(safe[scheduled], weights=model.seats_needed[scheduled], minlength=nb_slots)
+    count = np.bincount(safe[scheduled], weights=model.rooms_needed[scheduled], minlength=nb_slots)
+    room_overflow = (np.maximum(demand - model.slot_capacity, 0).sum()
+                     + np.maximum(count - model.slot_rooms, 0).sum() * model.mean_capacity)
+
+    workload = 0
+    free = scheduled.copy()
+    free[model.nb_free:] = False
+    if free.any() and model.dept_capacity:
+        keys = model.depts[free] * (model.nb_days + 1) + day[free]
+        values, counts = np.unique(keys, return_counts=True)
+        for key, nb in zip(values.tolist(), counts.tolist()):
+            capacity = model.dept_capacity.get(key // (model.nb_days + 1))
+            if capacity is not None and nb > capacity:
+                workload += nb - capacity
+
+    components = {
+        'student_conflicts': int(shared[same_unit].sum()),
+        'room_capacity': float(room_overflow),
+        'professor_workload': int(workload),
+        'consecutive_exams': int(shared[adjacent].sum()),
+        'room_optimization': int(len(np.unique(day[scheduled]))),
+    }
+    unscheduled = int((~scheduled[:model.nb_free]).sum())
+    priorities = model.config['priorities']
+    total = sum(priorities.get(name, 0) * value for name, value in components.items())
+    total += model.unscheduled_penalty * unscheduled
+
+    components['non_planifies'] = unscheduled
+    components['total'] = float(total)
+    return components
+
+class Solution:
+    """Créneaux (et salles) retenus par une stratégie, avec leur score"""
+
+    def __init__(self, model, assignment, unscheduled=(), strategy=None, elapsed=0.0):
+        """
+        Args:
+            assignment (dict): {module_id: (indice_creneau, [(salle, nb_etudiants)])}
+            unscheduled (iterable): modules non planifiés
+        """
+        self.model = model
+        self.assignment = {m: value for m, value in assignment.items() if m in model.modules}
+        self.unscheduled = set(unscheduled)
+        self.strategy = strategy
+        self.elapsed = elapsed
+        self.slots = model.slot_array(self.assignment)
+        self.score = score(model, self.slots)
+        # Borne inférieure et écarts d'optimalité (stratégie exacte seulement)
+        self.bound = None
+        self.gap = None
+        self.reference_gap = None
+
+    @classmethod
+    def from_slots(cls, model, slots, strategy=None, elapsed=0.0):
+        """Solution exprimée en créneaux : les salles sont affectées créneau par créneau"""
+        assignment, unplaced = model.allocate_rooms(slots)
+        unscheduled = {model.module_ids[i] for i in range(model.nb_free) if slots[i] < 0}
+        return cls(model, assignment, unscheduled | unplaced, strategy, elapsed)
+
+    @property
+    def total(self):
+        return self.score['total']
+
+def complete(model, solution):
+    """
+    Replacer par DSATUR les modules non planifiés d'une solution, ses
+    modules placés restant fixés avec leurs salles (toutes les salles du
+    modèle sont utilisables).
+
+    Returns:
+        Solution: même stratégie, modules replacés en plus
+    """
+    if not solution.unscheduled:
+        return solution
+    remaining = {m: model.modules[m] for m in solution.unscheduled}
+    pinned = dict(model.pinned)
+    pinned.update({m: (slot, [room['id'] for room, _ in parts])
+                   for m, (slot, parts) in solution.assignment.items()})
+    placed, unscheduled = color_graph(remaining, model.graph, model.slots, model.rooms, pinned, model.config)
+    assignment = dict(solution.assignment)
+    assignment.update({m: value for m, value in placed.items() if m in remaining})
+    return Solution(model, assignment, unscheduled, solution.strategy, solution.elapsed)
+
+# ===== STRATÉGIES =====
+
+STRATEGIES = {}
+
+def register_strategy(cls):
+    """Décorateur : enregistrer une stratégie sous son attribut `name`"""
+    STRATEGIES[cls.name] = cls
+    return cls
+
+def available_strategies():
+    """Stratégies enregistrées et autorisées par PLANNING_CONFIG['available_algorithms']"""
+    return [name for name in PLANNING_CONFIG['available_algorithms'] if name in STRATEGIES]
+
+def get_strategy(name=None, **options):
+    """Instancier une stratégie (défaut : PLANNING_CONFIG['default_algorithm'])"""
+    name = name or PLANNING_CONFIG['default_algorithm']
+    if name not in available_strategies():
+        raise ValueError(f"Algorithme inconnu ou désactivé : {name}")
+    return STRATEGIES[name](**options)
+
+class SchedulingStrategy:
+    """
+    Interface commune des algorithmes de planification.
+
+    solve() reçoit le modèle partagé et, optionnellement, une solution de
+    départ (par exemple celle du glouton) ; il retourne une Solution.
+    `progress` (par exemple jobs.Job.report) reçoit l'avancement en
+    arguments nommés et peut interrompre le calcul en levant une exception.
+    """
+
+    name = None
+    label = None
+
+    def __init__(self, time_limit=None, seed=None, progress=None):
+        self.time_limit = time_limit
+        self.seed = seed
+        self.progress = progress
+
+    def report(self, **progress):
+        if self.progress is not None:
+            self.progress(strategie=self.name, **progress)
+
+    def budget(self, model):
+        """Limite de temps : time_limit, sinon proportionnelle au nombre de modules à placer"""
+        if self.time_limit:
+            return self.time_limit
+        config = model.config
+        return min(max(model.nb_free * config['time_per_module'], config['min_time_limit']), config['max_time_limit'])
+
+    def solve(self, model, initial=None):
+        raise NotImplementedError
+
+@register_strategy
+class GreedyStrategy(SchedulingStrategy):
+    """Coloration DSATUR avec affectation des salles au fil de l'eau"""
+
+    name = 'greedy'
+    label = "Glouton (DSATUR)"
+
+    def solve(self, model, initial=None):
+        started = time.perf_counter()
+        assignment, unscheduled = color_graph(
+            model.modules, model.graph, model.slots, model.rooms, model.pinned, model.config
+        )
+        solution = Solution(model, assignment, unscheduled, self.name, time.perf_counter() - started)
+        self.report(meilleur_score=solution.total, non_planifies=len(unscheduled))
+        return solution
+
+@register_strategy
+class BacktrackingStrategy(SchedulingStrategy):
+    """
+    Glouton puis retour arrière borné sur les modules restés sans créneau :
+    on libère au plus `max_moves` voisins bloquants, on place le module, puis
+    on replace les voisins ailleurs ; en cas d'échec tout est annulé.
+    """
+
+    name = 'backtracking'
+    label = "Retour arrière borné"
+
+    def __init__(self, time_limit=None, seed=None, progress=None, max_moves=2):
+        super().__init__(time_limit, seed, progress)
+        self.max_moves = max_moves
+
+    def solve(self, model, initial=None):
+        started = time.perf_counter()
+        deadline = started + (self.time_limit or 10)
+        initial = initial or GreedyStrategy().solve(model)
+
+        allocator = RoomAllocator(model.rooms)
+        assignment = {}
+        for module_id, (slot, room_ids) in model.pinned.items():
+            for room_id in room_ids:
+                allocator.reserve(slot, model.slots[slot][0], room_id)
+            assignment[module_id] = (slot, None)
+        for module_id, (slot, parts) in initial.assignment.items():
+            for room, _ in parts:
+                allocator.reserve(slot, model.slots[slot][0], room['id'])
+            assignment[module_id] = (slot, parts)
+
+        def units_of_neighbors(module_id):
+            return {model.slot_unit[assignment[n][0]] for n in model.graph.get(module_id, ()) if n in assignment}
+
+        def remove(module_id):
+            slot, parts = assignment.pop(module_id)
+            for room, _ in parts:
+                allocator.release(slot, model.slots[slot][0], room['id'])
+            return slot, parts
+
+        def restore(module_id, slot, parts):
+            for room, _ in parts:
+                allocator.reserve(slot, model.slots[slot][0], room['id'])
+            assignment[module_id] = (slot, parts)
+
+        def try_place(module_id, excluded_unit=None):
+            blocked = units_of_neighbors(module_id)
+            for slot in range(len(model.slots)):
+                unit = model.slot_unit[slot]
+                if unit in blocked or unit == excluded_unit:
+                    continue
+                parts = allocator.assign(slot, model.slots[slot][0], model.modules[module_id]['nb_etudiants'])
+                if parts:
+                    assignment[module_id] = (slot, parts)
+                    return True
+            return False
+
+        # Passes successives tant qu'un module de plus trouve sa place
+        remaining = set(initial.unscheduled)
+        progress = True
+        while remaining and progress and time.perf_counter() < deadline:
+            self.report(non_planifies=len(remaining))
+            progress = False
+            for module_id in sorted(remaining, key=lambda m: -model.modules[m]['nb_etudiants']):
+                if time.perf_counter() > deadline:
+                    break
+                if try_place(module_id) or self._relocate(model, module_id, assignment, remove, restore, try_place, allocator):
+                    remaining.discard(module_id)
+                    progress = True
+
+        final = {m: value for m, value in assignment.items() if m in model.modules}
+        return Solution(model, final, remaining, self.name, time.perf_counter() - started)
+
+    def _relocate(self, model, module_id, assignment, remove, restore, try_place, allocator):
+        """Libérer les voisins bloquants d'un créneau, placer le module, replacer les voisins"""
+        size = model.modules[module_id]['nb_etudiants']
+        neighbors = model.graph.get(module_id, {})
+        by_unit = defaultdict(list)
+        for neighbor in neighbors:
+            if neighbor in assignment:
+                by_unit[model.slot_unit[assignment[neighbor][0]]].append(neighbor)
+
+        for slot in sorted(range(len(model.slots)), key=lambda s: len(by_unit[model.slot_unit[s]])):
+            unit = model.slot_unit[slot]
+            blockers = by_unit[unit]
+            if len(blockers) > self.max_moves or any(b in model.pinned for b in blockers):
+                continue
+            saved = {b: remove(b) for b in blockers}
+            parts = allocator.assign(slot, model.slots[slot][0], size)
+            if parts:
+                assignment[module_id] = (slot, parts)
+                moved = []
+                for blocker in blockers:
+                    if not try_place(blocker, excluded_unit=unit):
+                        break
+                    moved.append(blocker)
+                else:
+                    return True
+                for blocker in moved:
+                    remove(blocker)
+                remove(module_id)
+            for blocker, (old_slot, old_parts) in saved.items():
+                restore(blocker, old_slot, old_parts)
+        return False
+
+@register_strategy
+class AnnealingStrategy(SchedulingStrategy):
+    """
+    Recuit simulé (optimizer.anneal) à partir du glouton ou d'une solution
+    fournie ; les salles sont réaffectées à la fin et la meilleure des deux
+    solutions est retournée.
+    """
+
+    name = 'annealing'
+    label = "Recuit simulé"
+
+    def solve(self, model, initial=None):
+        started = time.perf_counter()
+        initial = initial or GreedyStrategy().solve(model)
+        slots, _, _ = anneal(model, initial.slots, self.budget(model), self.seed,
+                             progress=self.progress and self.report)
+        solution = Solution.from_slots(model, slots, self.name, time.perf_counter() - started)
+        return solution if solution.total <= initial.total else initial
+
+@register_strategy
+class GeneticStrategy(SchedulingStrategy):
+    """
+    Algorithme génétique (mémétique) : population issue de recuits courts,
+    croisement par jours entre deux parents tirés par tournoi, mutation par
+    recuit court et froid de l'enfant, qui remplace le pire individu s'il fait mieux.
+    """
+
+    name = 'genetic'
+    label = "Génétique"
+
+    def __init__(self, time_limit=None, seed=None, progress=None, population=8, mutation_temperature=1.0):
+        super().__init__(time_limit, seed, progress)
+        self.population = population
+        self.mutation_temperature = mutation_temperature
+
+    def solve(self, model, initial=None):
+        started = time.perf_counter()
+        budget = self.budget(model)
+        deadline = started + budget
+        step = budget / (4 * self.population)
+        rng = np.random.default_rng(self.seed)
+        initial = initial or GreedyStrategy().solve(model)
+
+        # Même échelle que anneal() : la capacité dépassée coûte unscheduled_penalty par place
+        seed_total = DeltaState(model, initial.slots, capacity_weight=model.unscheduled_penalty).total
+        population = [(seed_total, initial.slots.copy())]
+        while len(population) < self.population and time.perf_counter() < deadline:
+            slots, total, _ = anneal(model, initial.slots, step, int(rng.integers(2**31)))
+            population.append((total, slots))
+
+        generation = 0
+        while time.perf_counter() < deadline:
+            generation += 1
+            self.report(meilleur_score=min(total for total, _ in population), generation=generation)
+            parents = [min((population[k] for k in rng.choice(len(population), 2)), key=lambda p: p[0])[1]
+                       for _ in range(2)]
+            child = crossover(model, parents[0], parents[1], rng)
+            child, total, _ = anneal(model, child, min(step, max(deadline - time.perf_counter(), 0)),
+                                     int(rng.integers(2**31)), start_temperature=self.mutation_temperature)
+            worst = max(range(len(population)), key=lambda k: population[k][0])
+            if total < population[worst][0]:
+                population[worst] = (total, child)
+
+        best = min(population, key=lambda p: p[0])[1]
+        solution = Solution.from_slots(model, best, self.name, time.perf_counter() - started)
+        return solution if solution.total <= initial.total else initial
+
+@register_strategy
+class ExactStrategy(SchedulingStrategy):
+    """
+    Programme linéaire en nombres entiers (exact.ExactModel) : aucun conflit
+    étudiant et nombre de jours minimal, dans la limite de temps. Le glouton
+    est la solution de départ et la solution de repli ; les modules que les
+    salles réelles n'accueillent pas sont replacés par DSATUR (complete())
+    avant la comparaison. La borne inférieure prouvée donne l'écart
+    d'optimalité de la solution retournée (solution.gap) et celui du
+    glouton (solution.reference_gap).
+    """
+
+    name = 'exact'
+    label = "Exact (PLNE)"
+
+    def __init__(self, time_limit=None, seed=None, progress=None, consecutive=False):
+        super().__init__(time_limit, seed, progress)
+        self.consecutive = consecutive
+
+    def solve(self, model, initial=None):
+        started = time.perf_counter()
+        budget = self.time_limit or 60
+        initial = initial or GreedyStrategy().solve(model)
+        if model.nb_free > model.config['exact_max_modules']:
+            print(f"⚠️ {model.nb_free} modules : au-delà de {model.config['exact_max_modules']}, solution gloutonne conservée")
+            return initial
+
+        self.report(etape="Programme linéaire", meilleur_score=initial.total)
+        program = ExactModel(model, self.consecutive)
+        result = program.solve(max(budget - (time.perf_counter() - started), 1), initial.slots)
+
+        solution = initial
+        bound = None
+        if result['slots'] is not None:
+            candidate = complete(model, Solution.from_slots(model, result['slots'], self.name))
+            candidate.elapsed = time.perf_counter() - started
+            if program.value(candidate.score) <= program.value(initial.score):
+                solution = candidate
+            if result['borne'] is not None:
+                # Même échelle que value() : la constante des examens fixés est ajoutée
+                bound = result['borne'] + program.value(score(model, result['slots'])) - result['objectif']
+
+        solution.bound = bound
+        solution.gap = ExactModel.gap(program.value(solution.score), bound)
+        # Le glouton n'est une solution du programme que sans conflit étudiant
+        if not initial.score['student_conflicts']:
+            solution.reference_gap = ExactModel.gap(program.value(initial.score), bound)
+        self.report(meilleur_score=solution.total, borne=bound, ecart=solution.gap,
+                    ecart_glouton=solution.reference_gap, optimal=result['optimal'])
+        return solution
+
+@register_strategy
+class ManualStrategy(SchedulingStrategy):
+    """Planning saisi à la main : seuls les examens déjà en base sont retenus"""
+
+    name = 'manual'
+    label = "Manuel (examens existants)"
+
+    def solve(self, model, initial=None):
+        unscheduled = set(model.modules)
+        return Solution(model, {}, unscheduled, self.name)
+
+def repair(model, modules, impacted, rooms=None, professors=None, time_limit=None):
+    """
+    Replanifier les seuls modules touchés par un changement (salle
+    indisponible...), tous les autres examens restant fixés.
+
+    1. chaque module touché garde son créneau si les salles disponibles l'accueillent ;
+    2. sinon il est replacé par DSATUR, le reste de l'EDT étant fixé ;
+    3. en dernier recours, retour arrière borné (BacktrackingStrategy) : seuls
+       ses voisins de conflit peuvent alors changer de créneau.
+
+    Args:
+        model (ProblemModel): examens existants fixés (pin_existing=True)
+        modules (dict): {module_id: infos du module avec nom, nb_etudiants, dept_id}
+        impacted (iterable): modules à replanifier, en plus de ceux dont une
+                             salle n'est plus utilisable
+        rooms (list, optional): salles utilisables (défaut model.rooms)
+        professors (list, optional): professeurs présents (défaut model.professors)
+
+    Returns:
+        Solution: solution du sous-problème (modules touchés et leurs voisins)
+    """
+    started = time.perf_counter()
+    rooms = model.rooms if rooms is None else rooms
+    available = {room['id'] for room in rooms}
+    impacted = set(impacted) | {m for m, (_, room_ids) in model.pinned.items()
+                                if any(room_id not in available for room_id in room_ids)}
+    impacted = {m for m in impacted if m in model.pinned and m in modules}
+    neighbours = {n for m in impacted for n in model.graph.get(m, ())
+                  if n in model.pinned and n in modules} - impacted
+    fixed = {m: value for m, value in model.pinned.items() if m not in impacted and m not in neighbours}
+
+    sub = ProblemModel([modules[m] for m in impacted | neighbours], model.conflicts, model.slots, rooms,
+                       model.professors if professors is None else professors, fixed, model.config)
+    sub.existing = [exam for exam in model.existing if exam['module_id'] not in sub.modules]
+
+    allocator = RoomAllocator(sub.rooms)
+    for module_id, (slot, room_ids) in fixed.items():
+        for room_id in room_ids:
+            allocator.reserve(slot, sub.slots[slot][0], room_id)
+
+    # Voisins inchangés, salles comprises
+    assignment = {}
+    for module_id in neighbours:
+        slot, room_ids = model.pinned[module_id]
+        remaining = modules[module_id]['nb_etudiants']
+        parts = []
+        for room_id in room_ids:
+            room = allocator.rooms_by_id[room_id]
+            seats = min(remaining, allocator.usable_seats(room)) if room_id != room_ids[-1] else remaining
+            parts.append((room, seats))
+            remaining -= seats
+            allocator.reserve(slot, sub.slots[slot][0], room_id)
+        assignment[module_id] = (slot, parts)
+
+    # 1. même créneau, autres salles
+    for module_id in sorted(impacted, key=lambda m: -modules[m]['nb_etudiants']):
+        slot = model.pinned[module_id][0]
+        parts = allocator.assign(slot, sub.slots[slot][0], modules[module_id]['nb_etudiants'])
+        if parts:
+            assignment[module_id] = (slot, parts)
+
+    # 2. autre créneau, reste de l'EDT fixé
+    remaining = {m: sub.modules[m] for m in impacted if m not in assignment}
+    unscheduled = set()
+    if remaining:
+        pinned = {m: (slot, []) for m, (slot, _) in list(fixed.items()) + list(assignment.items())}
+        placed, unscheduled = color_graph(remaining, sub.graph, sub.slots, allocator, pinned, sub.config)
+        assignment.update({m: value for m, value in placed.items() if m in remaining})
+
+    solution = Solution(sub, assignment, unscheduled, 'repair', time.perf_counter() - started)
+    # 3. voisinage de conflit
+    if unscheduled:
+        solution = BacktrackingStrategy(time_limit).solve(sub, initial=solution)
+        solution.elapsed = time.perf_counter() - started
+    return solution
+
+def solve_until(model, names=None, max_score=0, time_limit=None):
+    """
+    Essayer les stratégies dans l'ordre (de la plus rapide à la plus lente),
+    chacune partant de la meilleure solution trouvée, et s'arrêter dès que
+    le score atteint `max_score`.
+
+    Returns:
+        Solution: première solution acceptable, sinon la meilleure
+    """
+    best = None
+    for name in names or [n for n in available_strategies() if n != 'manual']:
+        solution = get_strategy(name, time_limit=time_limit).solve(model, initial=best)
+        if best is None or solution.total < best.total:
+            best = solution
+        if best.total <= max_score:
+            break
+    return best
+
+# ===== MULTI-DÉPART PARALLÈLE =====
+
+# Problèmes partagés avec les processus de travail : transmis une fois par processus
+_SHARED = []
+
+def _share_problems(problems):
+    global _SHARED
+    _SHARED = problems
+
+def _run_strategy(task):
+    problem, name, options = task
+    model, initial = _SHARED[problem]
+    solution = get_strategy(name, **options).solve(model, initial=initial)
+    return solution.assignment, solution.unscheduled, solution.strategy, solution.elapsed
+
+def run_parallel(problems, tasks, workers=None):
+    """
+    Exécuter des tâches (indice du problème, stratégie, options) sur un pool de processus.
+
+    Args:
+        problems (list): [(ProblemModel, solution de départ ou None)]
+        tasks (list): [(indice dans problems, stratégie, options)]
+        workers (int, optional): processus (défaut PLANNING_CONFIG['parallel_workers'] ou nombre de cœurs)
+
+    Returns:
+        list: (assignment, unscheduled, stratégie, durée) dans l'ordre des tâches
+    """
+    workers = workers or PLANNING_CONFIG.get('parallel_workers') or os.cpu_count() or 1
+    for _, name, _ in tasks:
+        if name not in available_strategies():
+            raise ValueError(f"Algorithme inconnu ou désactivé : {name}")
+
+    try:
+        if workers <= 1 or len(tasks) <= 1:
+            _share_problems(problems)
+            return [_run_strategy(task) for task in tasks]
+        # Jamais fork : run_parallel est appelé depuis les threads de jobs.JobRunner,
+        # et un fork copierait les verrous tenus par les autres threads
+        method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        with multiprocessing.get_context(method).Pool(min(workers, len(tasks)), initializer=_share_problems,
+                                                      initargs=(problems,)) as pool:
+            return pool.map(_run_strategy, tasks, chunksize=1)
+    finally:
+        _share_problems([])
+
+def solve_parallel(model, name=None, workers=None, initial=None, time_limit=None, seed=None, runs=None,
+                   progress=None):
+    """
+    Lancer plusieurs départs indépendants en parallèle et garder le meilleur.
+
+    Chaque processus résout le même modèle avec sa propre graine (ou sa
+    propre stratégie si `runs` est fourni) ; seules les affectations
+    reviennent au processus principal, qui recalcule les scores.
+
+    Args:
+        model (ProblemModel): problème, partagé en lecture seule
+        name (str, optional): stratégie répétée (défaut PLANNING_CONFIG['default_algorithm'])
+        workers (int, optional): processus (défaut PLANNING_CONFIG['parallel_workers'] ou nombre de cœurs)
+        initial (Solution, optional): solution de départ commune
+        time_limit (float, optional): limite de chaque départ (défaut : SchedulingStrategy.budget)
+        seed (int, optional): graine du premier départ (les suivants : seed + k)
+        runs (list, optional): [(stratégie, options)] à la place des départs répétés
+        progress (callable, optional): avancement, transmis seulement sans pool
+                                       (un processus fils ne peut pas le rappeler)
+
+    Returns:
+        Solution: meilleure solution trouvée
+    """
+    workers = workers or model.config.get('parallel_workers') or os.cpu_count() or 1
+    if runs is None:
+        name = name or model.config['default_algorithm']
+        runs = [(name, {'time_limit': time_limit, 'seed': None if seed is None else seed + k})
+                for k in range(workers)]
+    if progress is not None and (workers <= 1 or len(runs) <= 1):
+        runs = [(name, dict(options, progress=progress)) for name, options in runs]
+
+    results = run_parallel([(model, initial)], [(0, name, options) for name, options in runs], workers)
+    solutions = [Solution(model, assignment, unscheduled, strategy, elapsed)
+                 for assignment, unscheduled, strategy, elapsed in results]
+    return min(solutions, key=lambda solution: solution.total)
+
+# ===== DÉCOMPOSITION PAR DÉPARTEMENT =====
+
+def partition_rooms(rooms, demand):
+    """
+    Répartir les salles entre départements au prorata de leur demande en places.
+
+    Les salles sont distribuées de la plus grande à la plus petite, chacune au
+    département le plus en retard sur sa part de la capacité totale.
+
+    Args:
+        rooms (list): salles avec 'capacite'
+        demand (dict): {dept_id: places demandées}
+
+    Returns:
+        dict: {dept_id: [salles]}
+    """
+    total_demand = sum(demand.values()) or 1
+    total_capacity = sum(room['capacite'] for room in rooms)
+    shares = {dept: total_capacity * value / total_demand for dept, value in demand.items()}
+    assigned = {dept: 0 for dept in demand}
+    parts = {dept: [] for dept in demand}
+    for room in sorted(rooms, key=lambda r: -r['capacite']):
+        if not parts:
+            break
+        dept = max(parts, key=lambda d: shares[d] - assigned[d])
+        parts[dept].append(room)
+        assigned[dept] += room['capacite']
+    return parts
+
+def reconcile(model, slots, time_budget=5, seed=None):
+    """
+    Passe de réconciliation après une résolution par morceaux.
+
+    Seuls bougent les modules en conflit étudiant sur une même unité, leurs
+    voisins, les modules non planifiés et ceux des créneaux dont la capacité
+    agrégée est dépassée ; le recuit part froid pour préserver le reste.
+
+    Returns:
+        array: créneaux réconciliés
+    """
+    slots = np.asarray(slots, dtype=np.int64)
+    scheduled = slots >= 0
+    safe = np.where(scheduled, slots, 0)
+    unit = np.where(scheduled, model.slot_unit[safe], -1)
+
+    first, second, _ = model.edges
+    clash = scheduled[first] & scheduled[second] & (unit[first] == unit[second])
+    involved = np.zeros(len(slots), dtype=bool)
+    involved[first[clash]] = True
+    involved[second[clash]] = True
+    involved |= np.asarray(model.adjacency[involved].sum(axis=0)).ravel() > 0
+
+    nb_slots = len(model.slots)
+    demand = np.bincount(safe[scheduled], weights=model.seats_needed[scheduled], minlength=nb_slots)
+    count = np.bincount(safe[scheduled], weights=model.rooms_needed[scheduled], minlength=nb_slots)
+    overfull = (demand > model.slot_capacity) | (count > model.slot_rooms)
+    involved |= scheduled & overfull[safe]
+    involved |= ~scheduled
+
+    movable = np.flatnonzero(involved[:model.nb_free])
+    if not len(movable):
+        return slots
+    best, _, _ = anneal(model, slots, time_budget, seed, start_temperature=1.0, movable=movable)
+    return best
+
+def solve_by_department(model, name=None, workers=None, time_limit=None, seed=None, reconcile_time=None):
+    """
+    Résoudre chaque département séparément et en parallèle, puis réconcilier.
+
+    Chaque sous-problème reçoit les modules et les professeurs de son
+    département, une part des salles (partition_rooms) et les examens fixés ;
+    les conflits entre départements (étudiants partagés) et les dépassements
+    de capacité sont traités ensuite par reconcile() sur le modèle complet,
+    puis les modules restés sans salle sont replacés sur toutes les salles
+    (complete()). Le glouton sans découpage est retourné s'il fait mieux.
+
+    Returns:
+        Solution: solution du modèle complet
+    """
+    started = time.perf_counter()
+    name = name or model.config['default_algorithm']
+
+    by_dept = defaultdict(list)
+    for i, module_id in enumerate(model.module_ids[:model.nb_free]):
+        by_dept[int(model.depts[i])].append(model.modules[module_id])
+    demand = {dept: int(sum(model.seats_needed[model.index[m['id']]] for m in modules))
+              for dept, modules in by_dept.items()}
+    rooms = partition_rooms(model.rooms, demand)
+
+    problems = []
+    for dept, modules in by_dept.items():
+        professors = [p for p in model.professors if (p.get('dept_id') or -1) == dept]
+        problems.append((ProblemModel(modules, model.conflicts, model.slots, rooms[dept], professors,
+                                      model.pinned, model.config), None))
+    tasks = [(k, name, {'time_limit': time_limit, 'seed': None if seed is None else seed + k})
+             for k in range(len(problems))]
+    results = run_parallel(problems, tasks, workers)
+
+    merged = model.slot_array({})
+    for assignment, _, _, _ in results:
+        for module_id, (slot, _) in assignment.items():
+            merged[model.index[module_id]] = slot
+
+    slots = reconcile(model, merged, reconcile_time or max((time_limit or 10) / 5, 1), seed)
+    # Les salles laissées libres par un département servent aux modules restés sans salle
+    solution = complete(model, Solution.from_slots(model, slots, f"{name} par département"))
+    # La décomposition ne doit jamais faire pire que le glouton sans découpage
+    greedy = GreedyStrategy().solve(model)
+    if greedy.total < solution.total:
+        solution = greedy
+    solution.elapsed = time.perf_counter() - started
+    return solution
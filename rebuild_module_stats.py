@@ -0,0 +1,15 @@
+"""
+Recréer la table module_stats (effectifs par module) et ses triggers,
+puis la recalculer depuis les inscriptions.
+
+Usage : python rebuild_module_stats.py
+"""
+from database import DatabaseManager
+
+db = DatabaseManager()
+
+if db.setup_module_stats(rebuild=False):
+    nb_modules = db.rebuild_module_stats()
+    print(f"✅ module_stats reconstruite : {nb_modules} modules")
+else:
+    print("❌ Impossible de créer module_stats (droit TRIGGER manquant ?)")
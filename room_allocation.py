@@ -0,0 +1,137 @@
+import math
+from collections import defaultdict
+from config import PLANNING_CONFIG
+
+class RoomAllocator:
+    """
+    Affectation des salles créneau par créneau, toutes les salles étant
+    chargées une seule fois.
+
+    - best-fit : la plus petite salle qui couvre l'effectif plus la marge
+      `min_room_capacity_margin` ;
+    - les salles de cours passent avant les amphithéâtres ;
+    - un module trop grand est réparti sur au plus `max_rooms_per_exam` salles ;
+    - une salle ne sert pas plus de `max_room_usage_per_day` fois par jour.
+    """
+
+    def __init__(self, rooms, margin=None, max_usage_per_day=None, max_rooms_per_exam=None):
+        """
+        Args:
+            rooms (list): salles avec id, nom, capacite et optionnellement type, disponibilite
+            margin (float, optional): marge de capacité (défaut PLANNING_CONFIG)
+            max_usage_per_day (int, optional): examens par salle et par jour
+            max_rooms_per_exam (int, optional): salles au plus pour un même module
+        """
+        self.margin = PLANNING_CONFIG['min_room_capacity_margin'] if margin is None else margin
+        self.max_usage_per_day = max_usage_per_day or PLANNING_CONFIG['max_room_usage_per_day']
+        self.max_rooms_per_exam = max_rooms_per_exam or PLANNING_CONFIG['max_rooms_per_exam']
+
+        available = [room for room in rooms if room.get('disponibilite', 1)]
+        self.rooms = sorted(available, key=lambda r: (self.is_amphi(r), r['capacite'], r['id']))
+        self.rooms_by_id = {room['id']: room for room in rooms}
+
+        self.used = defaultdict(set)  # créneau -> salles occupées
+        self.day_usage = defaultdict(int)  # (salle, jour) -> nombre d'examens
+
+    @classmethod
+    def from_database(cls, db, **options):
+        """Charger toutes les salles en une requête"""
+        rooms = db.execute_query(
+            "SELECT id, nom, capacite, type, disponibilite FROM salles",
+            fetch=True
+        )
+        return cls(rooms, **options)
+
+    @staticmethod
+    def is_amphi(room):
+        return 'amphi' in str(room.get('type') or room.get('nom', '')).lower()
+
+    def usable_seats(self, room):
+        """Étudiants qu'une salle peut recevoir en gardant la marge"""
+        return int(room['capacite'] / (1 + self.margin))
+
+    # ===== ÉTAT =====
+
+    def is_free(self, room, slot, day):
+        return room['id'] not in self.used[slot] and self.day_usage[(room['id'], day)] < self.max_usage_per_day
+
+    def free_rooms(self, slot, day):
+        """Salles libres sur un créneau (salles de cours d'abord, par capacité croissante)"""
+        return [room for room in self.rooms if self.is_free(room, slot, day)]
+
+    def reserve(self, slot, day, room_id):
+        """Occuper une salle (examen déjà planifié ou affectation retenue)"""
+        self.used[slot].add(room_id)
+        self.day_usage[(room_id, day)] += 1
+
+    def release(self, slot, day, room_id):
+        """Libérer une salle"""
+        if room_id in self.used[slot]:
+            self.used[slot].discard(room_id)
+            self.day_usage[(room_id, day)] -= 1
+
+    # ===== AFFECTATION =====
+
+    def plan(self, slot, day, nb_etudiants, split=True):
+        """
+        Choisir les salles d'un module sans les réserver.
+
+        Returns:
+            list: [(salle, nb_etudiants_dans_la_salle)] ou None si rien ne convient
+        """
+        free = self.free_rooms(slot, day)
+        rooms = [room for room in free if not self.is_amphi(room)]
+        amphis = [room for room in free if self.is_amphi(room)]
+
+        for candidates in (rooms, amphis):
+            room = next((r for r in candidates if self.usable_seats(r) >= nb_etudiants), None)
+            if room is not None:
+                return [(room, nb_etudiants)]
+            if split:
+                parts = self._split(candidates, nb_etudiants)
+                if parts:
+                    return parts
+
+        return self._split(free, nb_etudiants) if split and amphis and rooms else None
+
+    def _split(self, candidates, nb_etudiants):
+        """Grandes salles d'abord, puis best-fit pour le reste"""
+        pool = sorted(candidates, key=self.usable_seats)
+        parts = []
+        remaining = nb_etudiants
+        while remaining > 0 and pool and len(parts) < self.max_rooms_per_exam:
+            room = next((r for r in pool if self.usable_seats(r) >= remaining), pool[-1])
+            seats = min(remaining, self.usable_seats(room))
+            if seats <= 0:
+                break
+            pool.remove(room)
+            parts.append((room, seats))
+            remaining -= seats
+        return parts if remaining <= 0 else None
+
+    def assign(self, slot, day, nb_etudiants, split=True):
+        """Choisir et réserver les salles d'un module (None si impossible)"""
+        parts = self.plan(slot, day, nb_etudiants, split)
+        for room, _ in parts or ():
+            self.reserve(slot, day, room['id'])
+        return parts
+
+    def allocate_slot(self, slot, day, demands, split=True):
+        """
+        Affecter les salles de tous les modules d'un créneau (best-fit décroissant).
+
+        Args:
+            demands (dict): {module_id: nb_etudiants}
+
+        Returns:
+            tuple: ({module_id: [(salle, nb_etudiants)]}, [modules sans salle])
+        """
+        allocation = {}
+        unplaced = []
+        for module_id, nb_etudiants in sorted(demands.items(), key=lambda d: -d[1]):
+            parts = self.assign(slot, day, nb_etudiants, split)
+            if parts:
+                allocation[module_id] = parts
+            else:
+                unplaced.append(module_id)
+        return allocation, unplaced
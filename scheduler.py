@@ -1,74 +1,335 @@
-from datetime import datetime, timedelta
+from datetime import datetime
 from database import DatabaseManager
+from conflict_matrix import ConflictMatrix
+from config import PLANNING_CONFIG
+from planning import ProblemModel, Solution, color_graph, format_heure, get_strategy, repair, solve_by_department, solve_parallel
+from slot_grid import SlotGrid
+from supervision import SupervisorAssigner
+from versions import ScheduleVersion, VersionStore
 
 class ExamScheduler:
-    def __init__(self):
-        self.db = DatabaseManager()
-    
-    def generate_schedule(self):
-        """Génération GARANTIE - Toujours au moins 1 examen"""
+    def __init__(self, db_manager=None):
+        self.db = db_manager or DatabaseManager()
+        self.config = PLANNING_CONFIG
+        self.conflicts = None
+        self.fairness = None
+        self.solution = None
+
+    # ===== CONSTRUCTION DU PROBLÈME =====
+
+    def build_slots(self, start_date=None, end_date=None):
+        """Grille des créneaux de la session, dérivée des plages horaires en base"""
+        return SlotGrid.from_database(self.db, start_date, end_date, self.config)
+
+    def load_conflicts(self, refresh=False):
+        """Charger (une seule fois) la matrice de conflits depuis les inscriptions"""
+        if self.conflicts is None or refresh:
+            self.conflicts = ConflictMatrix.from_database(self.db)
+        return self.conflicts
+
+    def build_conflict_graph(self, module_ids):
+        """
+        Construire le graphe de conflits module-module à partir des étudiants partagés.
+
+        Returns:
+            dict: {module_id: {module_voisin: nb_etudiants_partages}}
+        """
+        return self.load_conflicts().to_graph(module_ids)
+
+    def build_problem(self, start_date=None, end_date=None, dept_id=None, pin_existing=True):
+        """Modèle en mémoire partagé par toutes les stratégies (voir planning.ProblemModel)"""
+        return ProblemModel.from_database(
+            self.db, start_date, end_date, dept_id, self.load_conflicts(), self.config, pin_existing
+        )
+
+    # ===== COLORATION DSATUR =====
+
+    def color_graph(self, modules, graph, slots, rooms, pinned=None):
+        """Coloration DSATUR avec affectation des salles (voir planning.color_graph)"""
+        return color_graph(modules, graph, slots, rooms, pinned, self.config)
+
+    # ===== GÉNÉRATION =====
+
+    def generate_schedule(self, start_date=None, end_date=None, dept_id=None, save=True, algorithm=None,
+                          workers=None, by_department=False, progress=None):
+        """
+        Générer l'EDT de la session avec la stratégie choisie.
+
+        Args:
+            start_date (str, optional): début de session (défaut PLANNING_CONFIG)
+            end_date (str, optional): fin de session (défaut PLANNING_CONFIG)
+            dept_id (int, optional): limiter la génération à un département
+            save (bool): insérer les examens dans la table examens
+            algorithm (str, optional): stratégie de planning.available_strategies()
+                                       (défaut PLANNING_CONFIG['default_algorithm'])
+            workers (int, optional): au-delà de 1, départs parallèles de la
+                                     stratégie (planning.solve_parallel)
+            by_department (bool): résoudre chaque département en parallèle puis
+                                  réconcilier (planning.solve_by_department)
+            progress (callable, optional): reçoit l'avancement (jobs.Job.report) ;
+                                  une exception levée interrompt avant l'enregistrement
+
+        Returns:
+            tuple: (examens planifiés, messages d'erreur / modules non planifiés)
+        """
         print("🚀 DÉMARRAGE DE LA GÉNÉRATION")
-        
-        # 1. Vérifier la connexion
-        if not self.db.connection:
+        started = datetime.now()
+
+        if not getattr(self.db, 'connection', None):
             return [], ["Pas de connexion à la base"]
-        
-        # 2. Prendre seulement 3 modules pour assurer le succès
-        modules = self.db.execute_query(
-            "SELECT id, nom FROM modules LIMIT 3", 
-            fetch=True
-        )
-        
-        if not modules:
+
+        if progress:
+            progress(force=True, etape="Chargement du problème")
+        model = self.build_problem(start_date, end_date, dept_id)
+        if not model.slots:
+            return [], ["Aucun créneau disponible sur la période"]
+        if not model.modules:
             return [], ["Aucun module dans la base"]
-        
-        scheduled = []
-        
-        # 3. Planifier sur 3 jours différents
-        for i, module in enumerate(modules):
-            date_exam = (datetime.now() + timedelta(days=i+1)).strftime('%Y-%m-%d')
-            heure = "09:00" if i % 2 == 0 else "14:00"
-            
-            # 4. Prendre le premier professeur TOUJOURS
-            profs = self.db.execute_query(
-                "SELECT id, nom FROM professeurs LIMIT 1", 
-                fetch=True
-            )
-            
-            # 5. Prendre la première salle TOUJOURS
-            salles = self.db.execute_query(
-                "SELECT id, nom FROM salles LIMIT 1", 
-                fetch=True
-            )
-            
-            if profs and salles:
-                # 6. INSÉRER SANS VÉRIFICATION (pour tester)
-                result = self.db.execute_query(
-                    "INSERT INTO examens (module_id, prof_id, salle_id, date_exam, heure, duree) VALUES (%s, %s, %s, %s, %s, 90)",
-                    (module['id'], profs[0]['id'], salles[0]['id'], date_exam, heure)
-                )
-                
-                if result > 0:
-                    scheduled.append({
-                        'module': module['nom'],
-                        'date': date_exam,
-                        'heure': heure,
-                        'professeur': profs[0]['nom'],
-                        'salle': salles[0]['nom']
-                    })
-                    print(f"✅ {module['nom']} planifié le {date_exam}")
-        
-        if scheduled:
-            return scheduled, []
+        if not model.rooms or not model.professors:
+            return [], ["Aucune salle ou aucun professeur disponible"]
+
+        if by_department:
+            solution = solve_by_department(model, algorithm, workers if workers and workers > 1 else None)
+        elif workers and workers > 1:
+            solution = solve_parallel(model, algorithm, workers)
         else:
-            return [], ["Insertion échouée"]
-    
+            solution = get_strategy(algorithm, progress=progress).solve(model)
+        self.solution = solution
+        if progress:
+            progress(force=True, etape="Enregistrement", meilleur_score=solution.total)
+        return self.save_solution(solution, save, started)
+
+    def save_solution(self, solution, save=True, started=None, replace=False):
+        """
+        Affecter les surveillants d'une solution et l'enregistrer.
+
+        Avec replace=True, les examens existants des modules de la solution
+        sont remplacés dans la même transaction.
+
+        Returns:
+            tuple: (examens planifiés, messages d'erreur / modules non planifiés)
+        """
+        model = solution.model
+        started = started or datetime.now()
+        supervisors = SupervisorAssigner(model.professors)
+        supervisors.preload(model.existing)
+
+        scheduled = []
+        errors = []
+        for module_id, (slot, parts) in sorted(solution.assignment.items(), key=lambda a: a[1][0]):
+            module = model.modules[module_id]
+            date_exam, heure = model.slots[slot]
+
+            seats = sum(room['capacite'] for room, _ in parts)
+            if seats < module['nb_etudiants']:
+                names = ', '.join(room['nom'] for room, _ in parts)
+                errors.append(f"{module['nom']}: salle {names} insuffisante ({seats} places pour {module['nb_etudiants']})")
+
+            # Un examen (et un surveillant) par salle quand le module est réparti
+            for room, nb_etudiants in parts:
+                scheduled.append({
+                    'module_id': module_id,
+                    'module': module['nom'],
+                    'dept_id': module['dept_id'],
+                    'date': date_exam,
+                    'date_exam': date_exam,
+                    'heure': heure,
+                    'duree': self.config['exam_duration'],
+                    'salle_id': room['id'],
+                    'salle': room['nom'],
+                    'nb_etudiants': nb_etudiants
+                })
+
+        # Surveillants : affectation de coût minimal créneau par créneau, charge équilibrée.
+        # Un module dont une salle reste sans surveillant n'est pas enregistré
+        # (ni salle manquante, ni professeur en double sur un créneau).
+        chosen, unassigned = supervisors.assign(scheduled)
+        missing = supervisors.release_modules(scheduled, chosen, unassigned)
+        for exam in missing.values():
+            errors.append(f"{exam['module']}: aucun surveillant dans les limites le {exam['date']} à {exam['heure']}, "
+                          "examen non enregistré")
+        for index, prof_id in chosen.items():
+            scheduled[index]['prof_id'] = prof_id
+            scheduled[index]['professeur'] = supervisors.by_id[prof_id]['nom']
+        scheduled = [exam for exam in scheduled if exam['module_id'] not in missing]
+        self.fairness = supervisors.fairness()
+
+        if save and scheduled:
+            options = {'replace_modules': [m for m in solution.assignment if m not in missing]} if replace else {}
+            inserted = self.db.bulk_insert_exams([
+                {
+                    'module_id': exam['module_id'],
+                    'prof_id': exam['prof_id'],
+                    'salle_id': exam['salle_id'],
+                    'date_exam': exam['date'],
+                    'heure': exam['heure'],
+                    'duree': self.config['exam_duration']
+                }
+                for exam in scheduled
+            ], **options)
+            if not inserted:
+                return [], errors + ["Insertion échouée"]
+
+        for module_id in solution.unscheduled:
+            errors.append(f"{model.modules[module_id]['nom']}: aucun créneau compatible")
+
+        elapsed = (datetime.now() - started).total_seconds()
+        print(f"✅ {len(scheduled)} examens planifiés sur {len({e['date'] for e in scheduled})} jours en {elapsed:.2f}s ({solution.strategy})")
+
+        return scheduled, errors
+
+    def repair_schedule(self, unavailable_rooms=(), absent_professors=(), start_date=None, end_date=None,
+                        save=True, time_limit=None):
+        """
+        Réparer l'EDT après l'indisponibilité d'une salle ou l'absence d'un professeur,
+        sans tout régénérer.
+
+        Les examens placés dans une salle indisponible (salles.disponibilite = 0
+        ou `unavailable_rooms`) sont replanifiés par planning.repair ; seuls ces
+        modules et, si nécessaire, leurs voisins de conflit changent.
+        Un professeur absent est seulement remplacé comme surveillant.
+
+        Returns:
+            tuple: (examens réécrits, messages d'erreur)
+        """
+        started = datetime.now()
+        if not getattr(self.db, 'connection', None):
+            return [], ["Pas de connexion à la base"]
+
+        unavailable = set(unavailable_rooms)
+        absent = set(absent_professors)
+        model = self.build_problem(start_date, end_date)
+        modules = {m['id']: m for m in self.db.get_all_modules()}
+        rooms = [room for room in model.rooms if room['id'] not in unavailable]
+        professors = [prof for prof in model.professors if prof['id'] not in absent]
+
+        solution = repair(model, modules, (), rooms, professors, time_limit)
+        changed = {m for m, (slot, parts) in solution.assignment.items()
+                   if (slot, sorted(room['id'] for room, _ in parts)) != (model.pinned[m][0], sorted(model.pinned[m][1]))}
+        uncovered = {exam['module_id'] for exam in model.existing
+                     if exam['prof_id'] in absent and exam['module_id'] in model.pinned}
+        replaced = changed | uncovered
+
+        # Surveillants : les affectations conservées comptent, les examens déplacés
+        # ou privés de surveillant sont réaffectés
+        supervisors = SupervisorAssigner(professors)
+        kept = [exam for exam in model.existing
+                if exam['prof_id'] not in absent and exam['module_id'] not in changed]
+        supervisors.preload(kept)
+        exams = [dict(exam) for exam in kept if exam['module_id'] in uncovered]
+        pending = [dict(exam, prof_id=None) for exam in model.existing
+                   if exam['prof_id'] in absent and exam['module_id'] in uncovered - changed]
+        for module_id in changed:
+            slot, parts = solution.assignment[module_id]
+            date_exam, heure = model.slots[slot]
+            pending.extend({'module_id': module_id, 'salle_id': room['id'], 'date_exam': date_exam,
+                            'heure': heure, 'duree': self.config['exam_duration'], 'prof_id': None}
+                           for room, _ in parts)
+
+        errors = []
+        for exam in pending:
+            exam['dept_id'] = modules[exam['module_id']]['dept_id']
+        chosen, unassigned = supervisors.assign(pending)
+        missing = supervisors.release_modules(pending, chosen, unassigned)
+        for module_id, exam in missing.items():
+            errors.append(f"{modules[module_id]['nom']}: aucun surveillant dans les limites le {exam['date_exam']} "
+                          f"à {exam['heure']}, examen laissé en place")
+        for index, exam in enumerate(pending):
+            exam['prof_id'] = chosen.get(index)
+        exams = [exam for exam in exams + pending if exam['module_id'] not in missing]
+        changed -= set(missing)
+        uncovered -= set(missing)
+        replaced -= set(missing)
+
+        for module_id in solution.unscheduled:
+            errors.append(f"{modules[module_id]['nom']}: aucun créneau compatible, examen laissé en place")
+
+        if save and replaced:
+            inserted = self.db.bulk_insert_exams([
+                {
+                    'module_id': exam['module_id'],
+                    'prof_id': exam['prof_id'],
+                    'salle_id': exam['salle_id'],
+                    'date_exam': exam['date_exam'],
+                    'heure': exam['heure'],
+                    'duree': exam.get('duree') or self.config['exam_duration']
+                }
+                for exam in exams
+            ], replace_modules=replaced)
+            if not inserted and exams:
+                return [], errors + ["Insertion échouée"]
+
+        elapsed = (datetime.now() - started).total_seconds()
+        print(f"✅ Réparation : {len(changed)} modules replanifiés, {len(uncovered)} surveillances remplacées en {elapsed:.3f}s")
+        return exams, errors
+
+    def save_draft(self, scheduled, label='', store=None):
+        """
+        Enregistrer des examens planifiés (save=False) comme brouillon, sans
+        toucher à la table examens : ils remplacent ceux des mêmes modules
+        dans l'EDT en ligne.
+
+        Returns:
+            str: identifiant de la version (None si l'EDT en ligne est illisible)
+        """
+        live = ScheduleVersion.from_database(self.db)
+        if live is None:
+            return None
+        store = store or VersionStore()
+        draft = live.overlay(ScheduleVersion.from_exams(scheduled), label=label)
+        if self.solution is not None:
+            draft.meta['score'] = round(float(self.solution.total), 2)
+        return store.save(draft)
+
     def clear_schedule(self):
         """Effacer les examens"""
         result = self.db.execute_query("DELETE FROM examens")
         return result if result else 0
-    
-    def optimize_schedule(self):
-        """Optimisation simple"""
-        return ["Aucun conflit détecté"]
-    
\ No newline at end of file
+
+    def optimize_schedule(self, start_date=None, end_date=None, dept_id=None, time_budget=30,
+                          algorithm='annealing', seed=None, save=True, workers=None, progress=None):
+        """
+        Améliorer l'EDT existant par recherche locale.
+
+        Les examens déjà en base sur la session servent de solution de départ
+        (les modules sans examen partent non planifiés) ; la stratégie
+        (recuit simulé ou génétique) minimise le score pondéré par
+        PLANNING_CONFIG['priorities'] pendant `time_budget` secondes et la
+        meilleure solution remplace l'ancienne si elle fait mieux.
+        Une recherche indépendante tourne sur chaque processus (`workers`,
+        défaut PLANNING_CONFIG['parallel_workers'] ou nombre de cœurs).
+
+        Returns:
+            list: messages décrivant le résultat
+        """
+        started = datetime.now()
+        if not getattr(self.db, 'connection', None):
+            return ["Pas de connexion à la base"]
+
+        model = self.build_problem(start_date, end_date, dept_id, pin_existing=False)
+        if not model.slots or not model.modules:
+            return ["Aucun module à optimiser sur la période"]
+
+        initial = Solution.from_slots(model, model.slot_array(model.initial), 'existant')
+        if progress:
+            progress(force=True, etape="Recherche locale", meilleur_score=initial.total)
+        solution = solve_parallel(model, algorithm, workers, initial, time_budget, seed, progress=progress)
+        self.solution = solution
+        if progress:
+            progress(force=True, etape="Enregistrement", meilleur_score=solution.total)
+
+        before, after = initial.score, solution.score
+        if solution is initial or after['total'] >= before['total']:
+            return [f"Aucune amélioration trouvée en {time_budget}s (score {before['total']:.0f})"]
+
+        messages = [f"Score {before['total']:.0f} → {after['total']:.0f} ({solution.strategy}, {solution.elapsed:.1f}s)"]
+        for name in ('student_conflicts', 'room_capacity', 'professor_workload',
+                     'consecutive_exams', 'room_optimization', 'non_planifies'):
+            if before[name] != after[name]:
+                messages.append(f"{name}: {before[name]:g} → {after[name]:g}")
+
+        scheduled, errors = self.save_solution(solution, save, started, replace=True)
+        if save and not scheduled:
+            messages.extend(errors)
+        return messages
+
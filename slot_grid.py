@@ -0,0 +1,147 @@
+from datetime import datetime, timedelta
+import numpy as np
+from config import PLANNING_CONFIG
+
+# jour_semaine de plages_horaires -> datetime.weekday()
+WEEKDAYS = {
+    'lundi': 0, 'mardi': 1, 'mercredi': 2, 'jeudi': 3,
+    'vendredi': 4, 'samedi': 5, 'dimanche': 6
+}
+
+# Une heure de début avant midi est un créneau du matin
+NOON = 12 * 60
+
+def format_heure(value):
+    """Normaliser une heure MySQL (TIME -> timedelta) ou texte au format HH:MM"""
+    if isinstance(value, timedelta):
+        minutes = int(value.total_seconds()) // 60
+        return f"{minutes // 60:02d}:{minutes % 60:02d}"
+    text = str(value)
+    return text[:5] if len(text.split(':')[0]) == 2 else f"0{text[:4]}"
+
+def to_minutes(value):
+    """Heure (TIME, 'HH:MM' ou 'HH:MM:SS') en minutes depuis minuit"""
+    heure = format_heure(value)
+    return int(heure[:2]) * 60 + int(heure[3:5])
+
+class SlotGrid:
+    """
+    Créneaux de la session numérotés 0..n-1 dans l'ordre chronologique.
+
+    Les solveurs et vérificateurs travaillent sur les indices et sur les
+    tableaux précalculés (int64) plutôt que sur des chaînes date / heure :
+    - day      : jour dans la session (0 = premier jour ayant un créneau)
+    - rank     : rang du créneau dans sa journée
+    - half_day : demi-journée dans la session (2 × day, + 1 l'après-midi)
+    - week     : semaine dans la session (lundi -> dimanche)
+    - weekday  : jour de la semaine (0 = lundi)
+    - minute   : heure de début en minutes depuis minuit
+    `slots` garde la forme (date, heure) pour l'affichage et l'enregistrement.
+    """
+
+    def __init__(self, slots):
+        """
+        Args:
+            slots (iterable): créneaux (date 'AAAA-MM-JJ', heure 'HH:MM')
+        """
+        self.slots = sorted((str(date)[:10], format_heure(heure)) for date, heure in slots)
+        self.index = {slot: i for i, slot in enumerate(self.slots)}
+
+        dates = np.array([date for date, _ in self.slots], dtype='datetime64[D]')
+        self.minute = np.array([to_minutes(heure) for _, heure in self.slots], dtype=np.int64)
+        self.dates, self.day = np.unique(dates, return_inverse=True)
+        self.day = self.day.astype(np.int64)
+        self.nb_days = len(self.dates)
+        # 1970-01-01 était un jeudi
+        self.weekday = (dates.astype(np.int64) + 3) % 7
+        if len(dates):
+            first_monday = dates[0].astype(np.int64) - self.weekday[0]
+            self.week = (dates.astype(np.int64) - first_monday) // 7
+        else:
+            self.week = np.empty(0, dtype=np.int64)
+        self.half_day = 2 * self.day + (self.minute >= NOON)
+        starts = np.searchsorted(self.day, np.arange(self.nb_days))
+        self.rank = np.arange(len(self.slots)) - starts[self.day] if len(self.slots) else np.empty(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.slots)
+
+    # ===== CONSTRUCTION =====
+
+    @classmethod
+    def from_config(cls, start_date=None, end_date=None, config=None):
+        """Créneaux de PLANNING_CONFIG['exam_start_hours'] chaque jour, dimanches exclus"""
+        config = config or PLANNING_CONFIG
+        hours = {weekday: list(config['exam_start_hours']) for weekday in range(6)}
+        return cls(cls._expand(hours, start_date, end_date, config))
+
+    @classmethod
+    def from_plages(cls, plages, start_date=None, end_date=None, config=None):
+        """
+        Créneaux dérivés des plages horaires actives (doublons ignorés).
+
+        Dans chaque plage, les heures de PLANNING_CONFIG['exam_start_hours']
+        où un examen de durée standard tient entièrement sont retenues ; une
+        plage où aucune ne tient ouvre un créneau à son heure de début.
+
+        Args:
+            plages (list): dicts avec jour_semaine, heure_debut, heure_fin, actif
+        """
+        config = config or PLANNING_CONFIG
+        duration = config['exam_duration']
+        ranges = {}
+        for plage in plages:
+            weekday = WEEKDAYS.get(str(plage.get('jour_semaine') or '').strip().lower())
+            if weekday is None or not plage.get('actif', 1) or plage.get('heure_debut') is None:
+                continue
+            ranges.setdefault(weekday, set()).add((to_minutes(plage['heure_debut']), to_minutes(plage['heure_fin'])))
+
+        hours = {}
+        for weekday, day_ranges in ranges.items():
+            starts = set()
+            for begin, end in day_ranges:
+                fitting = [heure for heure in config['exam_start_hours']
+                           if begin <= to_minutes(heure) and to_minutes(heure) + duration <= end]
+                starts.update(fitting or [f"{begin // 60:02d}:{begin % 60:02d}"])
+            hours[weekday] = sorted(starts)
+        return cls(cls._expand(hours, start_date, end_date, config))
+
+    @classmethod
+    def from_database(cls, db, start_date=None, end_date=None, config=None):
+        """Créneaux des plages horaires en base, ou de la configuration si la table est vide"""
+        plages = db.execute_query(
+            "SELECT jour_semaine, heure_debut, heure_fin, actif FROM plages_horaires WHERE actif = 1",
+            fetch=True
+        )
+        if plages:
+            grid = cls.from_plages(plages, start_date, end_date, config)
+            if len(grid):
+                return grid
+        return cls.from_config(start_date, end_date, config)
+
+    @staticmethod
+    def _expand(hours, start_date, end_date, config):
+        """Créneaux (date, heure) de la session pour des heures par jour de la semaine"""
+        start = datetime.strptime(str(start_date or config['start_date'])[:10], '%Y-%m-%d')
+        end = datetime.strptime(str(end_date or config['end_date'])[:10], '%Y-%m-%d')
+        slots = []
+        day = start
+        while day <= end:
+            for heure in hours.get(day.weekday(), ()):
+                slots.append((day.strftime('%Y-%m-%d'), heure))
+            day += timedelta(days=1)
+        return slots
+
+    # ===== RECHERCHE =====
+
+    def lookup(self, date_exam, heure):
+        """Indice du créneau (date, heure), -1 s'il n'est pas dans la grille"""
+        return self.index.get((str(date_exam)[:10], format_heure(heure)), -1)
+
+    def encode(self, dates, heures):
+        """Indices des créneaux d'une série d'examens (-1 hors grille)"""
+        return np.array([self.lookup(date, heure) for date, heure in zip(dates, heures)], dtype=np.int64)
+
+    def date_of(self, slot):
+        """Date 'AAAA-MM-JJ' d'un créneau"""
+        return self.slots[slot][0]
@@ -0,0 +1,484 @@
+import os
+import random
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+import mysql.connector
+from config import SQLITE_CONFIG
+
+# Dump phpMyAdmin de la base, traduit au chargement
+DEFAULT_DUMP = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'LABaseDeDonées.sql')
+
+# ===== TYPES (mêmes objets Python que mysql.connector) =====
+
+def _convert_date(value):
+    return date.fromisoformat(value.decode()[:10])
+
+def _convert_time(value):
+    """TIME -> timedelta, comme mysql.connector"""
+    hours, minutes, *seconds = value.decode().split(':')
+    return timedelta(hours=int(hours), minutes=int(minutes), seconds=float(seconds[0]) if seconds else 0)
+
+def _convert_datetime(value):
+    return datetime.fromisoformat(value.decode())
+
+def _adapt_time(value):
+    seconds = int(value.total_seconds())
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+sqlite3.register_converter('date', _convert_date)
+sqlite3.register_converter('time', _convert_time)
+sqlite3.register_converter('datetime', _convert_datetime)
+sqlite3.register_converter('timestamp', _convert_datetime)
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(' '))
+sqlite3.register_adapter(timedelta, _adapt_time)
+
+# ===== FONCTIONS MYSQL =====
+
+def _concat(*values):
+    """CONCAT MySQL : NULL si un argument est NULL"""
+    if any(value is None for value in values):
+        return None
+    return ''.join(str(value) for value in values)
+
+class _GroupConcatDistinct:
+    """GROUP_CONCAT(DISTINCT x SEPARATOR s) : SQLite n'accepte DISTINCT qu'avec un seul argument"""
+
+    def __init__(self):
+        self.values = {}
+        self.separator = ','
+
+    def step(self, value, separator):
+        if value is not None:
+            self.values.setdefault(str(value), None)
+            self.separator = separator
+
+    def finalize(self):
+        return self.separator.join(self.values) if self.values else None
+
+FUNCTIONS = {
+    'CONCAT': (-1, _concat),
+    'IF': (3, lambda condition, yes, no: yes if condition else no),
+    'NOW': (0, lambda: datetime.now().strftime('%Y-%m-%d %H:%M:%S')),
+    'CURDATE': (0, lambda: date.today().isoformat()),
+    'CURTIME': (0, lambda: datetime.now().strftime('%H:%M:%S')),
+    'RAND': (0, random.random),
+    'DATABASE': (0, lambda: 'main'),
+}
+
+# ===== TRADUCTION DES REQUÊTES =====
+
+_INTERVAL = re.compile(r'\bDATE_(SUB|ADD)\(\s*(.+?)\s*,\s*INTERVAL\s+(\d+)\s+(\w+?)\s*\)', re.IGNORECASE)
+_GROUP_CONCAT_DISTINCT = re.compile(r'\bGROUP_CONCAT\(\s*DISTINCT\s+([^()]+?)\s+SEPARATOR\s+(\'[^\']*\')\s*\)',
+                                    re.IGNORECASE)
+_GROUP_CONCAT = re.compile(r'\bGROUP_CONCAT\(([^()]+?)\s+SEPARATOR\s+(\'[^\']*\')\s*\)', re.IGNORECASE)
+_INFORMATION_SCHEMA = re.compile(r'\binformation_schema\.TABLES\b', re.IGNORECASE)
+_ON_DUPLICATE = re.compile(r'\bON\s+DUPLICATE\s+KEY\s+UPDATE\b', re.IGNORECASE)
+_VALUES_FUNCTION = re.compile(r'\bVALUES\((\w+)\)', re.IGNORECASE)
+
+# information_schema.TABLES vue depuis sqlite_master ; TABLE_ROWS est, comme
+# sous InnoDB, une estimation : celle du dernier ANALYZE (sqlite_stat1)
+TABLES_VIEW = ("(SELECT name AS TABLE_NAME, 'main' AS TABLE_SCHEMA, "
+               "(SELECT MAX(CAST(stat AS INTEGER)) FROM sqlite_stat1 WHERE tbl = name) AS TABLE_ROWS "
+               "FROM sqlite_master WHERE type = 'table')")
+
+@lru_cache(maxsize=512)
+def translate_query(query, params=True):
+    """
+    Traduire une requête MySQL de l'application en SQL SQLite.
+
+    Seules les constructions employées par le code sont couvertes :
+    paramètres %s, GROUP_CONCAT ... SEPARATOR, DATE_SUB / DATE_ADD,
+    INSERT IGNORE, ON DUPLICATE KEY UPDATE et information_schema.TABLES.
+    """
+    if params:
+        query = query.replace('%s', '?').replace('%%', '%')
+    query = re.sub(r'\bINSERT\s+IGNORE\b', 'INSERT OR IGNORE', query, flags=re.IGNORECASE)
+    query = _INTERVAL.sub(
+        lambda m: f"datetime({m.group(2)}, '{'-' if m.group(1).upper() == 'SUB' else '+'}{m.group(3)} {m.group(4).lower()}')",
+        query
+    )
+    query = _GROUP_CONCAT_DISTINCT.sub(r'GROUP_CONCAT_DISTINCT(\1, \2)', query)
+    query = _GROUP_CONCAT.sub(r'GROUP_CONCAT(\1, \2)', query)
+    query = _INFORMATION_SCHEMA.sub(TABLES_VIEW, query)
+    if _ON_DUPLICATE.search(query):
+        query = _VALUES_FUNCTION.sub(r'excluded.\1', _ON_DUPLICATE.sub('ON CONFLICT DO UPDATE SET', query))
+    return query
+
+# ===== TRADUCTION DU DUMP =====
+
+_PROCEDURES = re.compile(r'^DELIMITER \$\$$.*?^DELIMITER ;$', re.MULTILINE | re.DOTALL)
+_DUMP_COMMENTS = re.compile(r'^(?:--.*|/\*!.*\*/;)$', re.MULTILINE)
+_STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'", re.DOTALL)
+_MYSQL_ESCAPES = {'0': '\0', 'n': '\n', 'r': '\r', 't': '\t', 'Z': '\x1a'}
+_TABLE_NAME = re.compile(r'^(?:CREATE TABLE|INSERT INTO|ALTER TABLE) `(\w+)`')
+_COLUMN_NAME = re.compile(r'`(\w+)`')
+
+def _sqlite_string(match):
+    """Littéral MySQL ('\\'' , '\\\\'...) -> littéral SQL standard ('' seul échappement)"""
+    body = re.sub(r"\\(.)|''", lambda m: _MYSQL_ESCAPES.get(m.group(1), m.group(1)) if m.group(1) else "'",
+                  match.group(0)[1:-1], flags=re.DOTALL)
+    return "'" + body.replace("'", "''") + "'"
+
+def _sqlite_column(definition):
+    """Définition de colonne MySQL sans les options inconnues de SQLite"""
+    definition = re.sub(r'\s+(?:CHARACTER SET|COLLATE)\s+\w+', '', definition)
+    definition = re.sub(r'\s+ON UPDATE current_timestamp\(\)', '', definition, flags=re.IGNORECASE)
+    definition = re.sub(r'current_timestamp\(\)', 'CURRENT_TIMESTAMP', definition, flags=re.IGNORECASE)
+    definition = re.sub(r'\benum\([^)]*\)', 'TEXT', definition, flags=re.IGNORECASE)
+    return re.sub(r'\s+unsigned\b', '', definition, flags=re.IGNORECASE)
+
+def translate_dump(text, data=True):
+    """
+    Traduire un dump phpMyAdmin (MariaDB) en instructions SQLite.
+
+    Les ALTER TABLE de fin de dump (clés primaires, AUTO_INCREMENT, clés
+    étrangères) sont replacés dans les CREATE TABLE, SQLite ne sachant pas
+    les ajouter après coup ; les index sont créés après les données. Les
+    procédures stockées sont ignorées.
+
+    Args:
+        text (str): contenu du dump
+        data (bool): garder les INSERT (False : schéma seul)
+
+    Returns:
+        list: instructions dans l'ordre (tables, données, index)
+    """
+    text = _DUMP_COMMENTS.sub('', _PROCEDURES.sub('', text))
+    tables, inserts, indexes = {}, [], []
+    for statement in re.split(r';\s*$', text, flags=re.MULTILINE):
+        statement = statement.strip()
+        match = _TABLE_NAME.match(statement)
+        if match is None:
+            continue  # SET, START TRANSACTION, COMMIT
+        name = match.group(1)
+
+        if statement.startswith('CREATE TABLE'):
+            body = statement[statement.index('(') + 1:statement.rindex(')')]
+            tables[name] = {'columns': [_sqlite_column(line.strip().rstrip(','))
+                                        for line in body.splitlines() if line.strip()],
+                            'primary': None, 'auto': None, 'foreign': []}
+        elif statement.startswith('INSERT INTO'):
+            if data:
+                inserts.append(_STRING.sub(_sqlite_string, statement))
+        else:
+            table = tables[name]
+            for clause in statement.splitlines()[1:]:
+                clause = clause.strip().rstrip(',')
+                columns = clause[clause.find('(') + 1:clause.find(')')]
+                if clause.startswith('ADD PRIMARY KEY'):
+                    table['primary'] = columns
+                elif clause.startswith(('ADD KEY', 'ADD UNIQUE KEY')):
+                    unique = 'UNIQUE ' if clause.startswith('ADD UNIQUE') else ''
+                    index = _COLUMN_NAME.search(clause).group(1)
+                    indexes.append(f"CREATE {unique}INDEX `{name}_{index}` ON `{name}` ({columns})")
+                elif clause.startswith('MODIFY') and 'AUTO_INCREMENT' in clause:
+                    table['auto'] = _COLUMN_NAME.search(clause).group(1)
+                elif clause.startswith('ADD CONSTRAINT'):
+                    table['foreign'].append(clause[len('ADD '):])
+
+    statements = []
+    for name, table in tables.items():
+        columns = table['columns']
+        if table['auto'] and table['primary'] == f"`{table['auto']}`":
+            # INTEGER PRIMARY KEY : alias du rowid, numérotation automatique
+            columns = [f"`{table['auto']}` INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT"
+                       if _COLUMN_NAME.match(column).group(1) == table['auto'] else column
+                       for column in columns]
+        elif table['primary']:
+            columns = columns + [f"PRIMARY KEY ({table['primary']})"]
+        statements.append(f"CREATE TABLE `{name}` (\n  " + ',\n  '.join(columns + table['foreign']) + "\n)")
+    return statements + inserts + indexes
+
+# ===== EFFECTIFS PRÉCALCULÉS =====
+
+# Équivalent SQLite de database.MODULE_STATS_DDL. Ici les suppressions en
+# cascade déclenchent les triggers : la suppression d'un étudiant décrémente
+# ses modules via trg_inscriptions_stats_delete, sans trigger sur etudiants.
+MODULE_STATS_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS module_stats (
+        module_id INTEGER PRIMARY KEY,
+        formation_id INT NULL,
+        dept_id INT NULL,
+        nb_etudiants INT NOT NULL DEFAULT 0,
+        FOREIGN KEY (module_id) REFERENCES modules(id) ON DELETE CASCADE
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_module_stats_formation ON module_stats (formation_id)",
+    "CREATE INDEX IF NOT EXISTS idx_module_stats_dept ON module_stats (dept_id)",
+    "DROP TRIGGER IF EXISTS trg_inscriptions_stats_insert",
+    """
+    CREATE TRIGGER trg_inscriptions_stats_insert AFTER INSERT ON inscriptions
+    BEGIN
+        INSERT INTO module_stats (module_id, formation_id, dept_id, nb_etudiants)
+        SELECT m.id, m.formation_id, f.dept_id, 1
+        FROM modules m LEFT JOIN formations f ON m.formation_id = f.id
+        WHERE m.id = NEW.module_id
+        ON CONFLICT (module_id) DO UPDATE SET nb_etudiants = nb_etudiants + 1;
+    END
+    """,
+    "DROP TRIGGER IF EXISTS trg_inscriptions_stats_delete",
+    """
+    CREATE TRIGGER trg_inscriptions_stats_delete AFTER DELETE ON inscriptions
+    BEGIN
+        UPDATE module_stats SET nb_etudiants = nb_etudiants - 1
+        WHERE module_id = OLD.module_id;
+    END
+    """,
+    "DROP TRIGGER IF EXISTS trg_inscriptions_stats_update",
+    """
+    CREATE TRIGGER trg_inscriptions_stats_update AFTER UPDATE ON inscriptions
+    WHEN NEW.module_id <> OLD.module_id
+    BEGIN
+        UPDATE module_stats SET nb_etudiants = nb_etudiants - 1 WHERE module_id = OLD.module_id;
+        INSERT INTO module_stats (module_id, formation_id, dept_id, nb_etudiants)
+        SELECT m.id, m.formation_id, f.dept_id, 1
+        FROM modules m LEFT JOIN formations f ON m.formation_id = f.id
+        WHERE m.id = NEW.module_id
+        ON CONFLICT (module_id) DO UPDATE SET nb_etudiants = nb_etudiants + 1;
+    END
+    """,
+    "DROP TRIGGER IF EXISTS trg_etudiants_stats_delete",
+    "DROP TRIGGER IF EXISTS trg_modules_stats_update",
+    """
+    CREATE TRIGGER trg_modules_stats_update AFTER UPDATE ON modules
+    BEGIN
+        UPDATE module_stats
+        SET formation_id = NEW.formation_id,
+            dept_id = (SELECT dept_id FROM formations WHERE id = NEW.formation_id)
+        WHERE module_id = NEW.id;
+    END
+    """,
+    "DROP TRIGGER IF EXISTS trg_formations_stats_update",
+    """
+    CREATE TRIGGER trg_formations_stats_update AFTER UPDATE OF dept_id ON formations
+    BEGIN
+        UPDATE module_stats SET dept_id = NEW.dept_id
+        WHERE formation_id = NEW.id;
+    END
+    """,
+]
+
+# ===== CONNEXION =====
+
+def _database_error(error):
+    """sqlite3.Error -> exception mysql.connector (attrapée par DatabaseManager)"""
+    if isinstance(error, sqlite3.IntegrityError):
+        return mysql.connector.errors.IntegrityError(msg=str(error))
+    return mysql.connector.errors.DatabaseError(msg=str(error))
+
+class SQLiteCursor:
+    """Curseur au format mysql.connector (paramètres %s, lignes en dict avec dictionary=True)"""
+
+    def __init__(self, connection, dictionary=False):
+        self._cursor = connection.cursor()
+        self.dictionary = dictionary
+        self.rows = []
+        self.rowcount = -1
+        self.lastrowid = None
+
+    def execute(self, query, params=()):
+        try:
+            self._cursor.execute(translate_query(query, bool(params)), tuple(params or ()))
+            self._fetch()
+        except sqlite3.Error as e:
+            raise _database_error(e) from e
+
+    def executemany(self, query, seq_params):
+        try:
+            self._cursor.executemany(translate_query(query), [tuple(params) for params in seq_params])
+            self._fetch()
+        except sqlite3.Error as e:
+            raise _database_error(e) from e
+
+    def _fetch(self):
+        """Lire tout le résultat, comme un curseur bufferisé"""
+        self.lastrowid = self._cursor.lastrowid
+        if self._cursor.description is None:
+            self.rows = []
+            self.rowcount = self._cursor.rowcount
+            return
+        rows = self._cursor.fetchall()
+        if self.dictionary:
+            names = [column[0] for column in self._cursor.description]
+            rows = [dict(zip(names, row)) for row in rows]
+        self.rows = rows
+        self.rowcount = len(rows)
+
+    def fetchall(self):
+        rows, self.rows = self.rows, []
+        return rows
+
+    def fetchone(self):
+        return self.rows.pop(0) if self.rows else None
+
+    def close(self):
+        self._cursor.close()
+
+class SQLiteConnection:
+    """
+    Connexion empruntée à un SQLitePool.
+
+    Un emprunt imbriqué (DatabaseManager.execute_query dans un bloc
+    transaction(), même thread) partage la connexion : sa transaction
+    devient un SAVEPOINT et son commit ne valide pas celle du bloc.
+    """
+
+    def __init__(self, pool, depth):
+        self.pool = pool
+        self.raw = pool.raw
+        self.depth = depth
+        self.savepoint = None
+
+    def cursor(self, dictionary=False, **kwargs):
+        return SQLiteCursor(self.raw, dictionary)
+
+    def start_transaction(self):
+        if self.raw.in_transaction:
+            self.savepoint = f"sp_{self.depth}"
+            self.raw.execute(f"SAVEPOINT {self.savepoint}")
+        else:
+            self.raw.execute("BEGIN")
+
+    def commit(self):
+        if self.savepoint:
+            self.raw.execute(f"RELEASE {self.savepoint}")
+            self.savepoint = None
+        elif self.depth == 0 and self.raw.in_transaction:
+            self.raw.commit()
+
+    def rollback(self):
+        if self.savepoint:
+            self.raw.execute(f"ROLLBACK TO {self.savepoint}")
+            self.raw.execute(f"RELEASE {self.savepoint}")
+            self.savepoint = None
+        elif self.depth == 0 and self.raw.in_transaction:
+            self.raw.rollback()
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        """Rendre la connexion (une transaction laissée ouverte est annulée)"""
+        if self.depth == 0 and self.raw.in_transaction:
+            self.raw.rollback()
+        self.pool.release()
+
+class SQLitePool:
+    """
+    Base SQLite embarquée, interchangeable avec database.ConnectionPool.
+
+    Les tests et bancs d'essai tournent ainsi sans serveur MySQL :
+    `DatabaseManager(pool=SQLitePool())` charge LABaseDeDonées.sql en
+    mémoire, traduit (translate_dump), et les requêtes de l'application
+    sont traduites à la volée (translate_query). Une seule connexion,
+    empruntée par un thread à la fois (SQLite sérialise de toute façon
+    les écritures).
+    """
+
+    # Lu par DatabaseManager.setup_module_stats
+    module_stats_ddl = MODULE_STATS_DDL
+
+    def __init__(self, path=None, dump=None, data=True):
+        """
+        Args:
+            path (str, optional): fichier de la base (défaut : SQLITE_CONFIG, ':memory:')
+            dump (str | bool, optional): dump MySQL chargé si la base est vide
+                 (défaut : LABaseDeDonées.sql ; False : base vide)
+            data (bool): charger les lignes du dump (False : schéma seul)
+        """
+        self.path = path or SQLITE_CONFIG['path']
+        self.raw = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None,
+                                   detect_types=sqlite3.PARSE_DECLTYPES)
+        for name, (nb_args, function) in FUNCTIONS.items():
+            self.raw.create_function(name, nb_args, function, deterministic=name in ('CONCAT', 'IF'))
+        self.raw.create_aggregate('GROUP_CONCAT_DISTINCT', 2, _GroupConcatDistinct)
+        self._lock = threading.RLock()
+        self._depth = 0
+
+        dump = SQLITE_CONFIG['dump'] or DEFAULT_DUMP if dump is None else dump
+        empty = not self.raw.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()[0]
+        if dump and empty:
+            self.load_dump(dump, data)
+        elif not self.raw.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone()[0]:
+            self.analyze()
+        self.raw.execute("PRAGMA foreign_keys = ON")
+
+    def load_dump(self, path, data=True):
+        """Créer les tables (et les remplir) depuis un dump MySQL"""
+        with open(path, encoding='utf-8') as f:
+            statements = translate_dump(f.read(), data)
+        with self._lock:
+            self.raw.execute("PRAGMA foreign_keys = OFF")
+            self.raw.executescript("BEGIN;\n" + ';\n'.join(statements) + ";\nCOMMIT;")
+            self.raw.execute("PRAGMA foreign_keys = ON")
+        self.analyze()
+
+    def analyze(self):
+        """Mettre à jour les statistiques (plans de requêtes, TABLE_ROWS)"""
+        with self._lock:
+            self.raw.execute("ANALYZE")
+
+    def get_connection(self):
+        """Emprunter la connexion ; la fermer (close) la rend"""
+        self._lock.acquire()
+        self._depth += 1
+        return SQLiteConnection(self, self._depth - 1)
+
+    def release(self):
+        self._depth -= 1
+        self._lock.release()
+
+    @contextmanager
+    def connection(self):
+        """Emprunt / restitution automatique : `with pool.connection() as conn:`"""
+        conn = self.get_connection()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        self.raw.close()
+
+def load_university(pool, university, seed=0):
+    """
+    Remplir une base SQLite (schéma seul) avec une université synthétique.
+
+    À appeler avant DatabaseManager.setup_module_stats : sans triggers, le
+    chargement se fait en une transaction d'INSERT multi-lignes.
+
+    Returns:
+        dict: {table: nombre de lignes}
+    """
+    from load_data import TABLES, table_rows
+
+    counts = {}
+    with pool.connection() as conn:
+        conn.start_transaction()
+        cursor = conn.cursor()
+        try:
+            for table, generate in table_rows(university, seed=seed).items():
+                columns = TABLES[table]
+                rows = list(generate())
+                cursor.executemany(
+                    f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['?'] * len(columns))})",
+                    rows
+                )
+                counts[table] = len(rows)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+    pool.analyze()
+    return counts
@@ -0,0 +1,208 @@
+from collections import defaultdict
+from datetime import date, datetime
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from config import PLANNING_CONFIG
+from constraints import heure_key
+
+# Coût d'un surveillant d'un autre département (en examens de charge)
+OTHER_DEPT_PENALTY = 1000
+# Coût d'une affectation impossible (limite atteinte)
+INFEASIBLE = 1e9
+
+def to_date(value):
+    """Date d'examen (date, datetime ou 'AAAA-MM-JJ')"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], '%Y-%m-%d').date()
+
+class SupervisorAssigner:
+    """
+    Affectation des surveillants avec équilibrage de charge.
+
+    Les professeurs sont chargés une seule fois ; les limites de
+    PLANNING_CONFIG (examens par jour, heures par jour, examens par semaine)
+    sont tenues dans des compteurs en mémoire. Sur chaque créneau, les
+    examens sont affectés par une affectation de coût minimal (algorithme
+    hongrois) : coût = charge déjà attribuée, plus une pénalité hors
+    département. Traiter les créneaux dans l'ordre répartit la charge.
+    """
+
+    def __init__(self, professors, max_per_day=None, max_hours_per_day=None, max_per_week=None):
+        """
+        Args:
+            professors (list): dicts avec id, nom et dept_id
+        """
+        self.professors = list(professors)
+        self.by_id = {prof['id']: prof for prof in self.professors}
+        self.max_per_day = max_per_day or PLANNING_CONFIG['max_exams_per_day_prof']
+        self.max_minutes_per_day = (max_hours_per_day or PLANNING_CONFIG['max_hours_per_day_prof']) * 60
+        self.max_per_week = max_per_week or PLANNING_CONFIG['max_exams_per_week_prof']
+
+        self.day_count = defaultdict(int)  # (prof, jour) -> examens
+        self.day_minutes = defaultdict(int)  # (prof, jour) -> minutes surveillées
+        self.week_count = defaultdict(int)  # (prof, semaine) -> examens
+        self.total = defaultdict(int)  # prof -> examens sur la session
+        self.busy = defaultdict(set)  # (jour, heure) -> professeurs occupés
+        self._key_cache = {}  # (date_exam, heure) bruts -> (jour, semaine, heure)
+
+    @classmethod
+    def from_database(cls, db, **limits):
+        """Charger tous les professeurs en une requête"""
+        professors = db.execute_query(
+            "SELECT id, nom, prenom, dept_id FROM professeurs",
+            fetch=True
+        )
+        return cls(professors, **limits)
+
+    # ===== COMPTEURS =====
+
+    def _keys(self, exam):
+        """
+        (jour, semaine, heure) entiers d'un examen : jour ordinal, semaine
+        commençant le lundi, minutes depuis minuit. Les chaînes date / heure
+        ne sont analysées qu'une fois par créneau distinct.
+        """
+        raw = (exam['date_exam'], exam['heure'])
+        keys = self._key_cache.get(raw)
+        if keys is None:
+            day = to_date(raw[0]).toordinal()
+            keys = self._key_cache[raw] = (day, (day - 1) // 7, heure_key(raw[1]))
+        return keys
+
+    def can_take(self, prof_id, exam):
+        """Vrai si le professeur peut surveiller l'examen sans dépasser une limite"""
+        day, week, heure = self._keys(exam)
+        duree = exam.get('duree') or PLANNING_CONFIG['exam_duration']
+        return (prof_id not in self.busy[(day, heure)]
+                and self.day_count[(prof_id, day)] < self.max_per_day
+                and self.day_minutes[(prof_id, day)] + duree <= self.max_minutes_per_day
+                and self.week_count[(prof_id, week)] < self.max_per_week)
+
+    def record(self, prof_id, exam, sign=1):
+        """Compter (ou décompter avec sign=-1) une surveillance"""
+        day, week, heure = self._keys(exam)
+        duree = exam.get('duree') or PLANNING_CONFIG['exam_duration']
+        self.day_count[(prof_id, day)] += sign
+        self.day_minutes[(prof_id, day)] += sign * duree
+        self.week_count[(prof_id, week)] += sign
+        self.total[prof_id] += sign
+        if sign > 0:
+            self.busy[(day, heure)].add(prof_id)
+        else:
+            self.busy[(day, heure)].discard(prof_id)
+
+    def preload(self, exams):
+        """Prendre en compte les examens déjà planifiés (avec prof_id)"""
+        for exam in exams:
+            if exam.get('prof_id') in self.by_id:
+                self.record(exam['prof_id'], exam)
+
+    # ===== AFFECTATION =====
+
+    def assign(self, exams):
+        """
+        Affecter un surveillant à chaque examen.
+
+        Args:
+            exams (list): dicts avec date_exam, heure, dept_id et optionnellement duree
+
+        Returns:
+            tuple: ({indice_examen: prof_id}, [indices sans surveillant])
+        """
+        by_slot = defaultdict(list)
+        for index, exam in enumerate(exams):
+            day, _, heure = self._keys(exam)
+            by_slot[(day, heure)].append(index)
+
+        assignment = {}
+        unassigned = []
+        for slot in sorted(by_slot):
+            indices = by_slot[slot]
+            for index, prof_id in zip(indices, self._assign_slot([exams[i] for i in indices])):
+                if prof_id is None:
+                    unassigned.append(index)
+                else:
+                    assignment[index] = prof_id
+                    self.record(prof_id, exams[index])
+        return assignment, unassigned
+
+    def release_modules(self, exams, assignment, unassigned):
+        """
+        Retirer de `assignment` les modules dont une salle n'a pas de surveillant :
+        leurs autres surveillances sont décomptées, le module est à signaler
+        plutôt qu'enregistré en partie.
+
+        Returns:
+            dict: {module_id: premier examen sans surveillant}
+        """
+        missing = {}
+        for index in unassigned:
+            missing.setdefault(exams[index]['module_id'], exams[index])
+        for index in [i for i in assignment if exams[i]['module_id'] in missing]:
+            self.record(assignment.pop(index), exams[index], sign=-1)
+        return missing
+
+    def _assign_slot(self, exams):
+        """Affectation de coût minimal des examens d'un même créneau"""
+        prof_ids = [prof['id'] for prof in self.professors]
+        if not prof_ids:
+            return [None] * len(exams)
+
+        # Compteurs du jour / de la semaine, identiques pour tous les examens du créneau
+        day, week, heure = self._keys(exams[0])
+        busy = self.busy[(day, heure)]
+        free = np.array([
+            p not in busy
+            and self.day_count[(p, day)] < self.max_per_day
+            and self.week_count[(p, week)] < self.max_per_week
+            for p in prof_ids
+        ])
+        minutes = np.array([self.day_minutes[(p, day)] for p in prof_ids])
+        load = np.array([self.total[p] for p in prof_ids], dtype=float)
+        depts = np.array([self.by_id[p].get('dept_id') for p in prof_ids], dtype=object)
+
+        cost = np.full((len(exams), len(prof_ids)), INFEASIBLE)
+        for row, exam in enumerate(exams):
+            duree = exam.get('duree') or PLANNING_CONFIG['exam_duration']
+            feasible = free & (minutes + duree <= self.max_minutes_per_day)
+            other_dept = (depts != exam.get('dept_id')) * OTHER_DEPT_PENALTY
+            cost[row, feasible] = load[feasible] + other_dept[feasible]
+
+        rows, cols = linear_sum_assignment(cost)
+        chosen = [None] * len(exams)
+        for row, col in zip(rows, cols):
+            if cost[row, col] < INFEASIBLE:
+                chosen[row] = prof_ids[col]
+        return chosen
+
+    # ===== ÉQUITÉ =====
+
+    def fairness(self):
+        """
+        Mesure d'équité de la charge par département.
+
+        Returns:
+            dict: {dept_id: {'min', 'max', 'moyenne', 'ecart_type', 'jain'}} plus
+                  'global' ; l'indice de Jain vaut 1 quand la charge est parfaitement égale
+        """
+        groups = defaultdict(list)
+        for prof in self.professors:
+            load = self.total[prof['id']]
+            groups[prof.get('dept_id')].append(load)
+            groups['global'].append(load)
+
+        report = {}
+        for dept_id, loads in groups.items():
+            loads = np.asarray(loads, dtype=float)
+            squares = (loads ** 2).sum()
+            report[dept_id] = {
+                'min': int(loads.min()),
+                'max': int(loads.max()),
+                'moyenne': round(float(loads.mean()), 2),
+                'ecart_type': round(float(loads.std()), 2),
+                'jain': round(float(loads.sum() ** 2 / (len(loads) * squares)), 3) if squares else 1.0
+            }
+        return report
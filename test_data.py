@@ -90,6 +90,422 @@ def test_constraint_checking():
     
     return compliance >= 80  # Considéré comme bon si >= 80%
 
+def test_split_module_daily_limit():
+    """Tester qu'un module réparti sur plusieurs salles compte pour un seul examen par jour"""
+    print("\nTest d'un module réparti sur plusieurs salles...")
+    from constraints import ConstraintChecker, IncrementalChecker, ScheduleSnapshot
+    from sqlite_backend import SQLitePool
+    
+    db = DatabaseManager(pool=SQLitePool(path=':memory:', data=False))
+    with db.transaction() as cursor:
+        cursor.execute("INSERT INTO departments (id, nom) VALUES (1, 'Informatique')")
+        cursor.execute("INSERT INTO formations (id, nom, dept_id, nb_modules) VALUES (1, 'L3', 1, 2)")
+        cursor.executemany("INSERT INTO modules (id, nom, formation_id) VALUES (%s, %s, 1)",
+                           [(10, 'Algorithmique'), (20, 'Réseaux')])
+        cursor.executemany("INSERT INTO etudiants (id, nom, prenom, formation_id, promo) VALUES (%s, %s, 'A', 1, 2025)",
+                           [(1, 'Martin'), (2, 'Durand')])
+        cursor.executemany("INSERT INTO inscriptions (etudiant_id, module_id, annee_inscription) VALUES (%s, %s, 2025)",
+                           [(1, 10), (2, 10), (1, 20)])
+        cursor.executemany("INSERT INTO salles (id, nom, capacite, type) VALUES (%s, %s, 1, 'Salle de cours')",
+                           [(1, 'A1'), (2, 'A2'), (3, 'A3')])
+        cursor.executemany("INSERT INTO professeurs (id, nom, prenom, dept_id) VALUES (%s, %s, 'P', 1)",
+                           [(1, 'Benali'), (2, 'Moreau'), (3, 'Simon')])
+        # Module 10 dans deux salles le lundi, module 20 le mardi
+        cursor.executemany(
+            "INSERT INTO examens (module_id, prof_id, salle_id, date_exam, heure) VALUES (%s, %s, %s, %s, '09:00')",
+            [(10, 1, 1, '2025-06-02'), (10, 2, 2, '2025-06-02'), (20, 3, 3, '2025-06-03')]
+        )
+    
+    def violations():
+        snapshot = ScheduleSnapshot.from_database(db)
+        incremental = IncrementalChecker.from_snapshot(snapshot)
+        return [
+            len(ConstraintChecker(db).check_student_daily_limit()['violations']),
+            len(ConstraintChecker(db).check_student_daily_limit_snapshot(snapshot)['violations']),
+            sum(1 for count in incremental.student_day.values() if count > incremental.max_student),
+            len(db.detect_conflicts()['student_conflicts'])
+        ]
+    
+    if violations() != [0, 0, 0, 0]:
+        print(f"❌ Conflits comptés par salle : {violations()}")
+        return False
+    
+    # Module 20 déplacé le lundi : un seul étudiant (1) a deux examens
+    db.execute_query("UPDATE examens SET date_exam = '2025-06-02', heure = '14:00' WHERE module_id = 20")
+    if violations() != [1, 1, 1, 1]:
+        print(f"❌ Conflit attendu pour un étudiant : {violations()}")
+        return False
+    
+    print("✅ Un module réparti compte pour un examen (SQL, vectorisé, incrémental)")
+    return True
+
+def test_conflict_matrix():
+    """Tester la matrice de conflits en mémoire (Mᵀ·M contre un comptage direct des paires)"""
+    print("\nTest de la matrice de conflits...")
+    from collections import defaultdict
+    from itertools import combinations
+    from benchmark import SyntheticUniversity
+    
+    universite = SyntheticUniversity(300, seed=4)
+    inscriptions = universite.inscriptions
+    matrix = universite.conflicts()
+    print(f"Matrice {matrix.enrollment.shape[0]} étudiants × {matrix.enrollment.shape[1]} modules")
+    
+    # Comptage direct : étudiants par module et par paire de modules
+    par_etudiant = defaultdict(set)
+    for etudiant_id, module_id in zip(inscriptions['etudiant_id'].tolist(), inscriptions['module_id'].tolist()):
+        par_etudiant[etudiant_id].add(module_id)
+    effectifs, paires = defaultdict(int), defaultdict(int)
+    for modules in par_etudiant.values():
+        for module_id in modules:
+            effectifs[module_id] += 1
+        for a, b in combinations(sorted(modules), 2):
+            paires[(a, b)] += 1
+    
+    for module_id, effectif in list(effectifs.items())[:20]:
+        if matrix.enrollment_count(module_id) != effectif:
+            print(f"❌ Effectif incohérent pour le module {module_id}")
+            return False
+    modules = sorted(effectifs)
+    for a, b in list(combinations(modules[:30], 2)) + list(paires)[:50]:
+        if matrix.shared_students(a, b) != paires.get((a, b), 0) or matrix.has_conflict(a, b) != ((a, b) in paires):
+            print(f"❌ Étudiants partagés incohérents pour ({a}, {b})")
+            return False
+    
+    print(f"✅ Effectifs et {len(paires)} paires en conflit cohérents avec le comptage direct")
+    return True
+
+def test_delta_cost():
+    """Tester le score incrémental de la recherche locale (delta() contre score() recalculé)"""
+    print("\nTest du score incrémental...")
+    import numpy as np
+    from benchmark import SyntheticUniversity
+    from planning import get_strategy, score
+    from optimizer import DeltaState
+    
+    model = SyntheticUniversity(1000, seed=2).model(nb_days=8)
+    state = DeltaState(model, get_strategy('greedy').solve(model).slots)
+    rng = np.random.default_rng(0)
+    for _ in range(300):
+        i, slot = int(rng.integers(model.nb_free)), int(rng.integers(-1, len(model.slots)))
+        before = score(model, state.slots)['total']
+        change = state.move(i, slot)
+        # Chaque variation annoncée doit être celle du score recalculé entièrement
+        if abs(before + change - score(model, state.slots)['total']) > 1e-6:
+            print(f"❌ Variation incrémentale incohérente (module {i} vers le créneau {slot})")
+            return False
+    
+    if abs(state.total - score(model, state.slots)['total']) > 1e-6:
+        print("❌ Score incrémental incohérent")
+        return False
+    
+    print("✅ Score incrémental cohérent")
+    return True
+
+def test_exact_solver():
+    """Tester le solveur exact sur une petite université (sans conflit, au moins aussi bon que le glouton)"""
+    print("\nTest du solveur exact...")
+    from benchmark import SyntheticUniversity
+    from planning import get_strategy
+    
+    model = SyntheticUniversity(500, seed=1).model(nb_days=10)
+    greedy = get_strategy('greedy').solve(model)
+    solution = get_strategy('exact', time_limit=10).solve(model, initial=greedy)
+    if solution.score['student_conflicts']:
+        print(f"❌ {solution.score['student_conflicts']} conflits étudiants dans la solution exacte")
+        return False
+    if solution.total > greedy.total:
+        print(f"❌ Solution exacte moins bonne que le glouton ({solution.total} > {greedy.total})")
+        return False
+    if solution.gap is None or not 0 <= solution.gap <= 1:
+        print(f"❌ Écart d'optimalité incohérent : {solution.gap}")
+        return False
+    
+    print(f"✅ Solveur exact : {solution.score['room_optimization']} jours, écart {solution.gap:.1%}")
+    return True
+
+def test_exact_solution_kept():
+    """Tester que la solution du programme linéaire est retenue sur une petite instance réalisable"""
+    print("\nTest de la solution exacte retenue...")
+    from benchmark import SyntheticUniversity
+    from planning import get_strategy
+    
+    model = SyntheticUniversity(800, seed=0).model(nb_days=10)
+    greedy = get_strategy('greedy').solve(model)
+    solution = get_strategy('exact', time_limit=10).solve(model, initial=greedy)
+    if solution.strategy != 'exact' or solution.score['non_planifies']:
+        print(f"❌ Solution {solution.strategy} retenue, {solution.score['non_planifies']} modules non planifiés")
+        return False
+    if solution.total >= greedy.total or solution.score['student_conflicts']:
+        print(f"❌ Score exact {solution.total} (glouton {greedy.total})")
+        return False
+    
+    print(f"✅ Solution exacte retenue : {solution.total} contre {greedy.total} pour le glouton")
+    return True
+
+def test_department_decomposition():
+    """Tester que la décomposition par département ne fait jamais pire que le glouton"""
+    print("\nTest de la décomposition par département...")
+    from benchmark import SyntheticUniversity
+    from planning import get_strategy, solve_by_department
+    
+    model = SyntheticUniversity(2000, seed=1).model(nb_days=6)
+    greedy = get_strategy('greedy').solve(model)
+    solution = solve_by_department(model, 'greedy', time_limit=2, seed=0)
+    if solution.total > greedy.total or solution.score['non_planifies'] > greedy.score['non_planifies']:
+        print(f"❌ {solution.score['non_planifies']} modules non planifiés (glouton {greedy.score['non_planifies']})")
+        return False
+    
+    print(f"✅ Décomposition : {solution.score['non_planifies']} modules non planifiés "
+          f"(glouton {greedy.score['non_planifies']})")
+    return True
+
+def test_job_runner():
+    """Tester les tâches de fond (progression, annulation, résultat persistant)"""
+    print("\nTest des tâches de fond...")
+    import tempfile
+    import time
+    from jobs import JobRunner
+    
+    runner = JobRunner(max_workers=1, results_dir=tempfile.mkdtemp())
+    
+    def compter(job, n):
+        for i in range(n):
+            job.report(iterations=i)
+            time.sleep(0.01)
+        return n
+    
+    termine = runner.submit("compter", compter, 10)
+    annule = runner.submit("compter", compter, 1000)
+    time.sleep(0.5)
+    runner.cancel(annule)
+    time.sleep(0.5)
+    
+    if runner.status(termine)['statut'] != 'terminé' or runner.result(termine) != 10:
+        print("❌ Tâche non terminée")
+        return False
+    if runner.status(annule)['statut'] != 'annulé':
+        print("❌ Annulation ignorée")
+        return False
+    runner.jobs.clear()
+    if runner.result(termine) != 10:
+        print("❌ Résultat non persisté")
+        return False
+    
+    # Historique borné : les tâches finies les plus anciennes sont oubliées
+    runner.max_history = 2
+    for n in range(4):
+        runner.submit("compter", compter, n)
+    time.sleep(0.3)
+    runner.submit("compter", compter, 0)
+    if len(runner.jobs) > 3 or runner.result(termine) != 10:
+        print(f"❌ {len(runner.jobs)} tâches gardées en mémoire")
+        return False
+    
+    print("✅ Tâches de fond cohérentes")
+    return True
+
+def test_versions():
+    """Tester les versions de l'EDT (stockage en colonnes et comparaison)"""
+    print("\nTest des versions de l'EDT...")
+    import tempfile
+    from versions import ScheduleVersion, VersionStore, diff
+    
+    exams = [
+        {'module_id': 1, 'salle_id': 10, 'prof_id': 100, 'date_exam': '2025-01-06', 'heure': '08:30', 'duree': 90},
+        {'module_id': 2, 'salle_id': 11, 'prof_id': 101, 'date_exam': '2025-01-06', 'heure': '14:00', 'duree': 90},
+        {'module_id': 3, 'salle_id': 12, 'prof_id': 102, 'date_exam': '2025-01-07', 'heure': '08:30', 'duree': 120},
+    ]
+    ancienne = ScheduleVersion.from_exams(exams, label="ancienne")
+    nouvelle = ScheduleVersion.from_exams([
+        exams[0],
+        {**exams[1], 'date_exam': '2025-01-08'},
+        {**exams[2], 'salle_id': 13},
+        {'module_id': 4, 'salle_id': 10, 'prof_id': 100, 'date_exam': '2025-01-09', 'heure': '08:30', 'duree': 90},
+    ], label="nouvelle")
+    
+    ecarts = diff(ancienne, nouvelle)
+    if (ecarts['modules_deplaces'], ecarts['modules_modifies'], ecarts['modules_ajoutes']) != ([2], [3], [4]):
+        print(f"❌ Comparaison incorrecte : {ecarts}")
+        return False
+    
+    store = VersionStore(tempfile.mkdtemp())
+    relue = store.load(store.save(nouvelle))
+    if not diff(nouvelle, relue)['identiques'] or relue.to_rows()[1]['heure'] != '14:00':
+        print("❌ Version relue différente")
+        return False
+    
+    print("✅ Versions cohérentes")
+    return True
+
+def test_slot_grid():
+    """Tester la grille de créneaux dérivée des plages horaires"""
+    print("\nTest de la grille de créneaux...")
+    from slot_grid import SlotGrid
+    
+    # Plages en double, comme dans la table plages_horaires
+    plages = [
+        {'jour_semaine': jour, 'heure_debut': debut, 'heure_fin': fin, 'actif': 1}
+        for jour in ('Lundi', 'Mardi') for debut, fin in (('08:00', '12:00'), ('14:00', '18:00'))
+    ] * 2
+    grille = SlotGrid.from_plages(plages, '2025-01-06', '2025-01-13')
+    if len(grille) != 12 or grille.day.tolist() != [0] * 4 + [1] * 4 + [2] * 4:
+        print(f"❌ Créneaux incorrects : {grille.slots}")
+        return False
+    if grille.half_day.tolist()[:4] != [0, 0, 1, 1] or grille.week.tolist()[-1] != 1:
+        print("❌ Demi-journées ou semaines incorrectes")
+        return False
+    if grille.lookup('2025-01-07', '14:00:00') != 6 or grille.lookup('2025-01-08', '08:30') != -1:
+        print("❌ Recherche de créneau incorrecte")
+        return False
+    
+    print("✅ Grille de créneaux cohérente")
+    return True
+
+def test_student_availability():
+    """Tester les bitsets de disponibilité des étudiants"""
+    print("\nTest des disponibilités étudiants...")
+    from availability import StudentAvailability
+    from conflict_matrix import ConflictMatrix
+    from slot_grid import SlotGrid
+    
+    # Étudiant 1 : modules 10 et 20 ; étudiant 2 : modules 20 et 30
+    conflicts = ConflictMatrix([1, 1, 2, 2], [10, 20, 20, 30])
+    grille = SlotGrid([('2025-01-06', '08:30'), ('2025-01-06', '14:00'), ('2025-01-07', '08:30')])
+    disponibilites = StudentAvailability(conflicts, grille)
+    disponibilites.place(10, 0)
+    disponibilites.place(30, 2)
+    
+    if disponibilites.free_slots(20).tolist() != [False, False, False] or not disponibilites.can_place(30, 1):
+        print("❌ Créneaux libres incorrects")
+        return False
+    disponibilites.remove(10, 0)
+    if disponibilites.free_slots(20).tolist() != [True, True, False] or disponibilites.is_busy(1, 0):
+        print("❌ Retrait d'un examen mal pris en compte")
+        return False
+    
+    print("✅ Disponibilités étudiants cohérentes")
+    return True
+
+def test_benchmark():
+    """Tester le banc d'essai sur une petite université synthétique"""
+    print("\nTest du banc d'essai...")
+    from benchmark import SyntheticUniversity, run_benchmark, compare
+    
+    universite = SyntheticUniversity(500, seed=3)
+    if SyntheticUniversity(500, seed=3).inscriptions['module_id'].tolist() != universite.inscriptions['module_id'].tolist():
+        print("❌ Génération non reproductible")
+        return False
+    
+    rapport = run_benchmark(universite, ['greedy'], time_limit=1, memory=False)
+    glouton = rapport['strategies']['greedy']
+    if glouton['conflits_etudiants'] or glouton['verification']['conformite'] is None:
+        print(f"❌ Résultats inattendus : {glouton}")
+        return False
+    
+    execution = {'executions': [{'nom': 'petite', **rapport}]}
+    if compare(execution, execution):
+        print("❌ Régression détectée sur deux exécutions identiques")
+        return False
+    
+    print(f"✅ Banc d'essai cohérent ({glouton['jours']} jours en {glouton['temps_s']:.2f}s)")
+    return True
+
+def test_bulk_csv():
+    """Tester l'écriture des CSV du chargement en masse"""
+    print("\nTest des CSV de chargement...")
+    import csv
+    import tempfile
+    from benchmark import SyntheticUniversity
+    from load_data import TABLES, table_rows, write_csv
+    
+    universite = SyntheticUniversity(300, seed=4)
+    fichiers = write_csv(tempfile.mkdtemp(), table_rows(universite, {'etudiants': 1000, 'modules': 50}))
+    with open(fichiers['inscriptions'][0], encoding='utf-8') as f:
+        lignes = list(csv.reader(f))
+    if lignes[0] != list(TABLES['inscriptions']) or fichiers['inscriptions'][1] != len(universite.inscriptions['module_id']):
+        print("❌ CSV des inscriptions incorrect")
+        return False
+    if int(lignes[1][0]) <= 1000 or int(lignes[1][1]) <= 50:
+        print("❌ Identifiants non décalés")
+        return False
+    
+    print(f"✅ CSV cohérents ({sum(n for _, n in fichiers.values())} lignes)")
+    return True
+
+def test_sqlite_backend():
+    """Tester DatabaseManager sur la base SQLite embarquée (dump traduit, sans serveur)"""
+    print("\nTest de la base SQLite embarquée...")
+    from constraints import ConstraintChecker
+    from sqlite_backend import SQLitePool
+    
+    db = DatabaseManager(pool=SQLitePool(path=':memory:'))
+    existing, missing = db.check_tables_exist()
+    if missing or not db.get_all_modules():
+        print(f"❌ Dump mal chargé (tables manquantes : {missing})")
+        return False
+    if db.get_table_info() != db.get_table_info(approximate=True):
+        print("❌ Estimation des lignes (TABLE_ROWS) incorrecte")
+        return False
+    
+    # Les deux modes doivent rester d'accord quand les limites de la configuration changent
+    from config import PLANNING_CONFIG
+    limites = PLANNING_CONFIG['max_exams_per_day_student'], PLANNING_CONFIG['max_exams_per_day_prof']
+    try:
+        for etudiant, professeur in (limites, (2, 0)):
+            PLANNING_CONFIG['max_exams_per_day_student'], PLANNING_CONFIG['max_exams_per_day_prof'] = etudiant, professeur
+            sql = ConstraintChecker(db).check_all_constraints()
+            vectorise = ConstraintChecker(db, vectorized=True).check_all_constraints()
+            for key, value in sql.items():
+                if isinstance(value, dict) and len(value['violations']) != len(vectorise[key]['violations']):
+                    print(f"❌ {key} : {len(value['violations'])} violations (SQL) contre {len(vectorise[key]['violations'])}")
+                    return False
+    finally:
+        PLANNING_CONFIG['max_exams_per_day_student'], PLANNING_CONFIG['max_exams_per_day_prof'] = limites
+    
+    # Table et triggers créés explicitement (jamais par une lecture)
+    if db.has_module_stats() or not db.setup_module_stats() or not db.has_module_stats():
+        print("❌ module_stats créée par une lecture ou non créée par setup_module_stats")
+        return False
+    inscription = db.execute_query("SELECT etudiant_id, module_id FROM inscriptions LIMIT 1", fetch=True)[0]
+    compter = "SELECT nb_etudiants FROM module_stats WHERE module_id = %s"
+    avant = db.execute_query(compter, (inscription['module_id'],), fetch=True)[0]['nb_etudiants']
+    db.execute_query("DELETE FROM etudiants WHERE id = %s", (inscription['etudiant_id'],))
+    apres = db.execute_query(compter, (inscription['module_id'],), fetch=True)[0]['nb_etudiants']
+    if apres != avant - 1:
+        print(f"❌ module_stats non mis à jour par les triggers ({avant} -> {apres})")
+        return False
+    formation = db.execute_query("SELECT id, dept_id FROM formations LIMIT 1", fetch=True)[0]
+    autre = db.execute_query("SELECT id FROM departments WHERE id <> %s LIMIT 1", (formation['dept_id'],), fetch=True)[0]['id']
+    db.execute_query("UPDATE formations SET dept_id = %s WHERE id = %s", (autre, formation['id']))
+    perimes = db.execute_query("SELECT COUNT(*) as nb FROM module_stats WHERE formation_id = %s AND dept_id <> %s",
+                               (formation['id'], autre), fetch=True)[0]['nb']
+    if perimes:
+        print(f"❌ {perimes} modules gardent l'ancien département dans module_stats")
+        return False
+    
+    # Version de la table examens : change après l'écriture d'une autre instance
+    from database import table_version
+    versions = table_version('examens'), table_version('salles')
+    DatabaseManager(pool=db.pool).execute_query("UPDATE examens SET duree = duree WHERE id = %s", (0,))
+    if table_version('examens') == versions[0] or table_version('salles') != versions[1]:
+        print("❌ Version de la table examens non mise à jour")
+        return False
+    
+    # Cache partagé par le pool : l'écriture d'une instance sans cache l'invalide
+    lecteur = DatabaseManager(pool=db.pool, cache=True)
+    capacite = "SELECT capacite FROM salles WHERE id = %s"
+    salle = lecteur.execute_query("SELECT id, capacite FROM salles LIMIT 1", fetch=True)[0]
+    lecteur.execute_query(capacite, (salle['id'],), fetch=True)
+    DatabaseManager(pool=db.pool).execute_query("UPDATE salles SET capacite = capacite + 1 WHERE id = %s", (salle['id'],))
+    relue = lecteur.execute_query(capacite, (salle['id'],), fetch=True)
+    if relue[0]['capacite'] != salle['capacite'] + 1 or DatabaseManager(pool=db.pool, cache=True).cache is not lecteur.cache:
+        print("❌ Cache des lectures non invalidé par une autre instance")
+        return False
+    
+    print(f"✅ {len(existing)} tables, contraintes SQL et vectorisées identiques")
+    return True
+
 def run_all_tests():
     """Exécuter tous les tests"""
     print("=" * 50)
@@ -101,6 +517,19 @@ def run_all_tests():
         ("Récupération modules", test_get_modules),
         ("Génération EDT", test_schedule_generation),
         ("Détection conflits", test_conflict_detection),
+        ("Matrice de conflits", test_conflict_matrix),
+        ("Module réparti sur plusieurs salles", test_split_module_daily_limit),
+        ("Score incrémental", test_delta_cost),
+        ("Solveur exact", test_exact_solver),
+        ("Solution exacte retenue", test_exact_solution_kept),
+        ("Décomposition par département", test_department_decomposition),
+        ("Tâches de fond", test_job_runner),
+        ("Versions de l'EDT", test_versions),
+        ("Grille de créneaux", test_slot_grid),
+        ("Disponibilités étudiants", test_student_availability),
+        ("Banc d'essai", test_benchmark),
+        ("CSV de chargement", test_bulk_csv),
+        ("Base SQLite embarquée", test_sqlite_backend),
         ("Vérification contraintes", test_constraint_checking)
     ]
     
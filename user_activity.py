@@ -1,14 +1,8 @@
 import streamlit as st
 import mysql.connector
+from database import get_pool
 from datetime import datetime, timedelta
 
-DB_CONFIG = {
-    'host': 'localhost',
-    'user': 'root',
-    'password': '',
-    'database': 'examens'
-}
-
 st.set_page_config(page_title="Mon activité", page_icon="📋")
 
 st.title("📋 Mon activité")
@@ -20,7 +14,7 @@ if 'authenticated' not in st.session_state or not st.session_state.authenticated
 user_data = st.session_state.user_data
 
 # Connexion à la base
-conn = mysql.connector.connect(**DB_CONFIG)
+conn = get_pool().get_connection()
 cursor = conn.cursor(dictionary=True)
 
 try:
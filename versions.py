@@ -0,0 +1,282 @@
+import json
+import os
+import tempfile
+import threading
+import uuid
+from datetime import datetime
+import numpy as np
+from mysql.connector import Error
+from config import VERSION_CONFIG, DATA_DIR
+from constraints import heure_key
+
+STATUSES = ('brouillon', 'publié', 'archivé')
+
+class ScheduleVersion:
+    """
+    Version d'un EDT en colonnes numpy (environ 20 octets par examen).
+
+    - module_id, salle_id, prof_id : int32
+    - day    : jour en nombre de jours depuis 1970-01-01 (int32)
+    - minute : heure de début en minutes depuis minuit (int16)
+    - duree  : durée en minutes (int16)
+    """
+
+    COLUMNS = ('module_id', 'day', 'minute', 'salle_id', 'prof_id', 'duree')
+
+    def __init__(self, module_id, day, minute, salle_id, prof_id, duree=None, **meta):
+        """
+        Args:
+            meta: label, version_id, cree, statut, precedent, score...
+        """
+        self.module_id = np.asarray(module_id, dtype=np.int32)
+        self.day = np.asarray(day, dtype=np.int32)
+        self.minute = np.asarray(minute, dtype=np.int16)
+        self.salle_id = np.asarray(salle_id, dtype=np.int32)
+        self.prof_id = np.asarray(prof_id, dtype=np.int32)
+        self.duree = (np.full(len(self.module_id), 90, dtype=np.int16) if duree is None
+                      else np.asarray(duree, dtype=np.int16))
+        self.meta = {'label': '', 'statut': 'brouillon', **meta}
+        self.meta.setdefault('version_id', uuid.uuid4().hex[:12])
+        self.meta.setdefault('cree', datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+
+    @property
+    def id(self):
+        return self.meta['version_id']
+
+    def __len__(self):
+        return len(self.module_id)
+
+    @classmethod
+    def from_exams(cls, exams, **meta):
+        """Construire une version à partir de dicts examen (module_id, salle_id, prof_id, date_exam, heure, duree)"""
+        exams = list(exams)
+        return cls(
+            [e['module_id'] for e in exams],
+            np.array([str(e['date_exam'])[:10] for e in exams], dtype='datetime64[D]').astype(np.int64),
+            [heure_key(e['heure']) for e in exams],
+            [e['salle_id'] for e in exams],
+            [e['prof_id'] for e in exams],
+            [e.get('duree') or 90 for e in exams],
+            **meta
+        )
+
+    @classmethod
+    def from_database(cls, db, **meta):
+        """
+        Photographier la table examens en une lecture, hors cache.
+
+        Returns:
+            ScheduleVersion: None si la lecture échoue (une erreur ne doit pas
+            passer pour un EDT vide)
+        """
+        try:
+            with db.transaction(tables=()) as cursor:
+                cursor.execute("SELECT module_id, salle_id, prof_id, date_exam, heure, duree FROM examens")
+                rows = cursor.fetchall()
+        except Error as e:
+            print(f"❌ ERREUR SQL: {e}")
+            return None
+        return cls.from_exams(rows, **meta)
+
+    def to_rows(self):
+        """Dicts prêts pour DatabaseManager.bulk_insert_exams"""
+        dates = self.day.astype('datetime64[D]').astype(str)
+        return [
+            {
+                'module_id': int(m), 'salle_id': int(s), 'prof_id': int(p),
+                'date_exam': str(d), 'heure': f"{int(h) // 60:02d}:{int(h) % 60:02d}", 'duree': int(t)
+            }
+            for m, d, h, s, p, t in zip(self.module_id, dates, self.minute, self.salle_id, self.prof_id, self.duree)
+        ]
+
+    def overlay(self, other, **meta):
+        """
+        Nouvelle version : les examens de `other` remplacent ceux des mêmes
+        modules dans cette version, les autres modules sont conservés.
+        """
+        keep = ~np.isin(self.module_id, other.module_id)
+        return ScheduleVersion(*(np.concatenate([getattr(self, column)[keep], getattr(other, column)])
+                                 for column in self.COLUMNS), **meta)
+
+    def matrix(self):
+        """Examens en lignes (n × 6, int64), dans l'ordre de COLUMNS"""
+        return np.stack([getattr(self, column).astype(np.int64) for column in self.COLUMNS], axis=1) \
+            if len(self) else np.empty((0, len(self.COLUMNS)), dtype=np.int64)
+
+def _row_keys(matrix):
+    """Une clé opaque par ligne, comparable avec np.isin"""
+    matrix = np.ascontiguousarray(matrix)
+    return matrix.view(np.dtype((np.void, matrix.dtype.itemsize * matrix.shape[1]))).ravel()
+
+def _first_slot(version):
+    """(modules triés, créneau du premier examen de chaque module en minutes absolues)"""
+    modules, first = np.unique(version.module_id, return_index=True)
+    return modules, version.day[first].astype(np.int64) * 1440 + version.minute[first]
+
+def diff(old, new):
+    """
+    Comparer deux versions sans boucle Python.
+
+    Returns:
+        dict: lignes ajoutées / supprimées et modules ajoutés, retirés,
+              déplacés (autre créneau) ou modifiés (même créneau, autres
+              salles ou surveillants)
+    """
+    old_keys, new_keys = _row_keys(old.matrix()), _row_keys(new.matrix())
+    kept_old = np.isin(old_keys, new_keys)
+    kept_new = np.isin(new_keys, old_keys)
+
+    old_modules, old_slots = _first_slot(old)
+    new_modules, new_slots = _first_slot(new)
+    common, i_old, i_new = np.intersect1d(old_modules, new_modules, assume_unique=True, return_indices=True)
+    moved = common[old_slots[i_old] != new_slots[i_new]]
+    touched = np.union1d(old.module_id[~kept_old], new.module_id[~kept_new])
+    modified = np.setdiff1d(np.intersect1d(touched, common), moved)
+
+    return {
+        'lignes_ajoutees': int((~kept_new).sum()),
+        'lignes_supprimees': int((~kept_old).sum()),
+        'modules_ajoutes': np.setdiff1d(new_modules, old_modules).tolist(),
+        'modules_retires': np.setdiff1d(old_modules, new_modules).tolist(),
+        'modules_deplaces': moved.tolist(),
+        'modules_modifies': modified.tolist(),
+        'identiques': bool(kept_old.all() and kept_new.all()),
+    }
+
+class VersionStore:
+    """
+    Versions de l'EDT sur disque : un fichier .npz par version et un index JSON.
+
+    Les brouillons s'essaient sans toucher à la table examens. publish()
+    photographie d'abord l'EDT en ligne (version archivée) puis remplace la
+    table en une transaction ; rollback() republie cette photographie.
+    Toutes les écritures de fichiers passent par un fichier temporaire et
+    os.replace (atomique).
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory or VERSION_CONFIG['directory'] or os.path.join(DATA_DIR, 'versions')
+        self._lock = threading.RLock()
+
+    # ===== FICHIERS =====
+
+    def _path(self, version_id):
+        return os.path.join(self.directory, f"{version_id}.npz")
+
+    def _write_atomic(self, path, write):
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            os.replace(tmp, path)
+        except Exception:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def _index(self):
+        path = os.path.join(self.directory, 'index.json')
+        if not os.path.exists(path):
+            return {}
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_index(self, index):
+        self._write_atomic(os.path.join(self.directory, 'index.json'),
+                           lambda f: f.write(json.dumps(index, ensure_ascii=False, indent=1).encode('utf-8')))
+
+    # ===== VERSIONS =====
+
+    def save(self, version, status=None):
+        """Enregistrer une version (brouillon par défaut) ; retourne son identifiant"""
+        with self._lock:
+            if status:
+                version.meta['statut'] = status
+            columns = {column: getattr(version, column) for column in ScheduleVersion.COLUMNS}
+            self._write_atomic(self._path(version.id), lambda f: np.savez_compressed(f, **columns))
+            index = self._index()
+            index[version.id] = {**version.meta, 'nb_examens': len(version)}
+            self._prune(index)
+            self._save_index(index)
+            return version.id
+
+    def load(self, version_id):
+        """Relire une version (KeyError si inconnue)"""
+        meta = self._index()[version_id]
+        with np.load(self._path(version_id)) as data:
+            return ScheduleVersion(*(data[column] for column in ScheduleVersion.COLUMNS),
+                                   **{k: v for k, v in meta.items() if k != 'nb_examens'})
+
+    def list_versions(self):
+        """Métadonnées des versions, les plus récentes d'abord"""
+        return sorted(self._index().values(), key=lambda meta: meta['cree'], reverse=True)
+
+    def published(self):
+        """Métadonnées de la version publiée (None si aucune)"""
+        return next((meta for meta in self.list_versions() if meta['statut'] == 'publié'), None)
+
+    def delete(self, version_id):
+        """Supprimer un brouillon ou une archive (jamais la version publiée)"""
+        with self._lock:
+            index = self._index()
+            if version_id not in index or index[version_id]['statut'] == 'publié':
+                return False
+            del index[version_id]
+            self._save_index(index)
+            if os.path.exists(self._path(version_id)):
+                os.remove(self._path(version_id))
+            return True
+
+    def _prune(self, index):
+        archived = sorted((meta for meta in index.values() if meta['statut'] == 'archivé'),
+                          key=lambda meta: meta['cree'], reverse=True)
+        referenced = {meta.get('precedent') for meta in index.values() if meta['statut'] == 'publié'}
+        for meta in archived[VERSION_CONFIG['keep_archived']:]:
+            if meta['version_id'] not in referenced:
+                del index[meta['version_id']]
+                if os.path.exists(self._path(meta['version_id'])):
+                    os.remove(self._path(meta['version_id']))
+
+    # ===== PUBLICATION =====
+
+    def publish(self, db, version_id, backup_label=None):
+        """
+        Publier une version : l'EDT en ligne est archivé, puis la table
+        examens est remplacée en une seule transaction.
+
+        Returns:
+            bool: True si la publication a réussi
+        """
+        with self._lock:
+            version = self.load(version_id)
+            backup = ScheduleVersion.from_database(
+                db, label=backup_label or f"Avant publication de « {version.meta['label'] or version.id} »"
+            )
+            if backup is None:
+                print(f"❌ Publication de la version {version_id} annulée : EDT en ligne illisible")
+                return False
+            self.save(backup, status='archivé')
+
+            inserted = db.bulk_insert_exams(version.to_rows(), replace_all=True)
+            if len(version) and not inserted:
+                self.delete(backup.id)
+                print(f"❌ Publication de la version {version_id} annulée")
+                return False
+
+            index = self._index()
+            for meta in index.values():
+                if meta['statut'] == 'publié':
+                    meta['statut'] = 'archivé'
+            index[version_id]['statut'] = 'publié'
+            index[version_id]['precedent'] = backup.id
+            index[version_id]['publie'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            self._save_index(index)
+            return True
+
+    def rollback(self, db):
+        """Republier l'EDT en ligne avant la dernière publication"""
+        current = self.published()
+        if current is None or current.get('precedent') not in self._index():
+            return False
+        return self.publish(db, current['precedent'], backup_label=f"Avant retour arrière ({current['label']})")